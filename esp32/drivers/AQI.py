@@ -0,0 +1,113 @@
+def _numpy(data):
+    """ numpy module if data is a numpy array. Imported only here, the device never loads it. """
+    if getattr(type(data), '__module__', None) != 'numpy':
+        return None
+    import numpy
+    return numpy
+
+
+class AQI:
+    #  Source https://github.com/pkucmus/micropython-pms7003/blob/master/aqi.py
+    #  Band is the last breakpoint range whose low limit <= concentration. Values between ranges (12.05) use the
+    #  lower range, values over the table extrapolate the last range.
+    #  aqi_batch() is for host side history (Pi): same formula for sequences, bisect or numpy.searchsorted.
+
+    AQI = (
+        (0, 50),
+        (51, 100),
+        (101, 150),
+        (151, 200),
+        (201, 300),
+        (301, 400),
+        (401, 500),
+    )
+
+    _PM2_5 = (
+        (0, 12),
+        (12.1, 35.4),
+        (35.5, 55.4),
+        (55.5, 150.4),
+        (150.5, 250.4),
+        (250.5, 350.4),
+        (350.5, 500.4),
+    )
+
+    _PM10_0 = (
+        (0, 54),
+        (55, 154),
+        (155, 254),
+        (255, 354),
+        (355, 424),
+        (425, 504),
+        (505, 604),
+    )
+
+    @classmethod
+    def PM2_5(cls, data):
+        return cls._calculate_aqi(cls._PM2_5, data)
+
+    @classmethod
+    def PM10_0(cls, data):
+        return cls._calculate_aqi(cls._PM10_0, data)
+
+    @classmethod
+    def _calculate_aqi(cls, breakpoints, data):
+        index = 0
+        for i in range(1, len(breakpoints)):
+            if data < breakpoints[i][0]:
+                break
+            index = i
+        return cls._interpolate(cls.AQI[index], breakpoints[index], data)
+
+    @staticmethod
+    def _interpolate(aqi_range, data_range, data):
+        i_low, i_high = aqi_range
+        c_low, c_high = data_range
+        return (i_high - i_low) / (c_high - c_low) * (data - c_low) + i_low
+
+    @classmethod
+    def aqi(cls, pm2_5_atm, pm10_0_atm):
+        pm2_5 = cls.PM2_5(pm2_5_atm)
+        pm10_0 = cls.PM10_0(pm10_0_atm)
+        return max(pm2_5, pm10_0)
+
+    @classmethod
+    def calculate_batch(cls, breakpoints, data):
+        """ AQI for a sequence of concentrations. numpy array in gives numpy array out, otherwise array('d').
+        Results are equal to _calculate_aqi() value by value. Host only, MicroPython has no bisect. """
+        lows = [r[0] for r in breakpoints]
+        numpy = _numpy(data)
+        if numpy is not None:
+            data = data.astype(numpy.float64)
+            index = numpy.searchsorted(numpy.array(lows, dtype=numpy.float64), data, side='right') - 1
+            numpy.clip(index, 0, len(breakpoints) - 1, out=index)
+            i_low = numpy.array([r[0] for r in cls.AQI], dtype=numpy.float64)[index]
+            i_high = numpy.array([r[1] for r in cls.AQI], dtype=numpy.float64)[index]
+            c_low = numpy.array(lows, dtype=numpy.float64)[index]
+            c_high = numpy.array([r[1] for r in breakpoints], dtype=numpy.float64)[index]
+            return (i_high - i_low) / (c_high - c_low) * (data - c_low) + i_low
+        from array import array
+        from bisect import bisect_right
+        last = len(breakpoints) - 1
+        # Slope and offset per band, same operation order as _interpolate
+        bands = [((cls.AQI[i][1] - cls.AQI[i][0]) / (breakpoints[i][1] - breakpoints[i][0]), breakpoints[i][0],
+                  cls.AQI[i][0]) for i in range(len(breakpoints))]
+        out = array('d', bytes(8 * len(data)))
+        for n, c in enumerate(data):
+            i = bisect_right(lows, c) - 1
+            slope, c_low, i_low = bands[0 if i < 0 else (last if i > last else i)]
+            out[n] = slope * (c - c_low) + i_low
+        return out
+
+    @classmethod
+    def aqi_batch(cls, pm2_5_atm, pm10_0_atm):
+        """ aqi() for two equal length sequences, e.g. PM2.5 and PM10 history from InfluxDB """
+        pm2_5 = cls.calculate_batch(cls._PM2_5, pm2_5_atm)
+        pm10_0 = cls.calculate_batch(cls._PM10_0, pm10_0_atm)
+        numpy = _numpy(pm2_5)
+        if numpy is not None:
+            return numpy.maximum(pm2_5, pm10_0)
+        for n in range(len(pm2_5)):
+            if pm10_0[n] > pm2_5[n]:
+                pm2_5[n] = pm10_0[n]
+        return pm2_5
@@ -43,6 +43,8 @@
 import time
 from ustruct import unpack, unpack_from
 from array import array
+from micropython import const
+import uasyncio as asyncio
 
 # BME280 default address.
 BME280_I2CADDR = 0x76
@@ -110,6 +112,50 @@ class BME280:
                              self._l1_barray)
         self.t_fine = 0
 
+        # Maximum measurement time by the datasheet (9.1), same
+        # oversampling for temperature, pressure and humidity
+        osr = 1 << (self._mode - 1)
+        self.measure_ms = int(1.25 + 3 * 2.3 * osr + 2 * 0.575) + 1
+
+        # Cached numeric readings: temperature C, pressure Pa, humidity %.
+        # read_time is time.time() of the last measurement, None before.
+        # Properties measure again only if the cache is older than max_age
+        # seconds. While read_loop() runs it is the only reader and the
+        # properties return the cache as is, check stale before use.
+        # read_errors counts the failed read_loop() measurements.
+        self.readings = array("f", [0, 0, 0])
+        self.read_time = None
+        self.max_age = 1
+        self.read_errors = 0
+        self._looping = False
+        # integer: measure with the integer compensation into int_readings
+        # and scale only the three results into readings
+        self.integer = False
+        self.measurements = 0
+        self.i2c_transactions = 4  # calibration reads and control write
+
+        # Integer compensation (datasheet 4.2.3): constants folded once
+        self._t1x2 = self.dig_T1 << 1
+        self._p4s16 = self.dig_P4 << 16
+        self._h4s20 = self.dig_H4 << 20
+        self.int_readings = array("i", [0, 0, 0])
+
+    def _start_forced(self):
+        self.measurements += 1
+        self.i2c_transactions += 2
+        self._l1_barray[0] = self._mode
+        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL_HUM,
+                             self._l1_barray)
+        self._l1_barray[0] = self._mode << 5 | self._mode << 2 | MODE_FORCED
+        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL,
+                             self._l1_barray)
+
+    def _busy(self):
+        self.i2c_transactions += 1
+        self.i2c.readfrom_mem_into(self.address, BME280_REGISTER_STATUS,
+                                   self._l1_barray)
+        return self._l1_barray[0] & 0x08
+
     def read_raw_data(self, result):
         """ Reads the raw (uncompensated) data from the sensor.
             Args:
@@ -119,22 +165,39 @@ class BME280:
                 None
         """
 
-        self._l1_barray[0] = self._mode
-        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL_HUM,
-                             self._l1_barray)
-        self._l1_barray[0] = self._mode << 5 | self._mode << 2 | MODE_FORCED
-        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL,
-                             self._l1_barray)
+        self._start_forced()
 
         # Wait for conversion to complete
         for _ in range(BME280_TIMEOUT):
-            if self.i2c.readfrom_mem(self.address, BME280_REGISTER_STATUS, 1)[0] & 0x08:
+            if self._busy():
                 time.sleep_ms(10)  # still busy
             else:
                 break  # Sensor ready
         else:
             raise RuntimeError("Sensor BME280 not ready")
 
+        self._read_burst(result)
+
+    async def read_raw_data_async(self, result):
+        """ As read_raw_data, but the conversion time is awaited instead
+            of polled, so the uasyncio loop is not blocked. Status is
+            checked after measure_ms and then every 1 ms until timeout.
+        """
+
+        self._start_forced()
+        await asyncio.sleep_ms(self.measure_ms)
+        for _ in range(BME280_TIMEOUT):
+            if self._busy():
+                await asyncio.sleep_ms(1)
+            else:
+                break
+        else:
+            raise RuntimeError("Sensor BME280 not ready")
+
+        self._read_burst(result)
+
+    def _read_burst(self, result):
+        self.i2c_transactions += 1
         # burst readout from 0xF7 to 0xFE, recommended by datasheet
         self.i2c.readfrom_mem_into(self.address, 0xF7, self._l8_barray)
         readout = self._l8_barray
@@ -160,6 +223,14 @@ class BME280:
                 from the result parameter if not None
         """
         self.read_raw_data(self._l3_resultarray)
+        return self._compensate(result)
+
+    async def read_compensated_data_async(self, result=None):
+        """ As read_compensated_data, conversion wait does not block """
+        await self.read_raw_data_async(self._l3_resultarray)
+        return self._compensate(result)
+
+    def _compensate(self, result):
         raw_temp, raw_press, raw_hum = self._l3_resultarray
         # temperature
         var1 = (raw_temp/16384.0 - self.dig_T1/1024.0) * self.dig_T2
@@ -200,6 +271,121 @@ class BME280:
 
         return array("f", (temp, pressure, humidity))
 
+    def read_compensated_data_int(self, result=None):
+        """ Datasheet integer compensation, no float math.
+            Returns:
+                array("i") with temperature in 0.01 C, pressure in
+                Pa and humidity in % / 1024 (Q22.10),
+                result or int_readings if result is None
+        """
+        self.read_raw_data(self._l3_resultarray)
+        return self._compensate_int(result)
+
+    async def read_compensated_data_int_async(self, result=None):
+        await self.read_raw_data_async(self._l3_resultarray)
+        return self._compensate_int(result)
+
+    def _compensate_int(self, result):
+        raw_temp, raw_press, raw_hum = self._l3_resultarray
+        if result is None:
+            result = self.int_readings
+
+        # temperature
+        var1 = (((raw_temp >> 3) - self._t1x2) * self.dig_T2) >> 11
+        var2 = (raw_temp >> 4) - self.dig_T1
+        var2 = (((var2 * var2) >> 12) * self.dig_T3) >> 14
+        self.t_fine = t_fine = var1 + var2
+        temp = (t_fine * 5 + 128) >> 8
+        temp = max(-4000, min(8500, temp))
+
+        # pressure, 32 bit formula. Products are kept under 2**30 (MicroPython small int, no heap) for
+        # typical calibration: (32768 + var1) * P1 and p * 6250 // var1 are split.
+        var1 = (t_fine >> 1) - 64000
+        var2 = (((var1 >> 2) * (var1 >> 2)) >> 11) * self.dig_P6
+        var2 = var2 + ((var1 * self.dig_P5) << 1)
+        var2 = (var2 >> 2) + self._p4s16
+        var1 = (((self.dig_P3 * (((var1 >> 2) * (var1 >> 2)) >> 13)) >> 3) + ((self.dig_P2 * var1) >> 1)) >> 18
+        var1 = self.dig_P1 + ((var1 * self.dig_P1) >> 15)
+        if var1 <= 0:
+            pressure = 30000  # avoid division by zero
+        else:
+            p = 1048576 - raw_press - (var2 >> 12)
+            p = (p // var1) * 6250 + ((p % var1) * 6250) // var1
+            var1 = (self.dig_P9 * (((p >> 3) * (p >> 3)) >> 13)) >> 12
+            var2 = ((p >> 2) * self.dig_P8) >> 13
+            pressure = p + ((var1 + var2 + self.dig_P7) >> 4)
+            pressure = max(30000, min(110000, pressure))
+
+        # humidity
+        h = t_fine - 76800
+        h = ((((raw_hum << 14) - self._h4s20 - (self.dig_H5 * h)) + 16384) >> 15) * \
+            (((((((h * self.dig_H6) >> 10) * (((h * self.dig_H3) >> 11) + 32768)) >> 10) + 2097152) *
+              self.dig_H2 + 8192) >> 14)
+        h = h - (((((h >> 15) * (h >> 15)) >> 7) * self.dig_H1) >> 4)
+        h = max(0, min(419430400, h))
+
+        result[0] = temp
+        result[1] = pressure
+        result[2] = h >> 12
+        return result
+
+    @property
+    def stale(self):
+        """ True before the first measurement and if the last one is older than max_age """
+        return self.read_time is None or time.time() - self.read_time >= self.max_age
+
+    def _scale_int(self):
+        """ int_readings into readings as C, Pa and % """
+        t, p, h = self.int_readings
+        self.readings[0] = t / 100
+        self.readings[1] = p
+        self.readings[2] = h / 1024
+
+    def update(self):
+        """ Measures into readings if stale, without read_loop() running """
+        if (self._looping is False) and self.stale:
+            if self.integer is True:
+                self.read_compensated_data_int(self.int_readings)
+                self._scale_int()
+            else:
+                self.read_compensated_data(self.readings)
+            self.read_time = time.time()
+        return self.readings
+
+    async def read_loop(self, interval=10, integer=False):
+        """ One measurement per interval into readings, failures counted in read_errors.
+            integer=True uses the integer compensation, int_readings hold the unscaled values """
+        self.max_age = interval + 5  # one missed measurement turns stale
+        self.integer = integer
+        self._looping = True
+        try:
+            while True:
+                try:
+                    if integer is True:
+                        await self.read_compensated_data_int_async(self.int_readings)
+                        self._scale_int()
+                    else:
+                        await self.read_compensated_data_async(self.readings)
+                    self.read_time = time.time()
+                except (OSError, RuntimeError):
+                    self.read_errors += 1
+                await asyncio.sleep(interval)
+        finally:
+            self._looping = False
+
+    @property
+    def temperature(self):
+        return self.update()[0]
+
+    @property
+    def pressure(self):
+        """ Pa """
+        return self.update()[1]
+
+    @property
+    def humidity(self):
+        return self.update()[2]
+
     @property
     def sealevel(self):
         return self.__sealevel
@@ -216,7 +402,7 @@ class BME280:
         '''
         from math import pow
         try:
-            p = 44330 * (1.0 - pow(self.read_compensated_data()[1] /
+            p = 44330 * (1.0 - pow(self.update()[1] /
                                    self.__sealevel, 0.1903))
         except:
             p = 0.0
@@ -229,7 +415,7 @@ class BME280:
         and Humidity measured pair
         """
         from math import log
-        t, p, h = self.read_compensated_data()
+        t, p, h = self.update()
         h = (log(h, 10) - 2) / 0.4343 + (17.62 * t) / (243.12 + t)
         return 243.12 * h / (17.62 - h)
 
@@ -237,7 +423,7 @@ class BME280:
     def values(self):
         """ human readable values """
 
-        t, p, h = self.read_compensated_data()
+        t, p, h = self.update()
 
         return ("{:.2f}C".format(t), "{:.2f}hPa".format(p/100),
                 "{:.2f}%".format(h))
@@ -0,0 +1,117 @@
+"""
+Declarative table of measurement channels for publishing, display and alarms.
+
+A channel maps a source (function returning the current value or None when not ready) to an MQTT topic, a
+payload format, an alarm threshold and a publish policy. main.py keeps one table; ChannelRegistry.sample() reads
+each source once per cycle into channel.value and sets channel.alarm, publish() adds due channels to an
+MQTT_BATCH.PublishBatcher and the screens read the cached values. Adding a sensor is one line in the table.
+When MQTT is down store() writes the due values to a PUBLISH_LOG.PublishLog instead, log_channels() gives its
+channel table.
+
+Publish policies:
+- POLICY_INTERVAL: publish when at least every seconds have passed since the last publish (0 = every cycle)
+- POLICY_CHANGE: publish when the formatted payload differs from the last published one
+- POLICY_DEADBAND: publish when the value has moved at least deadband from the last published value
+With POLICY_CHANGE and POLICY_DEADBAND every > 0 forces a publish after every seconds anyway (heartbeat).
+
+    channels = ChannelRegistry((
+        Channel('co2', lambda: co2s.co2_average, TOPIC_CO2, '%s', CO2_ALM_THOLD),
+        Channel('temp', temperature, TOPIC_TEMP, '%.2f', TEMP_THOLD, POLICY_DEADBAND, every=600, deadband=0.1),
+    ))
+    channels.sample()
+    channels.publish(batch, time())
+"""
+
+POLICY_INTERVAL = 0
+POLICY_CHANGE = 1
+POLICY_DEADBAND = 2
+
+
+class Channel(object):
+
+    def __init__(self, name, source, topic=None, fmt='%s', threshold=None, policy=POLICY_INTERVAL, every=0,
+                 deadband=0):
+        self.name = name
+        self.source = source
+        self.topic = topic
+        self.fmt = fmt
+        self.threshold = threshold
+        self.policy = policy
+        self.every = every
+        self.deadband = deadband
+        self.value = None
+        self.alarm = False
+        self.last_value = None
+        self.last_payload = None
+        self.last_time = None
+
+    def text(self):
+        return self.fmt % self.value
+
+    def due(self, payload, now):
+        if self.last_time is None:
+            return True
+        age = now - self.last_time
+        if self.policy == POLICY_INTERVAL:
+            return age >= self.every
+        if (self.every > 0) and (age >= self.every):
+            return True
+        if self.policy == POLICY_CHANGE:
+            return payload != self.last_payload
+        return abs(self.value - self.last_value) >= self.deadband
+
+
+class ChannelRegistry(object):
+
+    def __init__(self, channels):
+        self.channels = channels
+        self.ch = {}
+        for channel in channels:
+            self.ch[channel.name] = channel
+        self.alarm = False
+        self.samples = 0
+        self.published = 0
+        self.suppressed = 0
+
+    def sample(self):
+        """ Reads every source once, sets value and alarm. Returns True if any channel is over its threshold. """
+        alarm = False
+        for channel in self.channels:
+            value = channel.source()
+            channel.value = value
+            channel.alarm = (value is not None) and (channel.threshold is not None) and (value > channel.threshold)
+            if channel.alarm:
+                alarm = True
+        self.alarm = alarm
+        self.samples += 1
+        return alarm
+
+    def _due(self, now):
+        """ Yields (index, channel, payload) of channels that have a value, a topic and are due by their policy """
+        for i in range(len(self.channels)):
+            channel = self.channels[i]
+            if (channel.topic is None) or (channel.value is None):
+                continue
+            payload = channel.fmt % channel.value
+            if channel.due(payload, now):
+                channel.last_value = channel.value
+                channel.last_payload = payload
+                channel.last_time = now
+                self.published += 1
+                yield i, channel, payload
+            else:
+                self.suppressed += 1
+
+    def publish(self, batch, now):
+        """ Adds due channels to the batch """
+        for i, channel, payload in self._due(now):
+            batch.add(channel.topic, payload)
+
+    def store(self, log, now):
+        """ Same as publish(), but due values go to the offline log by channel index """
+        for i, channel, payload in self._due(now):
+            log.add(i, channel.value, now)
+
+    def log_channels(self):
+        """ (key, format) per channel for PublishLog, key is the last topic level as in batched messages """
+        return [(c.name if c.topic is None else c.topic[c.topic.rfind('/') + 1:], c.fmt) for c in self.channels]
@@ -0,0 +1,836 @@
+"""
+Host-side simulated SPI/I2C/UART backend for the display and sensor drivers.
+
+Runs ILI9341.Display and SH1106 (SPI or I2C) on a normal Linux Python without hardware. The simulated bus
+records every transaction, counts bytes and transactions and forwards traffic to a panel model, which decodes
+the controller commands into a framebuffer. Framebuffer can be written to PPM or PNG and compared with a
+checksum, so render benchmarks and golden-image regression checks can run on CI.
+
+Usage (esp32/ in sys.path, fonts from the touchscreen project directory):
+
+    import drivers.DISPLAY_SIM as sim
+    display, panel, spi = sim.ili9341_display()
+    display.fill_rectangle(10, 10, 100, 50, 0xF800)
+    print(spi.transactions, spi.bytes_written, spi.estimate_seconds())
+    panel.write_png('screen.png')
+
+SH1106 (drivers/SH1106.py, used by the oled-* projects):
+
+    sim.install_shims()
+    import drivers.SH1106 as sh1106
+    panel = sim.SH1106Panel()
+    dc = sim.SimPin(16)
+    panel.dc = dc
+    oled = sh1106.SH1106_SPI(128, 64, sim.SimSPI(2, device=panel), dc, sim.SimPin(17), sim.SimPin(5))
+
+I2C: panel = sim.SH1106Panel(); i2c = sim.SimI2C(devices={0x3c: panel}); sh1106.SH1106_I2C(128, 64, i2c)
+
+BME280: i2c = sim.SimI2C(devices={0x76: sim.SimBME280()}); BME280(i2c=i2c). Forced conversion takes the datasheet
+maximum measurement time in real time, raw values can be changed with set_raw().
+
+UART sensors: machine.UART is SimUART. Test feeds bytes with uart.feed(data); a device with uart_write(buf)
+returning reply bytes answers commands. uasyncio shim has StreamReader/StreamWriter polling the SimUART.
+
+Network: network.WLAN is SimWLAN (always connected). SimSocket is a non-blocking socket stand-in for MQTT_AS,
+write() takes at most max_write bytes per call and counts writes and bytes, replies are fed with feed().
+
+install_shims() adds host versions of micropython, ustruct, utime, uasyncio, machine, framebuf, uos, usocket,
+uerrno, ubinascii, network and ntptime into sys.modules if the real ones do not exist, and the MicroPython ticks/sleep_ms functions to time. Shim framebuf text() draws
+a box per character, not the real 8x8 font.
+
+python3 ../drivers/DISPLAY_SIM.py [image.png] in the touchscreen project renders a sample screen and prints
+statistics, the PNG is written only when its path is given. tests/test_display_sim.py keeps golden checksums.
+"""
+
+import os
+import struct
+import sys
+import time
+import zlib
+
+
+class SimPin(object):
+    """ machine.Pin lookalike. Keeps level and irq handler, trigger() simulates an edge. """
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 2
+    IRQ_RISING = 1
+
+    def __init__(self, pin_id=None, mode=-1, pull=-1, value=None):
+        self.id = pin_id
+        self.mode = mode
+        self.level = 0 if value is None else value
+        self.handler = None
+        self.irq_trigger = None
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        if value is not None:
+            self.level = value
+
+    def value(self, v=None):
+        if v is None:
+            return self.level
+        self.level = 1 if v else 0
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def on(self):
+        self.level = 1
+
+    def off(self):
+        self.level = 0
+
+    def irq(self, handler=None, trigger=None):
+        self.handler = handler
+        self.irq_trigger = trigger
+
+    def trigger(self, level):
+        """ Set level and call irq handler like the hardware would do on an edge """
+        self.level = level
+        if self.handler is not None:
+            self.handler(self)
+
+
+class SimSPI(object):
+    """ machine.SPI lookalike. Counts transactions and bytes, forwards writes to device.spi_write(). """
+
+    def __init__(self, spi_id=1, baudrate=40000000, device=None, record=False, **kwargs):
+        self.id = spi_id
+        self.baudrate = baudrate
+        self.device = device
+        self.record = record
+        self.log = []
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None:
+            self.baudrate = baudrate
+
+    def deinit(self):
+        pass
+
+    def reset_stats(self):
+        self.log = []
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def write(self, buf):
+        self.transactions += 1
+        self.bytes_written += len(buf)
+        if self.record:
+            self.log.append(bytes(buf))
+        if self.device is not None:
+            self.device.spi_write(buf)
+
+    def write_readinto(self, tx_buf, rx_buf):
+        self.transactions += 1
+        self.bytes_written += len(tx_buf)
+        self.bytes_read += len(rx_buf)
+        if self.record:
+            self.log.append(bytes(tx_buf))
+        if self.device is not None and hasattr(self.device, 'spi_read'):
+            self.device.spi_read(tx_buf, rx_buf)
+        else:
+            for i in range(len(rx_buf)):
+                rx_buf[i] = 0
+
+    def estimate_seconds(self, transaction_us=20):
+        """ Bus time: bits at baudrate plus fixed per transaction overhead (CS toggling, call overhead) """
+        return (self.bytes_written + self.bytes_read) * 8 / self.baudrate + self.transactions * transaction_us / 1e6
+
+
+class SimI2C(object):
+    """ machine.I2C lookalike. Devices are given as {address: device}, device implements i2c_write(buf)
+    and optionally i2c_read_mem(memaddr, nbytes). """
+
+    def __init__(self, i2c_id=0, devices=None, freq=400000, record=False, **kwargs):
+        self.id = i2c_id
+        self.devices = devices if devices is not None else {}
+        self.freq = freq
+        self.record = record
+        self.log = []
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def reset_stats(self):
+        self.log = []
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def _device(self, addr):
+        if addr not in self.devices:
+            raise OSError(19)  # ENODEV, as in MicroPython
+        return self.devices[addr]
+
+    def scan(self):
+        return sorted(self.devices.keys())
+
+    def writeto(self, addr, buf, stop=True):
+        self.transactions += 1
+        self.bytes_written += len(buf)
+        if self.record:
+            self.log.append((addr, bytes(buf)))
+        self._device(addr).i2c_write(buf)
+        return len(buf)
+
+    def writeto_mem(self, addr, memaddr, buf):
+        self.writeto(addr, bytes([memaddr]) + bytes(buf))
+
+    def readfrom_mem(self, addr, memaddr, nbytes):
+        self.transactions += 1
+        self.bytes_read += nbytes
+        if self.record:
+            self.log.append((addr, memaddr, nbytes))
+        return bytes(self._device(addr).i2c_read_mem(memaddr, nbytes))
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        data = self.readfrom_mem(addr, memaddr, len(buf))
+        buf[:] = data
+
+    def estimate_seconds(self):
+        """ 9 clocks per byte + address byte per transaction """
+        return ((self.bytes_written + self.bytes_read) * 9 + self.transactions * 18) / self.freq
+
+
+class SimBME280(object):
+    """ BME280 register model. Calibration is the Bosch datasheet example for T/P and typical H values. """
+    CALIB_TP = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+    CALIB_H = (75, 362, 0, 313, 50, 30)
+
+    def __init__(self, adc_t=519888, adc_p=415148, adc_h=30000):
+        self.regs = bytearray(256)
+        self.regs[0xD0] = 0x60
+        self.regs[0x88:0xA0] = struct.pack('<HhhHhhhhhhhh', *self.CALIB_TP)
+        h1, h2, h3, h4, h5, h6 = self.CALIB_H
+        self.regs[0xA1] = h1
+        self.regs[0xE1:0xE8] = struct.pack('<hBBBBb', h2, h3, (h4 >> 4) & 0xff, (h4 & 0x0f) | ((h5 & 0x0f) << 4),
+                                           (h5 >> 4) & 0xff, h6)
+        self.ready_at = 0
+        self.conversions = 0
+        self.set_raw(adc_t, adc_p, adc_h)
+
+    def set_raw(self, adc_t, adc_p, adc_h):
+        self.regs[0xF7:0xFA] = (adc_p << 4).to_bytes(3, 'big')
+        self.regs[0xFA:0xFD] = (adc_t << 4).to_bytes(3, 'big')
+        self.regs[0xFD:0xFF] = adc_h.to_bytes(2, 'big')
+
+    def i2c_write(self, buf):
+        reg = buf[0]
+        for i, b in enumerate(buf[1:]):
+            self.regs[reg + i] = b
+        if reg == 0xF4 and buf[1] & 0x03 == 1:
+            osr = [(0, 1, 2, 4, 8, 16, 16, 16)[(x >> 0) & 7] for x in (buf[1] >> 5, buf[1] >> 2, self.regs[0xF2])]
+            ms = 1.25 + 2.3 * osr[0] + (2.3 * osr[1] + 0.575 if osr[1] else 0) + \
+                (2.3 * osr[2] + 0.575 if osr[2] else 0)
+            self.ready_at = time.monotonic() + ms / 1000
+            self.conversions += 1
+
+    def i2c_read_mem(self, memaddr, nbytes):
+        if memaddr == 0xF3:
+            self.regs[0xF3] = 0x08 if time.monotonic() < self.ready_at else 0
+        return self.regs[memaddr:memaddr + nbytes]
+
+
+class SimUART(object):
+    """ UART with host-side receive buffer. Bytes come from feed() or from device.uart_write(buf) replies. """
+
+    def __init__(self, uart_id=1, baudrate=9600, device=None, **kwargs):
+        self.uart_id = uart_id
+        self.baudrate = baudrate
+        self.device = device
+        self.rx = bytearray()
+        self.reset_stats()
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None:
+            self.baudrate = baudrate
+
+    def reset_stats(self):
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def feed(self, data):
+        self.rx.extend(data)
+
+    def any(self):
+        return len(self.rx)
+
+    def read(self, nbytes=None):
+        if not self.rx:
+            return None
+        if nbytes is None:
+            nbytes = len(self.rx)
+        data = bytes(self.rx[:nbytes])
+        del self.rx[:nbytes]
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buf, nbytes=None):
+        if not self.rx:
+            return None
+        n = min(len(buf) if nbytes is None else nbytes, len(self.rx))
+        buf[:n] = self.rx[:n]
+        del self.rx[:n]
+        self.bytes_read += n
+        return n
+
+    def write(self, buf):
+        self.bytes_written += len(buf)
+        if self.device is not None:
+            reply = self.device.uart_write(bytes(buf))
+            if reply:
+                self.rx.extend(reply)
+        return len(buf)
+
+
+class SimWLAN(object):
+    """ network.WLAN that is up and connected """
+
+    def __init__(self, interface=0):
+        self.interface = interface
+        self._active = True
+
+    def active(self, value=None):
+        if value is not None:
+            self._active = value
+        return self._active
+
+    def isconnected(self):
+        return self._active
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def scan(self):
+        return []
+
+    def config(self, *args, **kwargs):
+        return 'sim'
+
+    def ifconfig(self, *args):
+        return '10.0.0.2', '255.255.255.0', '10.0.0.1', '10.0.0.1'
+
+    def status(self, *args):
+        return -50
+
+
+class SimSocket(object):
+    """ Non-blocking socket: write() takes up to max_write bytes, read() returns fed bytes or None """
+
+    def __init__(self, max_write=1460):
+        self.max_write = max_write
+        self.rx = bytearray()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.writes = 0
+        self.bytes_written = 0
+
+    def feed(self, data):
+        self.rx.extend(data)
+
+    def setblocking(self, flag):
+        pass
+
+    def connect(self, addr):
+        pass
+
+    def close(self):
+        pass
+
+    def write(self, buf, length=None):
+        n = min(len(buf) if length is None else length, self.max_write)
+        self.writes += 1
+        self.bytes_written += n
+        return n
+
+    def read(self, n):
+        if not self.rx:
+            return None
+        data = bytes(self.rx[:n])
+        del self.rx[:n]
+        return data
+
+
+class Panel(object):
+    """ Common framebuffer output for panel models. Subclass implements pixel_rgb(x, y). """
+
+    width = 0
+    height = 0
+
+    def pixel_rgb(self, x, y):
+        raise NotImplementedError
+
+    def rgb_rows(self):
+        for y in range(self.height):
+            row = bytearray(self.width * 3)
+            for x in range(self.width):
+                row[x * 3:x * 3 + 3] = bytes(self.pixel_rgb(x, y))
+            yield row
+
+    def write_ppm(self, path):
+        with open(path, 'wb') as f:
+            f.write(b'P6\n%d %d\n255\n' % (self.width, self.height))
+            for row in self.rgb_rows():
+                f.write(row)
+
+    def write_png(self, path):
+        raw = bytearray()
+        for row in self.rgb_rows():
+            raw.append(0)  # filter type none
+            raw.extend(row)
+
+        def chunk(tag, data):
+            return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+        with open(path, 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+            f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0)))
+            f.write(chunk(b'IDAT', zlib.compress(bytes(raw), 9)))
+            f.write(chunk(b'IEND', b''))
+
+    def checksum(self):
+        """ CRC32 of the visible image, for golden-image comparison """
+        crc = 0
+        for row in self.rgb_rows():
+            crc = zlib.crc32(row, crc)
+        return crc & 0xffffffff
+
+
+class ILI9341Panel(Panel):
+    """ Decodes ILI9341 SPI traffic: column/page address set and memory write into an RGB565 framebuffer.
+    Framebuffer is in the same logical orientation as the Display object (width x height). """
+
+    SET_COLUMN = 0x2A
+    SET_PAGE = 0x2B
+    WRITE_RAM = 0x2C
+
+    def __init__(self, width=320, height=240, dc=None):
+        self.width = width
+        self.height = height
+        self.dc = dc
+        self.fb = bytearray(width * height * 2)
+        self.commands = {}
+        self.pixels_written = 0
+        self._cmd = None
+        self._args = bytearray()
+        self._x0 = self._x1 = self._y0 = self._y1 = 0
+        self._cx = self._cy = 0
+        self._pending = None
+
+    def reset_stats(self):
+        self.commands = {}
+        self.pixels_written = 0
+
+    def spi_write(self, buf):
+        if self.dc is not None and self.dc.value() == 0:
+            self._cmd = buf[-1]
+            self._args = bytearray()
+            self._pending = None
+            self.commands[self._cmd] = self.commands.get(self._cmd, 0) + 1
+            if self._cmd == self.WRITE_RAM:
+                self._cx = self._x0
+                self._cy = self._y0
+            return
+        if self._cmd == self.WRITE_RAM:
+            self._write_pixels(buf)
+        elif self._cmd in (self.SET_COLUMN, self.SET_PAGE):
+            self._args.extend(buf)
+            if len(self._args) >= 4:
+                a, b = struct.unpack('>HH', self._args[:4])
+                if self._cmd == self.SET_COLUMN:
+                    self._x0, self._x1 = a, b
+                else:
+                    self._y0, self._y1 = a, b
+
+    def _write_pixels(self, buf):
+        data = memoryview(bytes(buf))
+        if self._pending is not None:
+            data = memoryview(bytes([self._pending]) + bytes(data))
+            self._pending = None
+        if len(data) % 2:
+            self._pending = data[-1]
+            data = data[:-1]
+        pos = 0
+        end = len(data)
+        while pos < end and self._cy <= self._y1:
+            run = min((self._x1 - self._cx + 1) * 2, end - pos)
+            if 0 <= self._cy < self.height and self._cx < self.width:
+                visible = min(run, (self.width - self._cx) * 2)
+                o = (self._cy * self.width + self._cx) * 2
+                self.fb[o:o + visible] = data[pos:pos + visible]
+            pos += run
+            self._cx += run // 2
+            self.pixels_written += run // 2
+            if self._cx > self._x1:
+                self._cx = self._x0
+                self._cy += 1
+
+    def pixel(self, x, y):
+        """ RGB565 value at x, y """
+        o = (y * self.width + x) * 2
+        return self.fb[o] << 8 | self.fb[o + 1]
+
+    def pixel_rgb(self, x, y):
+        c = self.pixel(x, y)
+        r = (c >> 11) & 0x1f
+        g = (c >> 5) & 0x3f
+        b = c & 0x1f
+        return (r << 3 | r >> 2), (g << 2 | g >> 4), (b << 3 | b >> 2)
+
+    def rgb_rows(self):
+        for y in range(self.height):
+            row = bytearray(self.width * 3)
+            o = y * self.width * 2
+            for x in range(self.width):
+                c = self.fb[o] << 8 | self.fb[o + 1]
+                r = (c >> 11) & 0x1f
+                g = (c >> 5) & 0x3f
+                b = c & 0x1f
+                row[x * 3] = r << 3 | r >> 2
+                row[x * 3 + 1] = g << 2 | g >> 4
+                row[x * 3 + 2] = b << 3 | b >> 2
+                o += 2
+            yield row
+
+
+class SH1106Panel(Panel):
+    """ Decodes SH1106 page/column commands and data into 132 x 64 display RAM. Works with SPI (set dc pin)
+    and I2C (control byte 0x80 = command, 0x40 = data). Visible image starts from column 2. """
+
+    RAM_WIDTH = 132
+
+    def __init__(self, width=128, height=64, dc=None, col_offset=2):
+        self.width = width
+        self.height = height
+        self.dc = dc
+        self.col_offset = col_offset
+        self.ram = bytearray(self.RAM_WIDTH * (height // 8))
+        self.commands = {}
+        self.display_on = False
+        self.inverted = False
+        self.contrast = 0x80
+        self._page = 0
+        self._col = 0
+        self._expect_contrast = False
+
+    def reset_stats(self):
+        self.commands = {}
+
+    def spi_write(self, buf):
+        if self.dc is not None and self.dc.value() == 0:
+            for c in buf:
+                self._command(c)
+        else:
+            self._data(buf)
+
+    def i2c_write(self, buf):
+        if buf[0] == 0x80:
+            self._command(buf[1])
+        elif buf[0] == 0x40:
+            self._data(buf[1:])
+        else:
+            for c in buf[1:]:
+                self._command(c)
+
+    def _command(self, c):
+        self.commands[c] = self.commands.get(c, 0) + 1
+        if self._expect_contrast:
+            self.contrast = c
+            self._expect_contrast = False
+        elif c == 0x81:
+            self._expect_contrast = True
+        elif 0xB0 <= c <= 0xB7:
+            self._page = c & 0x07
+        elif c <= 0x0F:
+            self._col = (self._col & 0xF0) | c
+        elif 0x10 <= c <= 0x1F:
+            self._col = (self._col & 0x0F) | ((c & 0x0F) << 4)
+        elif c in (0xAE, 0xAF):
+            self.display_on = c == 0xAF
+        elif c in (0xA6, 0xA7):
+            self.inverted = c == 0xA7
+
+    def _data(self, buf):
+        pages = self.height // 8
+        if self._page >= pages:
+            return
+        for b in buf:
+            if self._col < self.RAM_WIDTH:
+                self.ram[self._page * self.RAM_WIDTH + self._col] = b
+            self._col += 1
+
+    def pixel(self, x, y):
+        bit = (self.ram[(y >> 3) * self.RAM_WIDTH + x + self.col_offset] >> (y & 7)) & 1
+        return bit ^ self.inverted
+
+    def pixel_rgb(self, x, y):
+        return (255, 255, 255) if self.pixel(x, y) else (0, 0, 0)
+
+
+def _make_framebuf_module():
+    """ Minimal framebuf for SH1106 on the host: MVLSB only """
+    mod = type(sys)('framebuf')
+    mod.MONO_VLSB = mod.MVLSB = 0
+    mod.RGB565 = 1
+
+    class FrameBuffer(object):
+        def __init__(self, buf, width, height, fmt, stride=None):
+            self.buf = buf
+            self.width = width
+            self.height = height
+            self.fmt = fmt
+
+        def pixel(self, x, y, c=None):
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                return None
+            i = (y >> 3) * self.width + x
+            if c is None:
+                return (self.buf[i] >> (y & 7)) & 1
+            if c:
+                self.buf[i] |= 1 << (y & 7)
+            else:
+                self.buf[i] &= ~(1 << (y & 7)) & 0xff
+
+        def fill_rect(self, x, y, w, h, c):
+            for yy in range(max(y, 0), min(y + h, self.height)):
+                for xx in range(max(x, 0), min(x + w, self.width)):
+                    self.pixel(xx, yy, c)
+
+        def fill(self, c):
+            v = 0xff if c else 0
+            for i in range(len(self.buf)):
+                self.buf[i] = v
+
+        def hline(self, x, y, w, c):
+            self.fill_rect(x, y, w, 1, c)
+
+        def vline(self, x, y, h, c):
+            self.fill_rect(x, y, 1, h, c)
+
+        def rect(self, x, y, w, h, c):
+            self.hline(x, y, w, c)
+            self.hline(x, y + h - 1, w, c)
+            self.vline(x, y, h, c)
+            self.vline(x + w - 1, y, h, c)
+
+        def line(self, x1, y1, x2, y2, c):
+            dx = abs(x2 - x1)
+            dy = -abs(y2 - y1)
+            sx = 1 if x1 < x2 else -1
+            sy = 1 if y1 < y2 else -1
+            err = dx + dy
+            while True:
+                self.pixel(x1, y1, c)
+                if x1 == x2 and y1 == y2:
+                    break
+                e2 = 2 * err
+                if e2 >= dy:
+                    err += dy
+                    x1 += sx
+                if e2 <= dx:
+                    err += dx
+                    y1 += sy
+
+        def text(self, s, x, y, c=1):
+            # Placeholder glyph: 6 x 7 box per character, keeps layout and bus traffic realistic
+            for i in range(len(s)):
+                if s[i] != ' ':
+                    self.rect(x + i * 8, y, 6, 7, c)
+
+        def scroll(self, xstep, ystep):
+            old = FrameBuffer(bytearray(self.buf), self.width, self.height, self.fmt)
+            self.fill(0)
+            for y in range(self.height):
+                for x in range(self.width):
+                    if old.pixel(x, y):
+                        self.pixel(x + xstep, y + ystep, 1)
+
+        def blit(self, fbuf, x, y, key=-1):
+            for yy in range(fbuf.height):
+                for xx in range(fbuf.width):
+                    c = fbuf.pixel(xx, yy)
+                    if c != key:
+                        self.pixel(x + xx, y + yy, c)
+
+    mod.FrameBuffer = FrameBuffer
+    return mod
+
+
+def _make_utime_module():
+    mod = type(sys)('utime')
+    for name in ('time', 'sleep', 'localtime', 'mktime', 'gmtime'):
+        setattr(mod, name, getattr(time, name))
+    mod.sleep_ms = lambda ms: time.sleep(ms / 1000)
+    mod.sleep_us = lambda us: time.sleep(us / 1000000)
+    mod.ticks_ms = lambda: int(time.monotonic() * 1000) & 0x3fffffff
+    mod.ticks_us = lambda: int(time.monotonic() * 1000000) & 0x3fffffff
+    mod.ticks_add = lambda t, d: (t + d) & 0x3fffffff
+    mod.ticks_diff = lambda a, b: ((a - b + 0x20000000) & 0x3fffffff) - 0x20000000
+    return mod
+
+
+def _make_stream_class(asyncio):
+
+    class Stream(object):
+        """ uasyncio Stream over a non-blocking object with any/read/readinto/write (SimUART) """
+
+        def __init__(self, s, e=None):
+            self.s = s
+            self.out_buf = b''
+
+        async def _wait(self):
+            while not self.s.any():
+                await asyncio.sleep(0)
+
+        async def read(self, n=-1):
+            await self._wait()
+            return self.s.read(None if n < 0 else n)
+
+        async def readinto(self, buf):
+            await self._wait()
+            return self.s.readinto(buf)
+
+        async def readexactly(self, n):
+            r = b''
+            while len(r) < n:
+                r += await self.read(n - len(r))
+            return r
+
+        async def readline(self):
+            r = b''
+            while not r.endswith(b'\n'):
+                r += await self.read(1)
+            return r
+
+        def write(self, buf):
+            self.out_buf += buf
+
+        async def drain(self):
+            self.s.write(self.out_buf)
+            self.out_buf = b''
+
+        async def awrite(self, buf, off=0, sz=-1):
+            self.s.write(buf[off:] if sz < 0 else buf[off:off + sz])
+
+        def close(self):
+            pass
+
+        async def wait_closed(self):
+            pass
+
+    return Stream
+
+
+def install_shims():
+    """ Register host versions of MicroPython-only modules unless the real ones are importable """
+    def missing(name):
+        if name in sys.modules:
+            return False
+        try:
+            __import__(name)
+            return False
+        except ImportError:
+            return True
+
+    if missing('micropython'):
+        mod = type(sys)('micropython')
+        mod.const = lambda x: x
+        mod.alloc_emergency_exception_buf = lambda n: None
+        mod.schedule = lambda f, arg: f(arg)
+        sys.modules['micropython'] = mod
+    if missing('ustruct'):
+        sys.modules['ustruct'] = struct
+    if missing('utime'):
+        sys.modules['utime'] = _make_utime_module()
+    if missing('uos'):
+        import os
+        sys.modules['uos'] = os
+    for name, host in (('usocket', 'socket'), ('uerrno', 'errno'), ('ubinascii', 'binascii')):
+        if missing(name):
+            sys.modules[name] = __import__(host)
+    if missing('network'):
+        mod = type(sys)('network')
+        mod.WLAN = SimWLAN
+        mod.STA_IF = 0
+        mod.AP_IF = 1
+        sys.modules['network'] = mod
+    if missing('ntptime'):
+        mod = type(sys)('ntptime')
+        mod.host = 'pool.ntp.org'
+        mod.settime = lambda: None  # Host clock is already right
+        sys.modules['ntptime'] = mod
+    if not hasattr(time, 'sleep_ms'):
+        # MicroPython time module has the utime functions too
+        for name in ('sleep_ms', 'sleep_us', 'ticks_ms', 'ticks_us', 'ticks_add', 'ticks_diff'):
+            setattr(time, name, getattr(sys.modules['utime'], name))
+    if missing('machine'):
+        mod = type(sys)('machine')
+        mod.Pin = SimPin
+        mod.SPI = SimSPI
+        mod.I2C = SimI2C
+        mod.UART = SimUART
+        mod.unique_id = lambda: b'\x24\x0a\xc4\x00\x00\x01'
+        sys.modules['machine'] = mod
+    if missing('framebuf'):
+        sys.modules['framebuf'] = _make_framebuf_module()
+    if missing('uasyncio'):
+        import asyncio
+        mod = type(sys)('uasyncio')
+        mod.__dict__.update(asyncio.__dict__)
+        mod.sleep_ms = lambda ms: asyncio.sleep(ms / 1000)
+        mod.StreamReader = mod.StreamWriter = mod.Stream = _make_stream_class(asyncio)
+        sys.modules['uasyncio'] = mod
+
+
+def ili9341_display(width=320, height=240, rotation=90, baudrate=40000000, record=False):
+    """ Build ILI9341 Display on the simulated bus. Returns display, panel and spi. Init traffic is cleared
+    from statistics so that numbers start from the first draw call. """
+    install_shims()
+    from drivers.ILI9341 import Display
+    dc = SimPin(4)
+    panel = ILI9341Panel(width, height, dc)
+    spi = SimSPI(1, baudrate=baudrate, device=panel, record=record)
+    display = Display(spi, cs=SimPin(15), dc=dc, rst=SimPin(2), width=width, height=height, rotation=rotation)
+    spi.reset_stats()
+    panel.reset_stats()
+    return display, panel, spi
+
+
+def _demo(png_path=None):
+    display, panel, spi = ili9341_display()
+    from drivers.ILI9341 import color565
+    from drivers.XGLCD_FONT import XglcdFont
+    font = XglcdFont('fonts/Unispace12x24.c', 12, 24)
+    t = time.perf_counter()
+    display.fill_rectangle(0, 0, display.width, display.height, color565(255, 255, 0))
+    display.fill_rectangle(10, 10, display.width - 20, display.height - 20, color565(128, 255, 128))
+    for row in range(7):
+        display.draw_text(12, 25 + row * 26, "Row %s simulated" % row, font, color565(0, 0, 255),
+                          color565(128, 255, 128))
+    host = time.perf_counter() - t
+    print("Transactions: %s bytes: %s pixels: %s" % (spi.transactions, spi.bytes_written, panel.pixels_written))
+    print("Estimated bus time at %s Hz: %.3f s, host time %.3f s" % (spi.baudrate, spi.estimate_seconds(), host))
+    print("Checksum: %08x" % panel.checksum())
+    if png_path is not None:
+        panel.write_png(png_path)
+        print("Image written to %s" % os.path.abspath(png_path))
+
+
+if __name__ == "__main__":
+    # Shared drivers package is in esp32/, fonts are read from the working directory (touchscreen project)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    _demo(sys.argv[1] if len(sys.argv) > 1 else None)
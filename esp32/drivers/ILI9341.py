@@ -7,6 +7,8 @@ from time import sleep
 from math import cos, sin, pi, radians
 from sys import implementation
 from micropython import const
+from utime import ticks_ms, ticks_diff
+import uasyncio as asyncio
 import ustruct
 
 
@@ -84,7 +86,8 @@ class Display(object):
     }
 
     def __init__(self, spi, cs, dc, rst,
-                 width=240, height=320, rotation=0):
+                 width=240, height=320, rotation=0, chunk_size=2048,
+                 time_slice_ms=10):
         """Initialize OLED.
         Args:
             spi (Class Spi):  SPI interface for OLED
@@ -94,6 +97,9 @@ class Display(object):
             width (Optional int): Screen width (default 240)
             height (Optional int): Screen height (default 320)
             rotation (Optional int): Rotation must be 0 default, 90. 180 or 270
+            chunk_size (Optional int): Fill buffer size in bytes (default 2048)
+            time_slice_ms (Optional int): Async drawing yields to scheduler
+                after this many milliseconds (default 10)
         """
         self.spi = spi
         self.cs = cs
@@ -101,6 +107,12 @@ class Display(object):
         self.rst = rst
         self.width = width
         self.height = height
+        self.set_chunk_size(chunk_size)
+        self._rle_buf = bytearray(96)  # draw_rle_image reads, 32 runs
+        self._rle_mv = memoryview(self._rle_buf)
+        self.time_slice_ms = time_slice_ms
+        self.max_block_ms = 0
+        self._slice_start = ticks_ms()
         if rotation not in self.ROTATE.keys():
             raise RuntimeError('Rotation must be 0, 90, 180 or 270.')
         else:
@@ -151,10 +163,7 @@ class Display(object):
             y1 (int):  Ending Y position.
             data (bytes): Data buffer to write.
         """
-        self.write_cmd(self.SET_COLUMN, *ustruct.pack(">HH", x0, x1))
-        self.write_cmd(self.SET_PAGE, *ustruct.pack(">HH", y0, y1))
-
-        self.write_cmd(self.WRITE_RAM)
+        self.set_window(x0, y0, x1, y1)
         self.write_data(data)
 
     def cleanup(self):
@@ -169,15 +178,8 @@ class Display(object):
         Args:
             color (Optional int): RGB565 color value (Default: 0 = Black).
         """
-        w = self.width
-        h = self.height
-        # Clear display in 1024 byte blocks
-        if color:
-            line = color.to_bytes(2, 'big') * (w * 8)
-        else:
-            line = bytearray(w * 16)
-        for y in range(0, h, 8):
-            self.block(0, y, w - 1, y + 7, line)
+        # Clear display in chunk_size blocks
+        self.fill_hrect(0, 0, self.width, self.height, color)
 
     def display_off(self):
         """Turn display off."""
@@ -197,8 +199,93 @@ class Display(object):
         """
         if self.is_off_grid(x, y, x + w - 1, y):
             return
-        line = color.to_bytes(2, 'big') * w
-        self.block(x, y, x + w - 1, y, line)
+        self.block(x, y, x + w - 1, y, self.fill_buffer(color, w * 2))
+
+    def draw_image(self, path, x=0, y=0, w=320, h=240):
+        """Draw image from flash.
+        Args:
+            path (string): Image file path, raw RGB565 big endian row by row.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of image.
+            h (int): Height of image.
+        Note:
+            File is streamed through the fill buffer in chunk_size blocks
+            into one memory write, RAM use does not depend on image size.
+        """
+        x2 = x + w - 1
+        y2 = y + h - 1
+        if self.is_off_grid(x, y, x2, y2):
+            return
+        self._fill_color = None  # Fill buffer is overwritten
+        buf = self._fill_mv
+        left = w * h * 2
+        self.set_window(x, y, x2, y2)
+        with open(path, 'rb') as f:
+            while left:
+                n = f.readinto(buf if left >= self.chunk_size else buf[0:left])
+                if not n:
+                    break
+                self.write_data(buf[0:n])
+                left -= n
+
+    def draw_rle_image(self, path, x=0, y=0, w=320, h=240):
+        """Draw run length encoded image from flash.
+        Args:
+            path (string): Image file path.
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of image.
+            h (int): Height of image.
+        Note:
+            File is a sequence of 3 byte runs: pixel count (1-255) and
+            RGB565 color big endian. tools/img2rgb565.py creates them.
+            Runs are expanded into the fill buffer, RAM use is constant.
+        """
+        x2 = x + w - 1
+        y2 = y + h - 1
+        if self.is_off_grid(x, y, x2, y2):
+            return
+        self._fill_color = None  # Fill buffer is overwritten
+        out = self._fill_mv
+        size = self.chunk_size
+        runs = self._rle_buf
+        carry = 0  # bytes of a run split by a short read
+        pos = 0
+        left = w * h * 2
+        self.set_window(x, y, x2, y2)
+        with open(path, 'rb') as f:
+            while left:
+                if carry:
+                    n = f.readinto(self._rle_mv[carry:])
+                else:
+                    n = f.readinto(runs)
+                if not n:
+                    break
+                n += carry
+                end = n - n % 3
+                for i in range(0, end, 3):
+                    run = min(runs[i] * 2, left)
+                    left -= run
+                    while run:
+                        if pos == size:
+                            self.write_data(out)
+                            pos = 0
+                        k = min(run, size - pos)
+                        out[pos] = runs[i + 1]
+                        out[pos + 1] = runs[i + 2]
+                        filled = 2
+                        while filled < k:
+                            c = min(filled, k - filled)
+                            out[pos + filled:pos + filled + c] = out[pos:pos + c]
+                            filled += c
+                        pos += k
+                        run -= k
+                carry = n - end
+                for i in range(carry):
+                    runs[i] = runs[end + i]
+        if pos:
+            self.write_data(out[0:pos])
 
     def draw_letter(self, x, y, letter, font, color, background=0,
                     landscape=False):
@@ -309,7 +396,7 @@ class Display(object):
         """
         if self.is_off_grid(x, y, x, y):
             return
-        self.block(x, y, x, y, color.to_bytes(2, 'big'))
+        self.block(x, y, x, y, self.fill_buffer(color, 2))
 
     def draw_rectangle(self, x, y, w, h, color):
         """Draw a rectangle.
@@ -368,6 +455,28 @@ class Display(object):
                 # # Position x for next letter
                 # x += w + spacing
 
+    async def draw_text_async(self, x, y, text, font, color, background=0,
+                              spacing=1):
+        """Draw text (portrait), yield to scheduler between letters.
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            text (string): Text to draw.
+            font (XglcdFont object): Font.
+            color (int): RGB565 color value.
+            background (int): RGB565 background color (default: black).
+            spacing (int): Pixels between letters (default: 1)
+        """
+        for letter in text:
+            w, h = self.draw_letter(x, y, letter, font, color, background)
+            if w == 0 or h == 0:
+                print('Invalid width {0} or height {1}'.format(w, h))
+                return
+            if spacing:
+                self.fill_hrect(x + w, y, spacing, h, background)
+            x += (w + spacing)
+            await self.pause()
+
     def draw_vline(self, x, y, h, color):
         """Draw a vertical line.
         Args:
@@ -379,8 +488,7 @@ class Display(object):
         # Confirm coordinates in boundary
         if self.is_off_grid(x, y, x, y + h):
             return
-        line = color.to_bytes(2, 'big') * h
-        self.block(x, y, x, y + h - 1, line)
+        self.block(x, y, x, y + h - 1, self.fill_buffer(color, h * 2))
 
     def fill_hrect(self, x, y, w, h, color):
         """Draw a filled rectangle (optimized for horizontal drawing).
@@ -393,12 +501,11 @@ class Display(object):
         """
         if self.is_off_grid(x, y, x + w - 1, y + h - 1):
             return
-        chunk_height = 1024 // w
+        chunk_height = self.chunk_size // (w * 2)
         chunk_count, remainder = divmod(h, chunk_height)
-        chunk_size = chunk_height * w
         chunk_y = y
         if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
+            buf = self.fill_buffer(color, chunk_height * w * 2)
             for c in range(0, chunk_count):
                 self.block(x, chunk_y,
                            x + w - 1, chunk_y + chunk_height - 1,
@@ -406,11 +513,32 @@ class Display(object):
                 chunk_y += chunk_height
 
         if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * w
+            buf = self.fill_buffer(color, remainder * w * 2)
             self.block(x, chunk_y,
                        x + w - 1, chunk_y + remainder - 1,
                        buf)
 
+    async def fill_hrect_async(self, x, y, w, h, color):
+        """Draw a filled rectangle, yield to scheduler between chunks.
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        """
+        if self.is_off_grid(x, y, x + w - 1, y + h - 1):
+            return
+        chunk_height = self.chunk_size // (w * 2)
+        chunk_y = y
+        end_y = y + h
+        while chunk_y < end_y:
+            rows = min(chunk_height, end_y - chunk_y)
+            self.block(x, chunk_y, x + w - 1, chunk_y + rows - 1,
+                       self.fill_buffer(color, rows * w * 2))
+            chunk_y += rows
+            await self.pause()
+
     def fill_rectangle(self, x, y, w, h, color):
         """Draw a filled rectangle.
         Args:
@@ -427,6 +555,46 @@ class Display(object):
         else:
             self.fill_vrect(x, y, w, h, color)
 
+    async def fill_rectangle_async(self, x, y, w, h, color):
+        """Draw a filled rectangle, yield to scheduler between chunks.
+        Args:
+            x (int): Starting X position.
+            y (int): Starting Y position.
+            w (int): Width of rectangle.
+            h (int): Height of rectangle.
+            color (int): RGB565 color value.
+        Note:
+            Rows are always written horizontally. Blocking time is bounded
+            by one chunk_size write.
+        """
+        await self.fill_hrect_async(x, y, w, h, color)
+
+    def fill_buffer(self, color, nbytes):
+        """Return scratch buffer filled with color.
+        Args:
+            color (int): RGB565 color value.
+            nbytes (int): Bytes needed, at most chunk_size.
+        Returns:
+            memoryview: nbytes long view to the preallocated buffer.
+        Note:
+            Buffer is filled by doubling copies and reused while color stays
+            the same, so repeated fills do not allocate.
+        """
+        buf = self._fill_mv
+        if color != self._fill_color:
+            buf[0] = color >> 8
+            buf[1] = color & 0xFF
+            self._fill_color = color
+            self._fill_len = 2
+        filled = self._fill_len
+        while filled < nbytes:
+            n = min(filled, nbytes - filled)
+            buf[filled:filled + n] = buf[0:n]
+            filled += n
+        if filled > self._fill_len:
+            self._fill_len = filled
+        return buf[0:nbytes]
+
     def fill_polygon(self, sides, x0, y0, r, color, rotate=0):
         """Draw a filled n-sided regular polygon.
         Args:
@@ -519,12 +687,11 @@ class Display(object):
         """
         if self.is_off_grid(x, y, x + w - 1, y + h - 1):
             return
-        chunk_width = 1024 // h
+        chunk_width = self.chunk_size // (h * 2)
         chunk_count, remainder = divmod(w, chunk_width)
-        chunk_size = chunk_width * h
         chunk_x = x
         if chunk_count:
-            buf = color.to_bytes(2, 'big') * chunk_size
+            buf = self.fill_buffer(color, chunk_width * h * 2)
             for c in range(0, chunk_count):
                 self.block(chunk_x, y,
                            chunk_x + chunk_width - 1, y + h - 1,
@@ -532,7 +699,7 @@ class Display(object):
                 chunk_x += chunk_width
 
         if remainder:
-            buf = color.to_bytes(2, 'big') * remainder * h
+            buf = self.fill_buffer(color, remainder * h * 2)
             self.block(chunk_x, y,
                        chunk_x + remainder - 1, y + h - 1,
                        buf)
@@ -563,6 +730,19 @@ class Display(object):
             return True
         return False
 
+    async def pause(self):
+        """Yield to scheduler if time slice is used up.
+        Note:
+            Longest time between yields is kept in max_block_ms, reset it
+            with start_frame().
+        """
+        busy = ticks_diff(ticks_ms(), self._slice_start)
+        if busy >= self.time_slice_ms:
+            if busy > self.max_block_ms:
+                self.max_block_ms = busy
+            await asyncio.sleep_ms(0)
+            self._slice_start = ticks_ms()
+
     def reset_cpy(self):
         """Perform reset: Low=initialization, High=normal operation.
         Notes: CircuitPython implemntation
@@ -588,6 +768,18 @@ class Display(object):
         """
         self.write_cmd(self.VSCRSADD, y >> 8, y & 0xFF)
 
+    def set_chunk_size(self, chunk_size):
+        """Allocate fill buffer used by fills, lines and clear.
+        Args:
+            chunk_size (int): Bytes per SPI block write. At least one full
+                row or column (2 * max(width, height)) is always allocated.
+        """
+        self.chunk_size = max(chunk_size, 2 * max(self.width, self.height)) & ~1
+        self._fill_buf = bytearray(self.chunk_size)
+        self._fill_mv = memoryview(self._fill_buf)
+        self._fill_color = None
+        self._fill_len = 0
+
     def set_scroll(self, top, bottom):
         """Set the height of the top and bottom scroll margins.
         Args:
@@ -605,6 +797,30 @@ class Display(object):
                            bottom >> 8,
                            bottom & 0xFF)
 
+    def set_window(self, x0, y0, x1, y1):
+        """Set memory write window, following data fills it row by row.
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+        """
+        self.write_cmd(self.SET_COLUMN, *ustruct.pack(">HH", x0, x1))
+        self.write_cmd(self.SET_PAGE, *ustruct.pack(">HH", y0, y1))
+        self.write_cmd(self.WRITE_RAM)
+
+    def start_frame(self):
+        """Start time slice and blocking interval measurement for a frame."""
+        self.max_block_ms = 0
+        self._slice_start = ticks_ms()
+
+    def end_frame(self):
+        """Include the interval after last yield and return max_block_ms."""
+        busy = ticks_diff(ticks_ms(), self._slice_start)
+        if busy > self.max_block_ms:
+            self.max_block_ms = busy
+        return self.max_block_ms
+
     def write_cmd_mpy(self, command, *args):
         """Write command to OLED (MicroPython).
         Args:
@@ -15,11 +15,18 @@ if reset_cause() == 1:
 
 20.01.2020: Added crc_errors and range_error counters. CRC error increase if bytearray is wrong, range error
             increase if read value is over sensor's set range.
+
+Command channel: one StreamReader/StreamWriter pair is kept for the UART. command() holds a lock for the whole
+request/response, so callers queue up in order and a reply can not be taken by another command. Reply wait is
+limited by cmd_timeout (timeouts counter). The datasheet 2 second minimum is kept only between read commands.
+Calibration and range methods are coroutines: await co2s.selfcalibration_off()
 """
 
 import utime
 from machine import UART
 import uasyncio as asyncio
+from utime import ticks_ms, ticks_diff
+from drivers.RUNNING_AVERAGE import RunningAverage
 
 
 class MHZ19bCO2:
@@ -29,13 +36,20 @@ class MHZ19bCO2:
         self.sensor = UART(uart, baudrate=9600, bits=8, parity=None, stop=1, rx=rxpin, tx=txpin)
         self.zeropoint_calibrated = False
         self.co2_value = None
-        self.co2_averages = []
         self.co2_average_values = 20
+        self.co2_averages = RunningAverage(self.co2_average_values)
         self.co2_average = None
         self.sensor_activation_time = utime.time()
         self.value_read_time = utime.time()
         self.crc_errors = 0
         self.range_errors = 0
+        self.timeouts = 0
+        self.cmd_timeout = 2      # seconds to wait for reply
+        self.read_gap_ms = 2000   # minimum time between read commands
+        self._last_read = None
+        self.port = asyncio.StreamReader(self.sensor)
+        self.out = asyncio.StreamWriter(self.sensor, {})
+        self.lock = asyncio.Lock()
         self.measuring_range = '0_5000'  # default
         self.preheat_time = 180   # shall be 180 or more, during testing you can use 10 sec
         self.read_interval = 120  # shall be 120 or more
@@ -48,15 +62,33 @@ class MHZ19bCO2:
         self.MEASURING_RANGE_0_5000PPM = bytearray(b'\xFF\x01\x99\x00\x00\x00\x13\x88\xCB')
         self.MEASURING_RANGE_0_10000PPM = bytearray(b'\xFF\x01\x99\x00\x00\x00\x27\x10\x2F')
 
+    async def command(self, data, reply=False):
+        """ Send command, with reply=True return 9 byte response or None if sensor did not answer in time """
+        async with self.lock:
+            # Drop bytes left from an earlier timed out reply
+            while self.sensor.any():
+                self.sensor.read()
+            if data[2] == self.READ_COMMAND[2]:
+                if self._last_read is not None:
+                    gap = self.read_gap_ms - ticks_diff(ticks_ms(), self._last_read)
+                    if gap > 0:
+                        await asyncio.sleep_ms(gap)
+                self._last_read = ticks_ms()
+            await self.writer(data)
+            if not reply:
+                return None
+            try:
+                return await asyncio.wait_for(self.reader(9), self.cmd_timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                return None
+
     async def writer(self, data):
-        port = asyncio.StreamWriter(self.sensor, {})
-        port.write(data)
-        await port.drain()    # Transmit begins
-        await asyncio.sleep(2)   # Minimum read frequency 2 seconds
+        self.out.write(data)
+        await self.out.drain()    # Transmit begins
 
     async def reader(self, chars):
-        port = asyncio.StreamReader(self.sensor)
-        data = await port.readexactly(chars)
+        data = await self.port.readexactly(chars)
         return data
 
     async def read_co2_loop(self):
@@ -66,9 +98,10 @@ class MHZ19bCO2:
                 await asyncio.sleep(self.read_interval)
             elif (utime.time() - self.value_read_time) > self.read_interval:
                 try:
-                    await self.writer(self.READ_COMMAND)
-                    readbuffer = bytearray(await self.reader(9))
-                    if readbuffer[0] == 0xff and self._calculate_crc(readbuffer) == readbuffer[8]:
+                    readbuffer = await self.command(self.READ_COMMAND, True)
+                    if readbuffer is None:
+                        pass
+                    elif readbuffer[0] == 0xff and self._calculate_crc(readbuffer) == readbuffer[8]:
                         self.co2_value = self._data_to_co2_level(readbuffer)
                         if self.co2_value > int(self.measuring_range):
                             self.co2_value = None
@@ -84,41 +117,39 @@ class MHZ19bCO2:
 
     def calculate_average(self, co2):
         if co2 is not None:
-            self.co2_averages.append(co2)
-            self.co2_average = (sum(self.co2_averages) / len(self.co2_averages))
-            #  read 20 values, delete oldest
-        if len(self.co2_averages) == self.co2_average_values:
-            self.co2_averages.pop(0)
+            #  Average of last 20 values
+            self.co2_averages.add(co2)
+            self.co2_average = self.co2_averages.mean
 
-    def calibrate_zeropoint(self):
+    async def calibrate_zeropoint(self):
         if utime.time() - self.sensor_activation_time > (20 * 60):
-            self.writer(self.CALIBRATE_ZEROPOINT)
+            await self.command(self.CALIBRATE_ZEROPOINT)
             self.zeropoint_calibrated = True
         else:
             print("Prior calibration sensor must be heated at least 20 minutes!")
 
-    def calibrate_span(self):
+    async def calibrate_span(self):
         if self.zeropoint_calibrated is True:
-            self.writer(self.CALIBRATE_SPAN)
+            await self.command(self.CALIBRATE_SPAN)
         else:
             print("Zeropoint must be calibrated first!")
 
-    def selfcalibration_on(self):
-        self.writer(self.SELF_CALIBRATION_ON)
+    async def selfcalibration_on(self):
+        await self.command(self.SELF_CALIBRATION_ON)
 
-    def selfcalibration_off(self):
-        self.writer(self.SELF_CALIBRATION_OFF)
+    async def selfcalibration_off(self):
+        await self.command(self.SELF_CALIBRATION_OFF)
 
-    def measuring_range_0_2000_ppm(self):
-        self.writer(self.MEASURING_RANGE_0_2000PPM)
+    async def measuring_range_0_2000_ppm(self):
+        await self.command(self.MEASURING_RANGE_0_2000PPM)
         self.measuring_range = '0_2000'
 
-    def measuring_range_0_5000_ppm(self):
-        self.writer(self.MEASURING_RANGE_0_5000PPM)
+    async def measuring_range_0_5000_ppm(self):
+        await self.command(self.MEASURING_RANGE_0_5000PPM)
         self.measuring_range = '0_5000'
 
-    def measuring_range_0_10000_ppm(self):
-        self.writer(self.MEASURING_RANGE_0_10000PPM)
+    async def measuring_range_0_10000_ppm(self):
+        await self.command(self.MEASURING_RANGE_0_10000PPM)
         self.measuring_range = '0_10000'
 
     @staticmethod
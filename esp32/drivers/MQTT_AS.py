@@ -69,6 +69,8 @@ config = {
     'connect_coro':  eliza,
     'ssid':          None,
     'wifi_pw':       None,
+    'buffer_size':   256,
+    'max_inflight':  1,
 }
 
 
@@ -104,6 +106,8 @@ class MQTT_base:
             raise ValueError('invalid keepalive time')
         self._response_time = config['response_time'] * 1000  # Repub if no PUBACK received (ms).
         self._max_repubs = config['max_repubs']
+        # qos 1 window: with max_inflight > 1 publish() returns when sent, _resend() handles PUBACKs
+        self._max_inflight = config['max_inflight']
         self._clean_init = config['clean_init']  # clean_session state on first connection
         self._clean = config['clean']  # clean_session state on reconnect
         will = config['will']
@@ -133,8 +137,13 @@ class MQTT_base:
 
         self.newpid = pid_gen()
         self.rcv_pids = set()  # PUBACK and SUBACK pids awaiting ACK response
+        self._inflight = {}  # pid: [topic, msg, retain, sent ms or None, repubs] of windowed qos 1 publishes
         self.last_rx = ticks_ms()  # Time of last communication from broker
         self.lock = asyncio.Lock()
+        # Packets are assembled here and written with one call; larger ones fall back to piecewise writes
+        self._pbuf = bytearray(config['buffer_size'])
+        self._pmv = memoryview(self._pbuf)
+        self._ackbuf = bytearray(b"\x40\x02\0\0")  # PUBACK, own buffer as it is sent without the lock
 
     def _set_last_will(self, topic, msg, retain=False, qos=0):
         qos_check(qos)
@@ -178,27 +187,55 @@ class MQTT_base:
     async def _as_write(self, bytes_wr, length=0, sock=None):
         if sock is None:
             sock = self._sock
+        if isinstance(bytes_wr, str):
+            bytes_wr = bytes_wr.encode()
+        # memoryview slices do not copy the remaining data after a partial write
+        mv = memoryview(bytes_wr)
         if length:
-            bytes_wr = bytes_wr[:length]
+            mv = mv[:length]
         t = ticks_ms()
-        while bytes_wr:
+        while mv:
             if self._timeout(t) or not self.isconnected():
                 raise OSError(-1)
             try:
-                n = sock.write(bytes_wr)
+                n = sock.write(mv)
             except OSError as e:  # ESP32 issues weird 119 errors here
                 n = 0
                 if e.args[0] not in BUSY_ERRORS:
                     raise
             if n:
                 t = ticks_ms()
-                bytes_wr = bytes_wr[n:]
+                mv = mv[n:]
             await asyncio.sleep_ms(_SOCKET_POLL_DELAY)
 
     async def _send_str(self, s):
         await self._as_write(struct.pack("!H", len(s)))
         await self._as_write(s)
 
+    def _put(self, i, s):
+        # Copy str or bytes to the packet buffer at i, returns next index
+        n = len(s)
+        try:
+            self._pbuf[i:i + n] = s
+        except TypeError:  # str without buffer protocol
+            self._pbuf[i:i + n] = s.encode()
+        return i + n
+
+    def _put_str(self, i, s):
+        n = len(s)
+        self._pbuf[i] = n >> 8
+        self._pbuf[i + 1] = n & 0xff
+        return self._put(i + 2, s)
+
+    def _put_len(self, i, sz):
+        # MQTT remaining length at i, returns next index
+        while sz > 0x7f:
+            self._pbuf[i] = (sz & 0x7f) | 0x80
+            sz >>= 7
+            i += 1
+        self._pbuf[i] = sz
+        return i + 1
+
     async def _recv_len(self):
         n = 0
         sh = 0
@@ -223,37 +260,31 @@ class MQTT_base:
         if self._ssl:
             import ussl
             self._sock = ussl.wrap_socket(self._sock, **self._ssl_params)
-        premsg = bytearray(b"\x10\0\0\0\0\0")
-        msg = bytearray(b"\x04MQTT\x04\0\0\0")  # Protocol 3.1.1
-
         sz = 10 + 2 + len(self._client_id)
-        msg[6] = clean << 1
+        flags = clean << 1
         if self._user:
             sz += 2 + len(self._user) + 2 + len(self._pswd)
-            msg[6] |= 0xC0
-        if self._keepalive:
-            msg[7] |= self._keepalive >> 8
-            msg[8] |= self._keepalive & 0x00FF
+            flags |= 0xC0
         if self._lw_topic:
             sz += 2 + len(self._lw_topic) + 2 + len(self._lw_msg)
-            msg[6] |= 0x4 | (self._lw_qos & 0x1) << 3 | (self._lw_qos & 0x2) << 3
-            msg[6] |= self._lw_retain << 5
-
-        i = 1
-        while sz > 0x7f:
-            premsg[i] = (sz & 0x7f) | 0x80
-            sz >>= 7
-            i += 1
-        premsg[i] = sz
-        await self._as_write(premsg, i + 2)
-        await self._as_write(msg)
-        await self._send_str(self._client_id)
+            flags |= 0x4 | (self._lw_qos & 0x1) << 3 | (self._lw_qos & 0x2) << 3
+            flags |= self._lw_retain << 5
+        if sz + 5 > len(self._pbuf):
+            raise MQTTException('Connect packet does not fit to buffer_size.')
+        self._pbuf[0] = 0x10
+        i = self._put_len(1, sz)
+        i = self._put(i, b"\x00\x04MQTT\x04")  # Protocol 3.1.1
+        self._pbuf[i] = flags
+        self._pbuf[i + 1] = self._keepalive >> 8
+        self._pbuf[i + 2] = self._keepalive & 0x00FF
+        i = self._put_str(i + 3, self._client_id)
         if self._lw_topic:
-            await self._send_str(self._lw_topic)
-            await self._send_str(self._lw_msg)
+            i = self._put_str(i, self._lw_topic)
+            i = self._put_str(i, self._lw_msg)
         if self._user:
-            await self._send_str(self._user)
-            await self._send_str(self._pswd)
+            i = self._put_str(i, self._user)
+            i = self._put_str(i, self._pswd)
+        await self._as_write(self._pmv, i)
         # Await CONNACK
         # read causes ECONNABORTED if broker is out; triggers a reconnect.
         resp = await self._as_read(4)
@@ -329,7 +360,24 @@ class MQTT_base:
 
     # qos == 1: coro blocks until wait_msg gets correct PID.
     # If WiFi fails completely subclass re-publishes with new PID.
+    # With max_inflight > 1 coro blocks only while the window is full. The message stays in ._inflight
+    # until PUBACK, ._resend() republishes it on timeout and after a reconnect.
     async def publish(self, topic, msg, retain, qos):
+        if qos and self._max_inflight > 1:
+            while len(self._inflight) >= self._max_inflight:
+                if not self.isconnected():
+                    raise OSError(-1)  # Subclass waits for the connection and calls again
+                await asyncio.sleep_ms(_SOCKET_POLL_DELAY)
+            pid = next(self.newpid)
+            self._inflight[pid] = [topic, msg, retain, ticks_ms(), 0]
+            self.rcv_pids.add(pid)
+            try:
+                async with self.lock:
+                    await self._publish(topic, msg, retain, qos, 0, pid)
+            except OSError:
+                self._inflight[pid][3] = None  # Queued, sent again after reconnect
+                self._reconnect()
+            return
         pid = next(self.newpid)
         if qos:
             self.rcv_pids.add(pid)
@@ -350,25 +398,31 @@ class MQTT_base:
             count += 1
             self.REPUB_COUNT += 1
 
+    # topic and msg may be str or bytes; pre-encoded bytes are copied to the buffer without encoding.
     async def _publish(self, topic, msg, retain, qos, dup, pid):
-        pkt = bytearray(b"\x30\0\0\0")
-        pkt[0] |= qos << 1 | retain | dup << 3
         sz = 2 + len(topic) + len(msg)
         if qos > 0:
             sz += 2
         if sz >= 2097152:
             raise MQTTException('Strings too long.')
-        i = 1
-        while sz > 0x7f:
-            pkt[i] = (sz & 0x7f) | 0x80
-            sz >>= 7
-            i += 1
-        pkt[i] = sz
-        await self._as_write(pkt, i + 1)
+        self._pbuf[0] = 0x30 | qos << 1 | retain | dup << 3
+        i = self._put_len(1, sz)
+        if i + sz <= len(self._pbuf):
+            # Whole packet to the buffer, one write
+            i = self._put_str(i, topic)
+            if qos > 0:
+                self._pbuf[i] = pid >> 8
+                self._pbuf[i + 1] = pid & 0xff
+                i += 2
+            i = self._put(i, msg)
+            await self._as_write(self._pmv, i)
+            return
+        await self._as_write(self._pmv, i)
         await self._send_str(topic)
         if qos > 0:
-            struct.pack_into("!H", pkt, 0, pid)
-            await self._as_write(pkt, 2)
+            self._pbuf[0] = pid >> 8
+            self._pbuf[1] = pid & 0xff
+            await self._as_write(self._pmv, 2)
         await self._as_write(msg)
 
     # Can raise OSError if WiFi fails. Subclass traps
@@ -410,8 +464,10 @@ class MQTT_base:
             pid = rcv_pid[0] << 8 | rcv_pid[1]
             if pid in self.rcv_pids:
                 self.rcv_pids.discard(pid)
-            else:
+                self._inflight.pop(pid, None)
+            elif self._max_inflight == 1:
                 raise OSError(-1)
+            # else a duplicate PUBACK of a republished message, also after the window has emptied
 
         if op == 0x90:  # SUBACK
             resp = await self._as_read(4)
@@ -438,7 +494,7 @@ class MQTT_base:
         retained = op & 0x01
         self._cb(topic, msg, bool(retained))
         if op & 6 == 2:  # qos 1
-            pkt = bytearray(b"\x40\x02\0\0")  # Send PUBACK
+            pkt = self._ackbuf  # Send PUBACK
             struct.pack_into("!H", pkt, 2, pid)
             await self._as_write(pkt)
         elif op & 6 == 4:  # qos 2 not supported
@@ -521,6 +577,10 @@ class MQTTClient(MQTT_base):
             self.close()
             raise
         self.rcv_pids.clear()
+        for pid in self._inflight:  # Window survives the reconnect, ._resend() sends all again
+            self.rcv_pids.add(pid)
+            self._inflight[pid][3] = None
+            self._inflight[pid][4] = 0
         # If we get here without error broker/LAN must be up.
         self._isconnected = True
         self._in_connect = False  # Low level code can now check connectivity.
@@ -533,6 +593,8 @@ class MQTTClient(MQTT_base):
 
         loop.create_task(self._handle_msg())  # Tasks quit on connection fail.
         loop.create_task(self._keep_alive())
+        if self._max_inflight > 1:
+            loop.create_task(self._resend())
         if self.DEBUG:
             loop.create_task(self._memory())
         loop.create_task(self._connect_handler(self))  # User handler.
@@ -544,7 +606,8 @@ class MQTTClient(MQTT_base):
             while self.isconnected():
                 async with self.lock:
                     await self.wait_msg()  # Immediate return if no message
-                await asyncio.sleep_ms(_DEFAULT_MS)  # Let other tasks get lock
+                # Let other tasks get lock, poll faster while PUBACKs are due
+                await asyncio.sleep_ms(_SOCKET_POLL_DELAY if self._inflight else _DEFAULT_MS)
 
         except OSError:
             pass
@@ -566,6 +629,33 @@ class MQTTClient(MQTT_base):
             await asyncio.sleep(1)
         self._reconnect()  # Broker or WiFi fail.
 
+    # Retransmit timer of the qos 1 window: republishes every pid not acked in response_time.
+    # Runs until connectivity fails, reconnects after max_repubs like the blocking publish.
+    async def _resend(self):
+        try:
+            while self.isconnected():
+                for pid in list(self._inflight):
+                    m = self._inflight.get(pid)
+                    if m is None or (m[3] is not None and not self._timeout(m[3])):
+                        continue
+                    if m[4] >= self._max_repubs:
+                        raise OSError(-1)
+                    async with self.lock:
+                        await self._publish(m[0], m[1], m[2], 1, dup=1, pid=pid)
+                    if m[3] is not None:
+                        self.REPUB_COUNT += 1
+                        m[4] += 1
+                    m[3] = ticks_ms()
+                await asyncio.sleep_ms(100)
+        except OSError:
+            pass
+        self._reconnect()
+
+    # Wait until every windowed qos 1 publish has its PUBACK
+    async def wait_inflight(self):
+        while self._inflight:
+            await asyncio.sleep_ms(_SOCKET_POLL_DELAY)
+
     # DEBUG: show RAM messages.
     async def _memory(self):
         count = 0
@@ -0,0 +1,107 @@
+"""
+Collects one publish cycle of readings and sends them as one MQTT message.
+
+Values are added with the topic they would have been published to and a preformatted numeric payload
+('%.1f' % value, str(value)). flush() sends either one JSON object to batch_topic, keys are the last topic
+level (koti/sisa/olohuone/co2 -> "co2"), or, if batch_topic is None, every value to its own topic as before.
+The Raspberry mqtt-bridge expands the JSON object back to one measurement per key. Two topics with the same last
+level would give the same key, add() raises ValueError for the second one. NaN and infinite payloads are sent
+as JSON null, which the bridge skips.
+
+Counters of the last cycle: packets, bytes (MQTT PUBLISH packet size) and awake_ms (time from the first
+publish to the last one returning). Totals are in total_packets, total_bytes and cycles.
+
+Async flush() is for MQTT_AS, flush_sync() for UMQTTSIMPLE.
+
+    batch = PublishBatcher('koti/sisa/olohuone/batch')
+    batch.add(TOPIC_CO2, str(co2))
+    await batch.flush(client)
+"""
+
+from utime import ticks_ms, ticks_diff
+
+NON_FINITE = ('nan', '-nan', 'inf', '-inf')
+
+
+def json_value(payload):
+    """ Formatted number as a JSON value, null for NaN and infinity """
+    return 'null' if payload in NON_FINITE else payload
+
+
+def packet_size(topic, msg, qos=0):
+    """ Bytes of the MQTT PUBLISH packet: fixed header, remaining length, topic, packet id and payload """
+    remaining = 2 + len(topic) + len(msg) + (2 if qos > 0 else 0)
+    size = 1 + remaining + 1
+    while remaining > 0x7f:
+        remaining >>= 7
+        size += 1
+    return size
+
+
+class PublishBatcher(object):
+
+    def __init__(self, batch_topic=None, qos=0, retain=False):
+        self.batch_topic = batch_topic
+        self.qos = qos
+        self.retain = retain
+        self._topics = []
+        self._payloads = []
+        self._keys = {}
+        self._key_topics = {}
+        self.packets = 0
+        self.bytes = 0
+        self.awake_ms = 0
+        self.total_packets = 0
+        self.total_bytes = 0
+        self.cycles = 0
+
+    def add(self, topic, payload):
+        if self.batch_topic is not None:
+            self._key(topic)
+        self._topics.append(topic)
+        self._payloads.append(payload)
+
+    def _key(self, topic):
+        key = self._keys.get(topic)
+        if key is None:
+            key = topic[topic.rfind('/') + 1:]
+            if key in self._key_topics:
+                raise ValueError('Batch key %s of %s is already used by %s' % (key, topic, self._key_topics[key]))
+            self._keys[topic] = key
+            self._key_topics[key] = topic
+        return key
+
+    def messages(self):
+        """ Returns (topic, msg) pairs of the cycle and empties the batch """
+        topics, payloads = self._topics, self._payloads
+        self._topics, self._payloads = [], []
+        if not topics:
+            return []
+        if self.batch_topic is None:
+            return list(zip(topics, payloads))
+        body = ','.join('"%s":%s' % (self._key(t), json_value(p)) for t, p in zip(topics, payloads))
+        return [(self.batch_topic, '{' + body + '}')]
+
+    def _count(self, messages, t):
+        self.awake_ms = ticks_diff(ticks_ms(), t)
+        self.packets = len(messages)
+        self.bytes = 0
+        for topic, msg in messages:
+            self.bytes += packet_size(topic, msg, self.qos)
+        self.total_packets += self.packets
+        self.total_bytes += self.bytes
+        self.cycles += 1
+
+    async def flush(self, client):
+        messages = self.messages()
+        t = ticks_ms()
+        for topic, msg in messages:
+            await client.publish(topic, msg, retain=self.retain, qos=self.qos)
+        self._count(messages, t)
+
+    def flush_sync(self, client):
+        messages = self.messages()
+        t = ticks_ms()
+        for topic, msg in messages:
+            client.publish(topic, msg, retain=self.retain, qos=self.qos)
+        self._count(messages, t)
@@ -0,0 +1,140 @@
+"""
+EPA NowCast and 24 hour AQI from hourly bins.
+
+Official AQI is not calculated from one reading. PM2.5 and PM10 samples are summed into 24 hourly bins
+(array backed, fixed memory). add() is O(1): it updates the bin of the current hour and clears bins when the hour
+changes. Results are calculated from the bins when asked, at most 24 bins:
+
+- NowCast: last 12 hours weighted by w = max(min / max, 0.5), needs 2 of the 3 latest hours. Latest hour is the
+  current, possibly partial, hour.
+- 24 h: mean of hourly averages, needs 18 hours with data.
+
+Concentrations are converted to AQI with AQI.PM2_5() / AQI.PM10_0(), AQI is the larger of the two.
+Runs on ESP32 (utime) and on the Pi bridge (time), pass t in seconds if samples are not real time. A late
+sample (offline log) goes to the bin of its own hour if that is still within the last 24 hours.
+
+    engine = NowCast()
+    engine.add(pm2_5_atm, pm10_0_atm)
+    print(engine.nowcast_aqi(), engine.aqi_24h())
+"""
+
+from array import array
+try:
+    from utime import time
+except ImportError:
+    from time import time
+try:
+    from drivers.AQI import AQI
+except ImportError:
+    from AQI import AQI
+
+HOURS = 24
+NOWCAST_HOURS = 12
+MIN_24H_HOURS = 18
+
+
+class NowCast(object):
+
+    def __init__(self):
+        # Bin of hour h is h % HOURS, index 0 is PM2.5 and 1 is PM10
+        self._sums = (array('f', [0] * HOURS), array('f', [0] * HOURS))
+        self._counts = (array('H', [0] * HOURS), array('H', [0] * HOURS))
+        self._hour = None
+        self.samples = 0
+
+    def _advance(self, t):
+        """ Returns the hour of t """
+        hour = int(t // 3600)
+        if self._hour is None:
+            self._hour = hour
+        elif hour > self._hour:
+            # Clear bins of the hours without samples, at most all of them
+            for h in range(self._hour + 1, min(hour, self._hour + HOURS) + 1):
+                for k in (0, 1):
+                    self._sums[k][h % HOURS] = 0
+                    self._counts[k][h % HOURS] = 0
+            self._hour = hour
+        return hour
+
+    def add(self, pm2_5=None, pm10_0=None, t=None):
+        """ Add sample, either value can be None (e.g. bridge gets them in separate messages) """
+        hour = self._advance(time() if t is None else t)
+        if self._hour - hour >= HOURS:
+            return
+        b = hour % HOURS
+        if pm2_5 is not None:
+            self._sums[0][b] += pm2_5
+            self._counts[0][b] += 1
+        if pm10_0 is not None:
+            self._sums[1][b] += pm10_0
+            self._counts[1][b] += 1
+        self.samples += 1
+
+    def _hourly(self, k, age):
+        """ Average of hour latest - age, None if no samples """
+        b = (self._hour - age) % HOURS
+        n = self._counts[k][b]
+        return self._sums[k][b] / n if n else None
+
+    def nowcast(self, k, t=None):
+        """ NowCast concentration, k = 0 PM2.5, 1 PM10 """
+        if self._hour is None:
+            return None
+        self._advance(time() if t is None else t)
+        valid = 0
+        c_min = c_max = None
+        for age in range(NOWCAST_HOURS):
+            c = self._hourly(k, age)
+            if c is None:
+                continue
+            if age < 3:
+                valid += 1
+            if c_min is None or c < c_min:
+                c_min = c
+            if c_max is None or c > c_max:
+                c_max = c
+        if valid < 2:
+            return None
+        w = c_min / c_max if c_max > 0 else 1
+        if w < 0.5:
+            w = 0.5
+        num = den = 0
+        wi = 1
+        for age in range(NOWCAST_HOURS):
+            c = self._hourly(k, age)
+            if c is not None:
+                num += wi * c
+                den += wi
+            wi *= w
+        return num / den
+
+    def average_24h(self, k, t=None):
+        if self._hour is None:
+            return None
+        self._advance(time() if t is None else t)
+        total = 0
+        hours = 0
+        for age in range(HOURS):
+            c = self._hourly(k, age)
+            if c is not None:
+                total += c
+                hours += 1
+        if hours < MIN_24H_HOURS:
+            return None
+        return total / hours
+
+    @staticmethod
+    def _aqi(pm2_5, pm10_0):
+        if pm2_5 is None and pm10_0 is None:
+            return None
+        if pm2_5 is None:
+            return AQI.PM10_0(pm10_0)
+        if pm10_0 is None:
+            return AQI.PM2_5(pm2_5)
+        return AQI.aqi(pm2_5, pm10_0)
+
+    def nowcast_aqi(self, t=None):
+        return self._aqi(self.nowcast(0, t), self.nowcast(1, t))
+
+    def aqi_24h(self, t=None):
+        return self._aqi(self.average_24h(0, t), self.average_24h(1, t))
@@ -0,0 +1,314 @@
+"""
+  19.01.2020: Jari Hiltunen
+
+  Original https://github.com/pkucmus/micropython-pms7003/blob/master/pms7003.py
+  Modified for asyncronous StreamReader  16.01.2020 by Divergentti / Jari Hiltunen
+
+  Add loop into your code loop.create_task(objectname.read_async_loop())
+
+  Parser keeps one StreamReader and reads into a preallocated 64 byte scan buffer. Frame is searched from the
+  buffer by the 0x42 0x4D header, checked and decoded into self.values array (PMS_* indexes, or properties
+  like pm2_5_atm). pms_dictionary is kept for compatibility and updated in place. Parsed bytes are skipped by
+  moving the scan start, the tail is moved to the start only when the buffer end is reached. parse() does not
+  allocate. Each UART read still does: Stream.readinto a small memoryview slice, and v1.13 uasyncio, which has
+  only Stream.read, a new bytes object per read.
+
+  Duty cycle: PSensorPMS7003(duty_period=300) and read_async_loop() puts the sensor into passive mode, wakes it
+  up every duty_period seconds, waits spinup_time (datasheet: 30 s for stable data after wakeup), reads
+  frames_per_wake frames on request, stores the average and puts the sensor to sleep. Fan and laser are off
+  while sleeping. duty_ratio, current_ma() and lifetime_years() estimate the effect.
+  duty_period=0 keeps the original active streaming mode.
+
+  Smoothing: each PM channel has RollingStats over stats_window accepted readings. A reading where any PM channel
+  jumps implausibly from its median is rejected (rejected_frames) and pms_dictionary is not updated. smoothed(index)
+  returns the window mean, e.g. smoothed(pms.PMS_PM2_5_ATM).
+
+"""
+
+from machine import UART
+from array import array
+import utime
+import uasyncio as asyncio
+from micropython import const
+from drivers.ROLLING_STATS import RollingStats
+
+_START_1 = const(0x42)
+_START_2 = const(0x4d)
+_FRAME_BYTES = const(32)
+
+
+class PSensorPMS7003:
+
+    START_BYTE_1 = 0x42
+    START_BYTE_2 = 0x4d
+    FRAME_BYTES = 32
+    PMS_FRAME_LENGTH = 0
+    PMS_PM1_0 = 1
+    PMS_PM2_5 = 2
+    PMS_PM10_0 = 3
+    PMS_PM1_0_ATM = 4
+    PMS_PM2_5_ATM = 5
+    PMS_PM10_0_ATM = 6
+    PMS_PCNT_0_3 = 7
+    PMS_PCNT_0_5 = 8
+    PMS_PCNT_1_0 = 9
+    PMS_PCNT_2_5 = 10
+    PMS_PCNT_5_0 = 11
+    PMS_PCNT_10_0 = 12
+    PMS_VERSION = 13
+    PMS_ERROR = 14
+    PMS_CHECKSUM = 15
+    # Command frames 0x42 0x4D CMD DATAH DATAL LRCH LRCL
+    CMD_PASSIVE = b'\x42\x4d\xe1\x00\x00\x01\x70'
+    CMD_ACTIVE = b'\x42\x4d\xe1\x00\x01\x01\x71'
+    CMD_READ = b'\x42\x4d\xe2\x00\x00\x01\x71'
+    CMD_SLEEP = b'\x42\x4d\xe4\x00\x00\x01\x73'
+    CMD_WAKEUP = b'\x42\x4d\xe4\x00\x01\x01\x74'
+    ACTIVE_MA = 100      # Datasheet max active current
+    SLEEP_MA = 0.2       # Datasheet max standby current
+    MTTF_YEARS = 3       # Datasheet MTTF when running continuously
+    JUMP_ABS = 50        # ug/m3 from median always accepted
+    JUMP_REL = 3         # times median accepted
+    KEYS = ('FRAME_LENGTH', 'PM1_0', 'PM2_5', 'PM10_0', 'PM1_0_ATM', 'PM2_5_ATM', 'PM10_0_ATM', 'PCNT_0_3',
+            'PCNT_0_5', 'PCNT_1_0', 'PCNT_2_5', 'PCNT_5_0', 'PCNT_10_0', 'VERSION', 'ERROR', 'CHECKSUM')
+
+    #  Default UART1, rx=32, tx=33. Don't use UART0 if you want to use REPL!
+    def __init__(self, rxpin=32, txpin=33, uart=1, duty_period=0, spinup_time=30, frames_per_wake=5,
+                 stats_window=10):
+        self.sensor = UART(uart, baudrate=9600, bits=8, parity=None, stop=1, rx=rxpin, tx=txpin)
+        self.port = asyncio.StreamReader(self.sensor)
+        self.out = asyncio.StreamWriter(self.sensor, {})
+        self.pms_dictionary = None
+        self.values = array('H', [0] * 16)
+        self._sums = array('L', [0] * 13)
+        self.startup_time = utime.time()
+        self.read_interval = 30
+        self.duty_period = duty_period
+        if duty_period:
+            self.read_interval = duty_period
+        self.spinup_time = spinup_time
+        self.frames_per_wake = frames_per_wake
+        self.read_timeout = 3
+        self.sleeping = False
+        self.on_time = 0
+        self.frames = 0
+        self.crc_errors = 0
+        self.read_timeouts = 0
+        self.rejected_frames = 0
+        self.updates = 0
+        # PM1_0 ... PM10_0_ATM, index is PMS_* - 1
+        self.stats = [RollingStats(stats_window, self.JUMP_ABS, self.JUMP_REL) for _ in range(6)]
+        self._buf = bytearray(2 * self.FRAME_BYTES)
+        self._mv = memoryview(self._buf)
+        self._h = 0  # Scan start
+        self._n = 0  # End of data
+        self._readinto = hasattr(self.port, 'readinto')
+
+    def _compact(self):
+        # Move the unparsed tail to the buffer start, one slice copy when the end of the buffer is reached
+        h = self._h
+        n = self._n - h
+        if h and n:
+            self._mv[:n] = self._mv[h:self._n]
+        self._h = 0
+        self._n = n
+
+    def parse(self):
+        """ Search frame from the scan buffer. Returns True if a valid frame was decoded into self.values. """
+        buf = self._buf
+        h = self._h
+        n = self._n
+        found = False
+        while n - h >= 2:
+            while h < n - 1 and not (buf[h] == _START_1 and buf[h + 1] == _START_2):
+                h += 1
+            if n - h == 1:
+                if buf[h] != _START_1:
+                    h = n
+                break
+            if n - h >= 4 and (buf[h + 2] << 8 | buf[h + 3]) != 28:
+                # Command reply (length 4) or garbage, skip header
+                h += 2
+                continue
+            if n - h < _FRAME_BYTES:
+                break
+            checksum = 0
+            for i in range(h, h + 30):
+                checksum += buf[i]
+            if checksum == buf[h + 30] << 8 | buf[h + 31]:
+                values = self.values
+                i = h + 2
+                for k in range(13):
+                    values[k] = buf[i] << 8 | buf[i + 1]
+                    i += 2
+                values[self.PMS_VERSION] = buf[h + 28]
+                values[self.PMS_ERROR] = buf[h + 29]
+                values[self.PMS_CHECKSUM] = checksum
+                h += _FRAME_BYTES
+                self.frames += 1
+                found = True
+                break
+            self.crc_errors += 1
+            h += 1  # Resync from next header
+        if h >= n:
+            self._h = self._n = 0
+        else:
+            self._h = h
+        return found
+
+    async def read_frame(self):
+        """ Wait for next valid frame into self.values """
+        while not self.parse():
+            if self._n == len(self._buf):
+                # parse() leaves less than a frame, so the tail does not overlap its new place
+                self._compact()
+            if self._readinto:
+                n = await self.port.readinto(self._mv[self._n:])
+            else:
+                # v1.13 Stream has no readinto, read() returns a new bytes object per call
+                data = await self.port.read(len(self._buf) - self._n)
+                n = len(data)
+                self._mv[self._n:self._n + n] = data
+            if n:
+                self._n += n
+
+    def flush(self):
+        """ Discard old frames from the UART and scan buffer """
+        while self.sensor.any():
+            self.sensor.readinto(self._buf)
+        self._h = self._n = 0
+
+    async def command(self, cmd):
+        self.out.write(cmd)
+        await self.out.drain()
+
+    async def set_passive(self):
+        await self.command(self.CMD_PASSIVE)
+
+    async def set_active(self):
+        await self.command(self.CMD_ACTIVE)
+
+    async def sleep(self):
+        await self.command(self.CMD_SLEEP)
+        self.sleeping = True
+
+    async def wakeup(self):
+        await self.command(self.CMD_WAKEUP)
+        self.sleeping = False
+
+    async def read_passive(self):
+        """ Request one frame in passive mode. Returns False if the sensor did not answer in read_timeout. """
+        self.flush()
+        await self.command(self.CMD_READ)
+        try:
+            await asyncio.wait_for(self.read_frame(), self.read_timeout)
+        except asyncio.TimeoutError:
+            self.read_timeouts += 1
+            return False
+        return True
+
+    @property
+    def duty_ratio(self):
+        if not self.duty_period:
+            return 1
+        return min(1, (self.spinup_time + self.frames_per_wake) / self.duty_period)
+
+    def current_ma(self):
+        """ Estimated average current draw """
+        return self.duty_ratio * self.ACTIVE_MA + (1 - self.duty_ratio) * self.SLEEP_MA
+
+    def lifetime_years(self):
+        """ Estimated sensor lifetime, laser and fan wear only when running """
+        return self.MTTF_YEARS / self.duty_ratio
+
+    def _accept_frame(self):
+        """ Add PM values to the rolling statistics unless some channel jumps implausibly """
+        values = self.values
+        stats = self.stats
+        outlier = False
+        for i in range(6):
+            if stats[i].is_outlier(values[i + 1]):
+                outlier = True
+        if outlier:
+            self.rejected_frames += 1
+            return False
+        for i in range(6):
+            stats[i].add(values[i + 1])
+        return True
+
+    def smoothed(self, index):
+        """ Rolling mean of PM channel index (PMS_PM1_0 ... PMS_PM10_0_ATM), None before first reading """
+        return self.stats[index - 1].mean
+
+    def _update_dictionary(self):
+        if self.pms_dictionary is None:
+            self.pms_dictionary = {}
+        d = self.pms_dictionary
+        values = self.values
+        for i in range(16):
+            d[self.KEYS[i]] = values[i]
+        self.updates += 1
+
+    @property
+    def pm1_0(self):
+        return self.values[self.PMS_PM1_0]
+
+    @property
+    def pm2_5(self):
+        return self.values[self.PMS_PM2_5]
+
+    @property
+    def pm10_0(self):
+        return self.values[self.PMS_PM10_0]
+
+    @property
+    def pm1_0_atm(self):
+        return self.values[self.PMS_PM1_0_ATM]
+
+    @property
+    def pm2_5_atm(self):
+        return self.values[self.PMS_PM2_5_ATM]
+
+    @property
+    def pm10_0_atm(self):
+        return self.values[self.PMS_PM10_0_ATM]
+
+    async def read_async_loop(self):
+        if self.duty_period:
+            await self.read_duty_loop()
+
+        while True:
+            # Frames older than read_interval are in the UART buffer, take a fresh one
+            self.flush()
+            await self.read_frame()
+            if self._accept_frame():
+                self._update_dictionary()
+            await asyncio.sleep(self.read_interval)
+
+    async def read_duty_loop(self):
+        await self.set_passive()
+        sums = self._sums
+        values = self.values
+        while True:
+            start = utime.time()
+            await self.wakeup()
+            await asyncio.sleep(self.spinup_time)
+            # Sensor may return to active mode after wakeup
+            await self.set_passive()
+            for i in range(13):
+                sums[i] = 0
+            count = 0
+            for n in range(self.frames_per_wake):
+                if await self.read_passive():
+                    for i in range(13):
+                        sums[i] += values[i]
+                    count += 1
+                await asyncio.sleep(1)
+            await self.sleep()
+            self.on_time += utime.time() - start
+            if count:
+                for i in range(13):
+                    values[i] = (sums[i] + count // 2) // count
+                if self._accept_frame():
+                    self._update_dictionary()
+            await asyncio.sleep(max(self.duty_period - (utime.time() - start), 1))
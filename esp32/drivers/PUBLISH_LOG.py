@@ -0,0 +1,197 @@
+"""
+Flash backed ring log for readings that could not be published.
+
+When MQTT is down readings are stored as fixed size binary records (time, channel index, float value, 10 bytes)
+instead of being dropped. The log is a ring of segment files plog0.bin ... plogN-1.bin of at most segment_bytes
+each, so the log never takes more than segments x segment_bytes of the filesystem and the oldest readings are
+dropped by removing one file. A segment starts with an 8 byte header (magic, sequence number) and the file of
+sequence s is s % segments. The files are on the normal filesystem (FAT or LittleFS), which chooses the flash
+blocks and rewrites its metadata on every append; the ring does not spread wear itself. Records are collected
+to a RAM buffer and appended once per commit(), normally once per publish cycle, to keep the appends few. When
+the ring is full the oldest segment is dropped and counted in dropped.
+
+drain() sends the log oldest first when the link is back, drain_records records per read, one JSON message per
+timestamp: {"ts":1612345678,"co2":612,"lampo":21.53}, NaN and infinity as null. ts is Unix time, the Raspberry
+mqtt-bridge writes the values to InfluxDB with that time. With qos=1 records are passed only when the broker has
+acknowledged them (MQTTClient.wait_inflight() for the in-flight window), so a segment file is removed only after
+that. Drain stops when the client is disconnected; a publish in progress when the link drops waits for the
+reconnect, do not cancel it. commit() may run meanwhile: if the ring drops the segment being sent, drain goes on
+from the new oldest segment.
+After a reboot the segments are found from the headers; a partly sent segment is sent again from its start,
+InfluxDB overwrites points with the same time.
+
+RAM use is constant: one write and one read buffer, no per record allocations except the JSON text.
+
+    plog = PublishLog((('co2', '%s'), ('lampo', '%.2f')))
+    plog.add(0, 612, time())
+    plog.commit()
+    await plog.drain(client, 'koti/sisa/olohuone/offline', qos=1)
+"""
+
+import struct
+import uos
+from utime import gmtime
+from drivers.MQTT_BATCH import json_value
+
+REC_FMT = '<IHf'
+REC_SIZE = struct.calcsize(REC_FMT)
+HDR_FMT = '<4sI'
+HDR_SIZE = struct.calcsize(HDR_FMT)
+MAGIC = b'PLG1'
+# MicroPython on ESP32 counts time from 2000-01-01
+EPOCH_OFFSET = 946684800 if gmtime(0)[0] == 2000 else 0
+
+
+class PublishLog(object):
+
+    def __init__(self, channels, prefix='plog', segments=32, segment_bytes=4096, buffer_records=32,
+                 drain_records=32):
+        self.keys = [key for key, fmt in channels]
+        self.fmts = [fmt for key, fmt in channels]
+        self.prefix = prefix
+        self.segments = segments
+        self.seg_records = (segment_bytes - HDR_SIZE) // REC_SIZE
+        self._wbuf = bytearray(buffer_records * REC_SIZE)
+        self._wmv = memoryview(self._wbuf)
+        self._wn = 0
+        self._rbuf = bytearray(drain_records * REC_SIZE)
+        self._rmv = memoryview(self._rbuf)
+        self.drain_records = drain_records
+        self.head_seq = None
+        self.head_records = 0
+        self.tail_seq = None
+        self.tail_rec = 0
+        self.pending = 0
+        self.written = 0
+        self.drained = 0
+        self.dropped = 0
+        self._recover()
+
+    def _name(self, seq):
+        return '%s%d.bin' % (self.prefix, seq % self.segments)
+
+    def _file_records(self, seq):
+        try:
+            return (uos.stat(self._name(seq))[6] - HDR_SIZE) // REC_SIZE
+        except OSError:
+            return 0
+
+    def _records(self, seq):
+        if seq == self.head_seq:
+            return self.head_records
+        return self._file_records(seq)
+
+    def _remove(self, seq):
+        try:
+            uos.remove(self._name(seq))
+        except OSError:
+            pass
+
+    def _recover(self):
+        """ Finds the oldest and the newest segment from the headers after boot """
+        seqs = []
+        for i in range(self.segments):
+            name = '%s%d.bin' % (self.prefix, i)
+            try:
+                with open(name, 'rb') as f:
+                    magic, seq = struct.unpack(HDR_FMT, f.read(HDR_SIZE))
+            except (OSError, ValueError):
+                continue
+            if magic == MAGIC and seq % self.segments == i:
+                seqs.append(seq)
+            else:
+                uos.remove(name)
+        if not seqs:
+            return
+        self.tail_seq = min(seqs)
+        self.head_seq = max(seqs)
+        self.head_records = self._file_records(self.head_seq)
+        for seq in seqs:
+            self.pending += self._records(seq)
+
+    def _new_segment(self):
+        seq = 0 if self.head_seq is None else self.head_seq + 1
+        if (self.tail_seq is not None) and (seq - self.tail_seq >= self.segments):
+            # Ring full, oldest segment goes
+            lost = self._records(self.tail_seq) - self.tail_rec
+            self.dropped += lost
+            self.pending -= lost
+            self._remove(self.tail_seq)
+            self.tail_seq += 1
+            self.tail_rec = 0
+        with open(self._name(seq), 'wb') as f:
+            f.write(struct.pack(HDR_FMT, MAGIC, seq))
+        self.head_seq = seq
+        self.head_records = 0
+        if self.tail_seq is None:
+            self.tail_seq = seq
+            self.tail_rec = 0
+
+    def add(self, index, value, t):
+        struct.pack_into(REC_FMT, self._wbuf, self._wn * REC_SIZE, t, index, value)
+        self._wn += 1
+        if self._wn * REC_SIZE == len(self._wbuf):
+            self.commit()
+
+    def commit(self):
+        """ Appends buffered records to the head segment """
+        done = 0
+        while done < self._wn:
+            if (self.head_seq is None) or (self.head_records == self.seg_records):
+                self._new_segment()
+            n = min(self._wn - done, self.seg_records - self.head_records)
+            with open(self._name(self.head_seq), 'ab') as f:
+                f.write(self._wmv[done * REC_SIZE:(done + n) * REC_SIZE])
+            self.head_records += n
+            self.pending += n
+            self.written += n
+            done += n
+        self._wn = 0
+
+    def _messages(self, n):
+        """ Records in the read buffer to JSON messages, one per timestamp """
+        messages = []
+        t_prev = None
+        parts = []
+        for i in range(n):
+            t, index, value = struct.unpack_from(REC_FMT, self._rbuf, i * REC_SIZE)
+            if t != t_prev:
+                if parts:
+                    messages.append('{"ts":%d,%s}' % (t_prev + EPOCH_OFFSET, ','.join(parts)))
+                parts = []
+                t_prev = t
+            if index < len(self.keys):
+                parts.append('"%s":%s' % (self.keys[index], json_value(self.fmts[index] % value)))
+        if parts:
+            messages.append('{"ts":%d,%s}' % (t_prev + EPOCH_OFFSET, ','.join(parts)))
+        return messages
+
+    async def drain(self, client, topic, qos=0):
+        """ Publishes the log oldest first. A failing publish raises, position stays for the next try. """
+        self.commit()
+        while (self.tail_seq is not None) and client.isconnected():
+            records = self._records(self.tail_seq)
+            if self.tail_rec >= records:
+                self._remove(self.tail_seq)
+                if self.tail_seq == self.head_seq:
+                    self.tail_seq = self.head_seq = None
+                    self.tail_rec = self.head_records = 0
+                    self.pending = 0
+                    return
+                self.tail_seq += 1
+                self.tail_rec = 0
+                continue
+            n = min(self.drain_records, records - self.tail_rec)
+            with open(self._name(self.tail_seq), 'rb') as f:
+                f.seek(HDR_SIZE + self.tail_rec * REC_SIZE)
+                f.readinto(self._rmv[:n * REC_SIZE])
+            seq = self.tail_seq
+            for msg in self._messages(n):
+                await client.publish(topic, msg, retain=False, qos=qos)
+            if qos:
+                await client.wait_inflight()
+            if seq != self.tail_seq:
+                continue  # Ring full while sending, the segment was dropped and counted
+            self.tail_rec += n
+            self.pending -= n
+            self.drained += n
@@ -0,0 +1,120 @@
+"""
+Rolling statistics over a fixed window of samples.
+
+Samples are kept in a preallocated array('f') ring and in a sorted copy of the same window. Adding a sample
+updates the running sum in O(1) and moves one value in the sorted window (window is small, shift is cheap),
+so mean, min, max and median are read without scanning lists.
+
+Outlier rejection: after min_samples, a sample further than max(abs_jump, rel_jump * median) from the median
+is rejected. After max_rejects rejections in a row the level is taken as a real change and the window
+starts again from the new value.
+
+    stats = RollingStats(size=10, abs_jump=50, rel_jump=3)
+    if not stats.is_outlier(value):
+        stats.add(value)
+    print(stats.mean, stats.median, stats.min, stats.max, stats.count)
+"""
+
+from array import array
+
+
+class RollingStats(object):
+
+    def __init__(self, size=10, abs_jump=None, rel_jump=None, min_samples=3, max_rejects=3):
+        self.size = size
+        self.abs_jump = abs_jump
+        self.rel_jump = rel_jump
+        self.min_samples = min_samples
+        self.max_rejects = max_rejects
+        self._ring = array('f', [0] * size)
+        self._sorted = array('f', [0] * size)
+        self._idx = 0
+        self._sum = 0.0
+        self.count = 0
+        self.rejected = 0
+        self._rejects_in_row = 0
+
+    def clear(self):
+        self._idx = 0
+        self._sum = 0.0
+        self.count = 0
+        self._rejects_in_row = 0
+
+    def is_outlier(self, value):
+        """ True if value jumps implausibly from the median. Counts rejections. """
+        if self.count < self.min_samples or (self.abs_jump is None and self.rel_jump is None):
+            return False
+        median = self.median
+        limit = 0
+        if self.abs_jump is not None:
+            limit = self.abs_jump
+        if self.rel_jump is not None:
+            limit = max(limit, self.rel_jump * median)
+        if abs(value - median) <= limit:
+            self._rejects_in_row = 0
+            return False
+        if self._rejects_in_row >= self.max_rejects:
+            # Level has really changed, start window again from this value
+            self.clear()
+            return False
+        self._rejects_in_row += 1
+        self.rejected += 1
+        return True
+
+    def add(self, value):
+        srt = self._sorted
+        n = self.count
+        if n == self.size:
+            old = self._ring[self._idx]
+            self._sum -= old
+            # Remove old value from the sorted window
+            i = self._find(old, n)
+            while i < n - 1:
+                srt[i] = srt[i + 1]
+                i += 1
+            n -= 1
+        else:
+            self.count += 1
+        self._ring[self._idx] = value
+        self._idx = (self._idx + 1) % self.size
+        self._sum += value
+        # Insert new value, window stays sorted
+        i = n
+        while i > 0 and srt[i - 1] > value:
+            srt[i] = srt[i - 1]
+            i -= 1
+        srt[i] = value
+
+    def _find(self, value, n):
+        lo = 0
+        hi = n - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._sorted[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self._sum / self.count
+
+    @property
+    def min(self):
+        return self._sorted[0] if self.count else None
+
+    @property
+    def max(self):
+        return self._sorted[self.count - 1] if self.count else None
+
+    @property
+    def median(self):
+        n = self.count
+        if not n:
+            return None
+        if n & 1:
+            return self._sorted[n // 2]
+        return (self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2
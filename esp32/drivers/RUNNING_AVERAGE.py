@@ -0,0 +1,94 @@
+"""
+Fixed size running average for sensor readings.
+
+Replaces the append / sum() / pop(0) lists. Values are kept in a preallocated array('f') ring with a running
+sum, so add() and mean are O(1) and do not allocate. min and max are tracked on add; when the evicted value was
+the minimum or maximum it is searched again from the ring on the next read. The running sum is recomputed from
+the ring once per full turn so that single precision float error does not accumulate.
+
+    co2 = RunningAverage(20)
+    co2.add(value)
+    print(co2.mean, co2.min, co2.max, co2.count)
+"""
+
+from array import array
+
+
+class RunningAverage(object):
+
+    def __init__(self, size=20):
+        self.size = size
+        self._ring = array('f', [0] * size)
+        self._idx = 0
+        self._sum = 0.0
+        self._min = 0.0
+        self._max = 0.0
+        self._dirty = False
+        self.count = 0
+
+    def clear(self):
+        self._idx = 0
+        self._sum = 0.0
+        self._dirty = False
+        self.count = 0
+
+    def add(self, value):
+        ring = self._ring
+        if self.count == self.size:
+            old = ring[self._idx]
+            self._sum -= old
+            if old == self._min or old == self._max:
+                self._dirty = True
+        else:
+            self.count += 1
+        ring[self._idx] = value
+        value = ring[self._idx]  # Same precision as stored
+        self._sum += value
+        if self.count == 1:
+            self._min = self._max = value
+        elif value < self._min:
+            self._min = value
+        elif value > self._max:
+            self._max = value
+        self._idx += 1
+        if self._idx == self.size:
+            self._idx = 0
+            s = 0.0
+            for i in range(self.size):
+                s += ring[i]
+            self._sum = s
+
+    def _rescan(self):
+        ring = self._ring
+        lo = hi = ring[0]
+        for i in range(1, self.count):
+            v = ring[i]
+            if v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+        self._min = lo
+        self._max = hi
+        self._dirty = False
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self._sum / self.count
+
+    @property
+    def min(self):
+        if not self.count:
+            return None
+        if self._dirty:
+            self._rescan()
+        return self._min
+
+    @property
+    def max(self):
+        if not self.count:
+            return None
+        if self._dirty:
+            self._rescan()
+        return self._max
@@ -0,0 +1,319 @@
+""" This class is for asynchronous WiFi connection.
+
+In: minimal SSID1 and PASSWORD1, you may provide 2 SSIDs and passwords.
+- WebREPL start. If you have installled WebREPL with import webrepl and you want to remotely use REPL
+- WebREPL password.
+- Network time server name for NTPTIME
+- DHCP name for the adapter. Keep unique in your LAN.
+
+Operation:
+- Add asynchronous loop to your async main(): example loop.create_task(net.net_upd_loop())
+- State machine: STATE_DOWN -> STATE_SCANNING -> STATE_ASSOCIATING -> STATE_GOT_IP -> STATE_NTP -> STATE_READY.
+  Fast reconnect goes from STATE_DOWN directly to STATE_ASSOCIATING. Lost connection returns to STATE_DOWN.
+- net.state holds the current state, net.state_changed (asyncio.Event) is set on every change. Waiter clears it.
+- One WLAN handle (net.wlan). In STATE_READY RSSI and IP are sampled every sample_interval seconds into
+  net.strength and net.ip_a, other code reads the attributes and does not call network.WLAN.
+- search available hotspots in range
+- if provided ssid1 or ssid2 is in range, pick highest strength hotspot
+- for MQTT_AS.py provide information in which AP we are connected to with which password
+- If handshake with the WiFi fails > 20 times, returns false
+- If ntptime is success, set this class startuptime to time(). Failed NTP is retried in STATE_READY.
+
+Fast reconnect:
+- After a good connection SSID, BSSID, channel and the DHCP lease are saved to wificache.json. Next boot
+  connects directly to the cached BSSID without radio reset and scan. Scan is used only if the fast connect
+  fails, then the cache is dropped.
+- use_static_ip=True configures the cached lease as static IP, which skips DHCP. Use only if the router keeps
+  the lease for this device (DHCP reservation). If the fast connect fails DHCP is turned on again before the
+  scan.
+- Channel is saved for information, MicroPython STA connect() has no channel parameter.
+- Connection is polled with isconnected() up to conn_timeout seconds instead of fixed sleeps. Time to connected
+  (conn_ms, fast or scan) of the last boots is kept in the cache file, see conn_history.
+
+DO NOT TRANSFER FILES TO ESP32 PyCharm Windows! It does not handle directories correctly (target dir use /, not \)!
+-  use ampy -p COM4 put drivers\WIFICONN_AS.py drivers/WIFICONN_AS.py
+
+29.01.2020: Jari Hiltunen
+"""
+import gc
+import uasyncio as asyncio
+import network
+import ntptime
+from utime import time, ticks_ms, ticks_diff
+from micropython import const
+from ubinascii import hexlify, unhexlify
+try:
+    import ujson as json
+except ImportError:
+    import json
+gc.collect()
+
+
+STATE_DOWN = const(0)
+STATE_SCANNING = const(1)
+STATE_ASSOCIATING = const(2)
+STATE_GOT_IP = const(3)
+STATE_NTP = const(4)
+STATE_READY = const(5)
+STATE_NAMES = ('down', 'scanning', 'associating', 'got-IP', 'NTP', 'ready')
+
+
+class ConnectWiFi(object):
+
+    CACHE_FILE = 'wificache.json'
+    HISTORY = 10
+
+    def __init__(self, ssid1, password1, ssid2=None, password2=None, ntpserver=None, dhcpname=None,
+                 startwebrepl=False, webreplpwd=None, use_static_ip=False, conn_timeout=15, sample_interval=5):
+        self.ssid1 = ssid1
+        self.pw1 = password1
+        self.ssid2 = ssid2
+        self.pw2 = password2
+        self.ntps = ntpserver
+        self.dhcpn = dhcpname
+        self.starwbr = startwebrepl
+        self.webrplpwd = webreplpwd
+        self.wlan = network.WLAN(network.STA_IF)
+        self.state = STATE_DOWN
+        self.state_changed = asyncio.Event()
+        self.sample_interval = sample_interval
+        self.net_ok = False
+        self.u_pwd = None
+        self.use_ssid = None
+        self.ip_a = None
+        self.strength = None
+        self.timeset = False
+        self.s_comp = False
+        self.webrepl_started = False
+        self.searh_list = []
+        self.ssid_list = []
+        self.con_att_fail = 0
+        self.con_att_max = 20
+        self.startup_time = None
+        self.use_static_ip = use_static_ip
+        self.conn_timeout = conn_timeout
+        self.bssid = None
+        self.channel = None
+        self.conn_ms = None
+        self.conn_fast = False
+        self.conn_history = []
+        self._t_start = ticks_ms()
+        self._cache = self.load_cache()
+        if self._cache is not None:
+            self.conn_history = self._cache.get('history', [])
+
+    @property
+    def state_name(self):
+        return STATE_NAMES[self.state]
+
+    def set_state(self, state):
+        if state != self.state:
+            self.state = state
+            self.net_ok = state >= STATE_GOT_IP
+            self.state_changed.set()
+
+    def load_cache(self):
+        try:
+            with open(self.CACHE_FILE) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get('ssid') not in (self.ssid1, self.ssid2):
+            return None
+        return cache
+
+    def save_cache(self, ifconfig):
+        cache = {'ssid': self.use_ssid, 'bssid': self.bssid, 'channel': self.channel, 'ifconfig': list(ifconfig)}
+        self.conn_history.append([self.conn_ms, self.conn_fast])
+        self.conn_history = self.conn_history[-self.HISTORY:]
+        cache['history'] = self.conn_history
+        self._cache = cache
+        # One small write per connect, connects are rare (boot and network loss)
+        try:
+            with open(self.CACHE_FILE, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            print("Error %s", e)
+
+    def drop_cache(self):
+        self._cache = None
+        try:
+            import uos
+            uos.remove(self.CACHE_FILE)
+        except (OSError, ImportError):
+            pass
+
+    def sample(self):
+        """ Reads RSSI and IP to the attributes, returns False if the link is lost """
+        if not self.wlan.isconnected():
+            return False
+        self.ip_a = self.wlan.ifconfig()[0]
+        self.strength = self.wlan.status('rssi')
+        return True
+
+    async def wait_connected(self):
+        """ Polls isconnected() every 100 ms up to conn_timeout """
+        t = ticks_ms()
+        while ticks_diff(ticks_ms(), t) < self.conn_timeout * 1000:
+            if self.wlan.isconnected():
+                return True
+            await asyncio.sleep_ms(100)
+        return False
+
+    async def net_upd_loop(self):
+        wlan = self.wlan
+        while True:
+            state = self.state
+            if state == STATE_DOWN:
+                self._t_start = ticks_ms()
+                wlan.active(True)
+                if wlan.isconnected():
+                    # Connected before this class, e.g. soft reboot
+                    self.use_ssid = wlan.config('essid')
+                    self.u_pwd = self.pw1 if self.use_ssid == self.ssid1 else self.pw2
+                    self.set_state(STATE_GOT_IP)
+                elif self._cache is not None:
+                    self.set_state(STATE_ASSOCIATING)
+                    await self.fast_connect()
+                else:
+                    self.set_state(STATE_SCANNING)
+            elif state == STATE_SCANNING:
+                await self.s_nets()
+                if self.s_comp is True:
+                    self.set_state(STATE_ASSOCIATING)
+                    await self.connect_to_network()
+                    if self.con_att_fail > self.con_att_max:
+                        print("WiFi connection tried %s times, giving up" % self.con_att_fail)
+                        self.set_state(STATE_DOWN)
+                        return False
+                else:
+                    await asyncio.sleep(5)
+            elif state == STATE_GOT_IP:
+                self.sample()
+                if (self.starwbr is True) and (self.webrepl_started is False):
+                    await self.start_webrepl()
+                    gc.collect()
+                self.set_state(STATE_NTP)
+            elif state == STATE_NTP:
+                await self.set_time()
+                self.set_state(STATE_READY)
+            else:
+                await asyncio.sleep(self.sample_interval)
+                if self.sample() is False:
+                    print("WiFi connection lost")
+                    self.set_state(STATE_DOWN)
+                elif self.timeset is False:
+                    await self.set_time()
+            # Let state_changed waiters see every state
+            await asyncio.sleep_ms(0)
+
+    async def fast_connect(self):
+        """ Connect to the cached BSSID without scan. Next state is STATE_GOT_IP or STATE_SCANNING. """
+        cache = self._cache
+        wlan = self.wlan
+        self.use_ssid = cache['ssid']
+        self.u_pwd = self.pw1 if self.use_ssid == self.ssid1 else self.pw2
+        static = self.use_static_ip and cache.get('ifconfig') is not None
+        if static:
+            wlan.ifconfig(tuple(cache['ifconfig']))
+        elif self.dhcpn is not None:
+            wlan.config(dhcp_hostname=self.dhcpn)
+        try:
+            wlan.connect(self.use_ssid, self.u_pwd, bssid=unhexlify(cache['bssid']))
+        except (OSError, TypeError, ValueError) as e:
+            print("Error %s", e)
+        else:
+            if await self.wait_connected():
+                self.bssid = cache['bssid']
+                self.channel = cache.get('channel')
+                self.conn_fast = True
+                self._connected()
+                return
+            wlan.disconnect()
+        if static:
+            # Static ifconfig turned the DHCP client off, the scanned AP may be in another network
+            try:
+                wlan.ifconfig('dhcp')
+            except (OSError, ValueError) as e:
+                print("Error %s", e)
+        print("Fast connect to cached AP failed, scanning")
+        self.drop_cache()
+        self.set_state(STATE_SCANNING)
+
+    def _connected(self):
+        self.conn_ms = ticks_diff(ticks_ms(), self._t_start)
+        ifconfig = self.wlan.ifconfig()
+        self.ip_a = ifconfig[0]
+        self.save_cache(ifconfig)
+        self.set_state(STATE_GOT_IP)
+
+    async def start_webrepl(self):
+        if (self.webrepl_started is False) and (self.starwbr is True):
+            import webrepl  # Only nodes with WebREPL enabled pay for the module
+            if self.webrplpwd is not None:
+                try:
+                    webrepl.start(password=self.webrplpwd)
+                    self.webrepl_started = True
+                except OSError as e:
+                    print("Error %s", e)
+                    self.webrepl_started = False
+            else:
+                try:
+                    webrepl.start()
+                    self.webrepl_started = True
+                except OSError as e:
+                    print("Error %s", e)
+                    self.webrepl_started = False
+                    return False
+
+    async def set_time(self):
+        if self.ntps is not None:
+            ntptime.host = self.ntps
+        if self.timeset is False:
+            try:
+                ntptime.settime()
+                self.timeset = True
+                self.startup_time = time()
+            except OSError as e:
+                print("Error %s", e)
+                self.timeset = False
+                return False
+
+    async def s_nets(self):
+        self.s_comp = False
+        try:
+            self.ssid_list = self.wlan.scan()
+        except OSError as e:
+            print("Error %s", e)
+            return False
+        self.searh_list = [item for item in self.ssid_list if item[0].decode() in (self.ssid1, self.ssid2)]
+        if not self.searh_list:
+            print("SSID not found in range!")
+            return False
+        # Highest RSSI (ssid, bssid, channel, RSSI, authmode, hidden)
+        best = self.searh_list[0]
+        for item in self.searh_list:
+            if item[3] > best[3]:
+                best = item
+        self.use_ssid = best[0].decode()
+        self.u_pwd = self.pw1 if self.use_ssid == self.ssid1 else self.pw2
+        self.bssid = hexlify(best[1]).decode()
+        self.channel = best[2]
+        self.s_comp = True
+
+    async def connect_to_network(self):
+        wlan = self.wlan
+        if self.dhcpn is not None:
+            wlan.config(dhcp_hostname=self.dhcpn)
+        try:
+            wlan.connect(self.use_ssid, self.u_pwd)
+        except OSError as e:
+            print("Error %s", e)
+        if await self.wait_connected():
+            self.conn_fast = False
+            self._connected()
+        else:
+            wlan.disconnect()
+            self.con_att_fail += 1
+            print("Connection attempt failed %s times" % self.con_att_fail)
+            self.set_state(STATE_SCANNING)
@@ -0,0 +1,307 @@
+# Source https://github.com/rdagger/micropython-ili9341/blob/master/xpt2046.py
+"""XPT2046 Touch module.
+Added self.pressed due to fact irq handler is too slow.
+Interrupt handler only sets a flag, sample_loop() task reads and filters
+the samples and delivers debounced touches to int_handler and get_event().
+uasyncio.Event is not safe to set from an interrupt: without ThreadSafeFlag
+(v1.13) the handler sets it through micropython.schedule, so an idle
+sample_loop does not wake up at all. Without int_pin it polls the controller
+every sample_ms (50 wakeups/s at 20 ms), use the interrupt pin if you can.
+wakeups counts sample_loop resumes.
+"""
+from time import sleep
+from array import array
+from micropython import const, schedule
+from utime import ticks_ms, ticks_diff
+import uasyncio as asyncio
+try:
+    from uasyncio import ThreadSafeFlag as IrqFlag
+except ImportError:
+    IrqFlag = None  # v1.13: Event set from micropython.schedule
+
+
+class Touch(object):
+    """Serial interface for XPT2046 Touch Screen Controller."""
+
+    # Command constants from ILI9341 datasheet
+    GET_X = const(0b11010000)  # X position
+    GET_Y = const(0b10010000)  # Y position
+    GET_Z1 = const(0b10110000)  # Z1 position
+    GET_Z2 = const(0b11000000)  # Z2 position
+    GET_TEMP0 = const(0b10000000)  # Temperature 0
+    GET_TEMP1 = const(0b11110000)  # Temperature 1
+    GET_BATTERY = const(0b10100000)  # Battery monitor
+    GET_AUX = const(0b11100000)  # Auxiliary input to ADC
+
+    def __init__(self, spi, cs, int_pin=None, int_handler=None,
+                 width=240, height=320,
+                 x_min=100, x_max=1962, y_min=100, y_max=1900,
+                 sample_ms=20, samples=5, trim=1, debounce_ms=100,
+                 queue_len=4):
+        """Initialize touch screen controller.
+        Args:
+            spi (Class Spi):  SPI interface for OLED
+            cs (Class Pin):  Chip select pin
+            int_pin (Class Pin):  Touch controller interrupt pin
+            int_handler (function): Handler for screen interrupt
+            width (int): Width of LCD screen
+            height (int): Height of LCD screen
+            x_min (int): Minimum x coordinate
+            x_max (int): Maximum x coordinate
+            y_min (int): Minimum Y coordinate
+            y_max (int): Maximum Y coordinate
+            sample_ms (int): Sampling period in sample_loop()
+            samples (int): Samples filtered for one touch
+            trim (int): Lowest and highest samples dropped before mean
+            debounce_ms (int): Quiet time after release
+            queue_len (int): Touch events kept for get_event()
+        """
+        self.spi = spi
+        self.cs = cs
+        self.cs.init(self.cs.OUT, value=1)
+        self.rx_buf = bytearray(3)  # Receive buffer
+        self.tx_buf = bytearray(3)  # Transmit buffer
+        self.width = width
+        self.height = height
+        # Set calibration
+        self.x_min = x_min
+        self.x_max = x_max
+        self.y_min = y_min
+        self.y_max = y_max
+        self.x_multiplier = width / (x_max - x_min)
+        self.x_add = x_min * -self.x_multiplier
+        self.y_multiplier = height / (y_max - y_min)
+        self.y_add = y_min * -self.y_multiplier
+        # Calculate time pressed
+        self.pressed = False
+        # Sampler, preallocated buffers
+        self.sample_ms = sample_ms
+        self.samples = samples
+        self.trim = trim if samples > 2 * trim else 0
+        self.debounce_ms = debounce_ms
+        self._xs = array('H', [0] * samples)
+        self._ys = array('H', [0] * samples)
+        self._sort = array('H', [0] * samples)
+        self._ev_x = array('h', [0] * queue_len)
+        self._ev_y = array('h', [0] * queue_len)
+        self._ev_head = 0
+        self._ev_count = 0
+        self._ev_ready = asyncio.Event()
+        self.events_dropped = 0
+        # Set by int_press
+        if IrqFlag is not None:
+            self._irq = IrqFlag()
+            self._set_ref = None
+        else:
+            self._irq = asyncio.Event()
+            self._set_ref = self._set_irq  # Bound method made here, not in the interrupt
+        self.wakeups = 0
+        # Measurements
+        self._irq_ms = ticks_ms()
+        self.irq_latency_ms = 0
+        self.max_irq_latency_ms = 0
+        self.max_jitter_ms = 0
+
+        self.int_pin = int_pin
+        self.int_handler = int_handler
+        if int_pin is not None:
+            self.int_pin.init(int_pin.IN)
+            int_pin.irq(trigger=int_pin.IRQ_FALLING | int_pin.IRQ_RISING,
+                        handler=self.int_press)
+
+    def get_touch(self):
+        """Take multiple samples to get accurate touch reading."""
+        timeout = 2  # set timeout to 2 seconds
+        confidence = 5
+        buff = [[0, 0] for x in range(confidence)]
+        buf_length = confidence  # Require a confidence of 5 good samples
+        buffptr = 0  # Track current buffer position
+        nsamples = 0  # Count samples
+        while timeout > 0:
+            if nsamples == buf_length:
+                meanx = sum([c[0] for c in buff]) // buf_length
+                meany = sum([c[1] for c in buff]) // buf_length
+                dev = sum([(c[0] - meanx)**2 +
+                          (c[1] - meany)**2 for c in buff]) / buf_length
+                if dev <= 50:  # Deviation should be under margin of 50
+                    return self.normalize(meanx, meany)
+            # get a new value
+            sample = self.raw_touch()  # get a touch
+            if sample is None:
+                nsamples = 0    # Invalidate buff
+            else:
+                buff[buffptr] = sample  # put in buff
+                buffptr = (buffptr + 1) % buf_length  # Incr, until rollover
+                nsamples = min(nsamples + 1, buf_length)  # Incr. until max
+
+            sleep(.05)
+            timeout -= .05
+        return None
+
+    async def get_touch_async(self, timeout_ms=2000):
+        """Filtered touch reading without blocking other tasks.
+        Returns:
+            tuple(int, int): X, Y or None if no good samples in timeout_ms
+        """
+        t = ticks_ms()
+        n = 0
+        while ticks_diff(ticks_ms(), t) < timeout_ms:
+            sample = self.raw_touch()
+            if sample is None:
+                n = 0  # Invalidate buffer
+            else:
+                self._xs[n], self._ys[n] = sample
+                n += 1
+                if n == self.samples:
+                    return self.normalize(self._filtered(self._xs),
+                                          self._filtered(self._ys))
+            await asyncio.sleep_ms(self.sample_ms)
+        return None
+
+    async def get_event(self):
+        """Wait for next debounced touch from sample_loop().
+        Returns:
+            tuple(int, int): X, Y
+        """
+        while self._ev_count == 0:
+            self._ev_ready.clear()
+            await self._ev_ready.wait()
+        i = self._ev_head
+        self._ev_head = (i + 1) % len(self._ev_x)
+        self._ev_count -= 1
+        return self._ev_x[i], self._ev_y[i]
+
+    def _put_event(self, x, y):
+        size = len(self._ev_x)
+        if self._ev_count == size:
+            # Full, drop oldest
+            self._ev_head = (self._ev_head + 1) % size
+            self._ev_count -= 1
+            self.events_dropped += 1
+        i = (self._ev_head + self._ev_count) % size
+        self._ev_x[i] = x
+        self._ev_y[i] = y
+        self._ev_count += 1
+        self._ev_ready.set()
+
+    def _filtered(self, buf):
+        """Trimmed mean (median with samples=3, trim=1) without allocation."""
+        srt = self._sort
+        n = self.samples
+        for i in range(n):
+            v = buf[i]
+            j = i
+            while j > 0 and srt[j - 1] > v:
+                srt[j] = srt[j - 1]
+                j -= 1
+            srt[j] = v
+        total = 0
+        for i in range(self.trim, n - self.trim):
+            total += srt[i]
+        return total // (n - 2 * self.trim)
+
+    def int_press(self, pin):
+        """Interrupt handler: only flag the touch, sample_loop reads it."""
+        self.pressed = True
+        if not pin.value():
+            self._irq_ms = ticks_ms()
+            if self._set_ref is None:
+                self._irq.set()  # ThreadSafeFlag
+            else:
+                try:
+                    schedule(self._set_ref, 0)
+                except RuntimeError:
+                    pass  # Schedule queue full, touch is seen on the next edge
+
+    def _set_irq(self, _):
+        self._irq.set()
+
+    def pen_down(self):
+        """Touch pin low, or a valid reading without int_pin."""
+        if self.int_pin is None:
+            return self.raw_touch() is not None
+        return not self.int_pin.value()
+
+    async def _wait_press(self):
+        if self.int_pin is None:
+            while not self.pen_down():
+                await asyncio.sleep_ms(self.sample_ms)
+                self.wakeups += 1
+            self._irq_ms = ticks_ms()
+            self.pressed = True
+        else:
+            await self._irq.wait()
+            self.wakeups += 1
+
+    async def sample_loop(self):
+        """Read touches flagged by the interrupt. Add to your loop:
+        loop.create_task(touch.sample_loop())
+        """
+        while True:
+            await self._wait_press()
+            latency = ticks_diff(ticks_ms(), self._irq_ms)
+            self.irq_latency_ms = latency
+            if latency > self.max_irq_latency_ms:
+                self.max_irq_latency_ms = latency
+            n = 0
+            last = ticks_ms()
+            while self.pen_down():
+                if n < self.samples:
+                    sample = self.raw_touch()
+                    if sample is None:
+                        n = 0
+                    else:
+                        self._xs[n], self._ys[n] = sample
+                        n += 1
+                        if n == self.samples:
+                            x, y = self.normalize(self._filtered(self._xs),
+                                                  self._filtered(self._ys))
+                            self._put_event(x, y)
+                            if self.int_handler is not None:
+                                self.int_handler(x, y)
+                await asyncio.sleep_ms(self.sample_ms)
+                self.wakeups += 1
+                now = ticks_ms()
+                jitter = abs(ticks_diff(now, last) - self.sample_ms)
+                if jitter > self.max_jitter_ms:
+                    self.max_jitter_ms = jitter
+                last = now
+            # Released, ignore bounces
+            await asyncio.sleep_ms(self.debounce_ms)
+            self.wakeups += 1
+            if hasattr(self._irq, 'clear'):
+                self._irq.clear()
+            self.pressed = False
+
+
+    def normalize(self, x, y):
+        """Normalize mean X,Y values to match LCD screen."""
+        x = int(self.x_multiplier * x + self.x_add)
+        y = int(self.y_multiplier * y + self.y_add)
+        return x, y
+
+    def raw_touch(self):
+        """Read raw X,Y touch values.
+        Returns:
+            tuple(int, int): X, Y
+        """
+        x = self.send_command(self.GET_X)
+        y = self.send_command(self.GET_Y)
+        if self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max:
+            return x, y
+        else:
+            return None
+
+    def send_command(self, command):
+        """Write command to XT2046 (MicroPython).
+        Args:
+            command (byte): XT2046 command code.
+        Returns:
+            int: 12 bit response
+        """
+        self.tx_buf[0] = command
+        self.cs(0)
+        self.spi.write_readinto(self.tx_buf, self.rx_buf)
+        self.cs(1)
+
+        return (self.rx_buf[1] << 4) | (self.rx_buf[2] >> 4)
@@ -0,0 +1,9 @@
+"""
+Shared drivers of the esp32/* nodes: sensors, displays, MQTT and WiFi.
+
+Copy the directory to the device as /drivers and import the modules the node uses, for example
+import drivers.MHZ19B_AS as CO2. Nothing is imported here, so a node loads only its own modules.
+See README.md for the module list and tools/footprint.py for flash and import time per node.
+"""
+
+VERSION = (1, 0, 0)
@@ -0,0 +1,44 @@
+"""
+Host only (Raspberry Pi or PC): samples per second of AQI.aqi() in a loop, AQI.aqi_batch() with bisect and
+AQI.aqi_batch() with numpy arrays if numpy is installed. All results are checked equal to AQI.aqi().
+
+python3 benchmarks/aqi_batch.py [samples]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+from drivers.AQI import AQI
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def run(samples):
+    rnd = random.Random(1)
+    pm2_5 = [round(rnd.uniform(0, 300), 1) for _ in range(samples)]
+    pm10_0 = [float(rnd.randint(0, 450)) for _ in range(samples)]
+    t = time.perf_counter()
+    reference = [AQI.aqi(a, b) for a, b in zip(pm2_5, pm10_0)]
+    print("aqi() loop          %12.0f samples/s" % (samples / (time.perf_counter() - t)))
+    t = time.perf_counter()
+    result = AQI.aqi_batch(pm2_5, pm10_0)
+    print("aqi_batch() bisect  %12.0f samples/s" % (samples / (time.perf_counter() - t)))
+    assert list(result) == reference
+    if numpy is None:
+        print("numpy not installed, numpy.searchsorted path skipped")
+        return
+    a = numpy.array(pm2_5)
+    b = numpy.array(pm10_0)
+    t = time.perf_counter()
+    result = AQI.aqi_batch(a, b)
+    print("aqi_batch() numpy   %12.0f samples/s" % (samples / (time.perf_counter() - t)))
+    assert result.tolist() == reference
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,81 @@
+"""
+BME280 float compensation (_compensate) compared with the datasheet integer compensation (_compensate_int):
+time and heap per reading, and the largest difference over a sweep of raw values.
+Only compensation is timed, raw values are set directly without I2C. The read_loop rows add the store into
+readings: float compensates straight into readings, integer into int_readings and scales three values.
+Heap bytes are gc.mem_alloc() deltas on the device, the host prints "-".
+
+Device: import benchmarks.bme280_compensation (I2C pins from parameters.py, calibration from the sensor)
+Host: python3 benchmarks/bme280_compensation.py, calibration from drivers/DISPLAY_SIM.SimBME280
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+from array import array
+from utime import ticks_us, ticks_diff
+
+ROUNDS = 500
+
+
+def make_sensor():
+    from drivers.BME280_float import BME280
+    if HOST:
+        i2c = sim.SimI2C(devices={0x76: sim.SimBME280()})
+    else:
+        from machine import I2C, Pin
+        from parameters import I2C_SCL_PIN, I2C_SDA_PIN
+        i2c = I2C(scl=Pin(I2C_SCL_PIN), sda=Pin(I2C_SDA_PIN))
+    return BME280(i2c=i2c)
+
+
+def timed(name, func, result):
+    gc.collect()
+    used = '-' if HOST else gc.mem_alloc()
+    t = ticks_us()
+    for _ in range(ROUNDS):
+        func(result)
+    us = ticks_diff(ticks_us(), t)
+    if not HOST:
+        used = (gc.mem_alloc() - used) // ROUNDS
+    print("%-16s %8.1f us/reading %6s heap bytes/reading" % (name, us / ROUNDS, used))
+
+
+def run():
+    bme = make_sensor()
+    raw = bme._l3_resultarray
+    raw[0], raw[1], raw[2] = 519888, 415148, 30000
+    timed('float', bme._compensate, array('f', [0, 0, 0]))
+    timed('integer', bme._compensate_int, array('i', [0, 0, 0]))
+
+    def read_loop_integer(result):
+        bme._compensate_int(result)
+        bme._scale_int()
+
+    timed('read_loop float', bme._compensate, bme.readings)
+    timed('read_loop int', read_loop_integer, bme.int_readings)
+
+    worst_t = worst_p = worst_h = 0
+    f = array('f', [0, 0, 0])
+    i = array('i', [0, 0, 0])
+    for adc_t in range(420000, 600000, 20000):
+        for adc_p in range(250000, 450000, 25000):
+            for adc_h in range(20000, 45000, 2500):
+                raw[0], raw[1], raw[2] = adc_t, adc_p, adc_h
+                bme._compensate(f)
+                bme._compensate_int(i)
+                worst_t = max(worst_t, abs(f[0] - i[0] / 100))
+                worst_p = max(worst_p, abs(f[1] - i[1]))
+                if 0 < f[2] < 100:  # float path does not clamp humidity
+                    worst_h = max(worst_h, abs(f[2] - i[2] / 1024))
+    print("max difference: T %.3f C  P %.2f Pa  RH %.3f %%" % (worst_t, worst_p, worst_h))
+
+
+run()
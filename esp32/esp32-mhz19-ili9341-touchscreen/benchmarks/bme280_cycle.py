@@ -0,0 +1,59 @@
+"""
+BME280 measurements and I2C transactions in one screen + status + MQTT cycle of main.py.
+Before: every values / dew_point / altitude access made a new forced measurement (23 accesses per cycle).
+After: read_loop() measures once per interval and consumers read the cached numeric readings.
+
+Device: import benchmarks.bme280_cycle (I2C pins from parameters.py)
+Host: python3 benchmarks/bme280_cycle.py, BME280 is drivers/DISPLAY_SIM.SimBME280
+"""
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+import uasyncio as asyncio
+
+OLD_ACCESSES = 23  # values: 6 status loop, 9 screen, 6 MQTT + dew_point + altitude
+
+
+def make_sensor():
+    from drivers.BME280_float import BME280
+    if HOST:
+        i2c = sim.SimI2C(devices={0x76: sim.SimBME280()})
+    else:
+        from machine import I2C, Pin
+        from parameters import I2C_SCL_PIN, I2C_SDA_PIN
+        i2c = I2C(scl=Pin(I2C_SCL_PIN), sda=Pin(I2C_SDA_PIN))
+    return BME280(i2c=i2c)
+
+
+def report(name, bme, start_m, start_t):
+    print("%-8s measurements %3s  I2C transactions %4s" % (name, bme.measurements - start_m,
+                                                           bme.i2c_transactions - start_t))
+
+
+async def run():
+    bme = make_sensor()
+    m, t = bme.measurements, bme.i2c_transactions
+    for _ in range(OLD_ACCESSES):
+        bme.read_compensated_data()
+    report('before', bme, m, t)
+
+    m, t = bme.measurements, bme.i2c_transactions
+    task = asyncio.create_task(bme.read_loop(1))
+    await asyncio.sleep_ms(200)
+    for _ in range(OLD_ACCESSES):
+        temp, pressure, humidity = bme.readings
+    bme.dew_point
+    bme.altitude
+    report('after', bme, m, t)
+    task.cancel()
+    print("T %.2f C  P %.2f hPa  RH %.2f %%" % (temp, pressure / 100, humidity))
+
+
+asyncio.run(run())
@@ -0,0 +1,76 @@
+"""
+Longest uasyncio loop stall while reading BME280: read_compensated_data() (polls status with time.sleep_ms)
+compared with read_compensated_data_async() (awaits the datasheet measurement time).
+A ticker task sleeps 1 ms in a loop and records the longest gap between its wakeups.
+
+Device: import benchmarks.bme280_stall (I2C pins from parameters.py)
+Host: python3 benchmarks/bme280_stall.py, BME280 is drivers/DISPLAY_SIM.SimBME280
+"""
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+import uasyncio as asyncio
+from utime import ticks_ms, ticks_diff
+
+READS = 10
+
+
+def make_sensor():
+    from drivers.BME280_float import BME280
+    if HOST:
+        i2c = sim.SimI2C(devices={0x76: sim.SimBME280()})
+    else:
+        from machine import I2C, Pin
+        from parameters import I2C_SCL_PIN, I2C_SDA_PIN
+        i2c = I2C(scl=Pin(I2C_SCL_PIN), sda=Pin(I2C_SDA_PIN))
+    return BME280(i2c=i2c)
+
+
+class Ticker:
+
+    def __init__(self):
+        self.max_gap = 0
+        self.running = True
+
+    async def run(self):
+        last = ticks_ms()
+        while self.running:
+            await asyncio.sleep_ms(1)
+            now = ticks_ms()
+            self.max_gap = max(self.max_gap, ticks_diff(now, last))
+            last = now
+
+
+async def measure(name, bme, use_async):
+    ticker = Ticker()
+    task = asyncio.create_task(ticker.run())
+    await asyncio.sleep_ms(20)
+    ticker.max_gap = 0
+    t = ticks_ms()
+    for _ in range(READS):
+        if use_async:
+            await bme.read_compensated_data_async()
+        else:
+            bme.read_compensated_data()
+            await asyncio.sleep_ms(0)
+    ms = ticks_diff(ticks_ms(), t)
+    ticker.running = False
+    await task
+    print("%-28s %6s ms/read  longest loop stall %4s ms" % (name, ms // READS, ticker.max_gap))
+
+
+async def run():
+    bme = make_sensor()
+    print("measure_ms (datasheet max) %s" % bme.measure_ms)
+    await measure('read_compensated_data', bme, False)
+    await measure('read_compensated_data_async', bme, True)
+
+
+asyncio.run(run())
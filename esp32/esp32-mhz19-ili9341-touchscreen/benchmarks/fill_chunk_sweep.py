@@ -0,0 +1,70 @@
+"""
+ILI9341 fill throughput sweep over Display chunk_size at baudrate 40000000.
+
+Device: copy file to /benchmarks/ and in REPL: import benchmarks.fill_chunk_sweep
+Pins are read from parameters.py. Time is measured with ticks_us.
+
+Host: python3 benchmarks/fill_chunk_sweep.py in the project directory. Runs against drivers/DISPLAY_SIM.py and
+ranks chunk sizes by modelled bus time (bytes at baudrate + per transaction overhead), not measured time.
+set_chunk_size() allocates at least 2 * max(width, height) = 640 bytes, smaller sizes would repeat that row.
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+
+BAUDRATE = 40000000
+CHUNKS = (640, 2048, 4096, 8192, 15360)
+ROUNDS = 5
+
+
+def make_display():
+    if HOST:
+        import drivers.DISPLAY_SIM as sim
+        display, panel, spi = sim.ili9341_display(baudrate=BAUDRATE)
+        return display, spi
+    from machine import SPI, Pin
+    from parameters import TFT_SPI, TFT_CLK_PIN, TFT_MOSI_PIN, TFT_MISO_PIN, TFT_CS_PIN, TFT_DC_PIN, TFT_RST_PIN
+    from drivers.ILI9341 import Display
+    spi = SPI(TFT_SPI)
+    spi.init(baudrate=BAUDRATE, sck=Pin(TFT_CLK_PIN), mosi=Pin(TFT_MOSI_PIN), miso=Pin(TFT_MISO_PIN))
+    return Display(spi, cs=Pin(TFT_CS_PIN), dc=Pin(TFT_DC_PIN), rst=Pin(TFT_RST_PIN),
+                   width=320, height=240, rotation=90), spi
+
+
+def sweep():
+    display, spi = make_display()
+    from utime import ticks_us, ticks_diff
+    pixels = display.width * display.height * ROUNDS
+    best_chunk = None
+    best_rate = 0
+    print("chunk   us/screen   pixels/s   transactions")
+    for chunk in CHUNKS:
+        display.set_chunk_size(chunk)
+        gc.collect()
+        if HOST:
+            spi.reset_stats()
+        t = ticks_us()
+        for n in range(ROUNDS):
+            display.fill_rectangle(0, 0, display.width, display.height, 0xF800 if n & 1 else 0x07E0)
+        us = ticks_diff(ticks_us(), t)
+        if HOST:
+            us = int(spi.estimate_seconds() * 1000000)
+            transactions = spi.transactions // ROUNDS
+        else:
+            transactions = '-'
+        rate = pixels * 1000000 // max(us, 1)
+        print("%5s %11s %10s %14s" % (display.chunk_size, us // ROUNDS, rate, transactions))
+        if rate > best_rate:
+            best_rate = rate
+            best_chunk = display.chunk_size
+    print("Best chunk_size %s bytes, %s pixels/s (%s)" % (best_chunk, best_rate,
+                                                          'modelled host bus time' if HOST else 'measured'))
+    return best_chunk
+
+
+sweep()
@@ -0,0 +1,96 @@
+"""
+Idle task wakeups per minute of the screen wait and the touch driver while nobody touches the screen.
+
+- before: wait_timer as it was, asyncio.sleep_ms(1) until scr_upd_ival or a touch, and no driver task
+- after: wait_touch, asyncio.wait_for on the touch flag, plus XPT2046.sample_loop waiting on its interrupt
+  flag (ThreadSafeFlag, or on v1.13 an Event set through micropython.schedule)
+- no int pin: sample_loop without int_pin polls the controller every sample_ms
+The screen waits are copies of the TFTDisplay ones, main.py needs the whole node to import.
+
+Device: import benchmarks.idle_wakeups (touch SPI and pins from parameters.py, do not touch the screen)
+Host: python3 benchmarks/idle_wakeups.py, pins and SPI from drivers/DISPLAY_SIM.py
+"""
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+import uasyncio as asyncio
+from drivers.XPT2046 import Touch
+
+RUN_S = 10
+SCR_UPD_IVAL = 5
+
+
+class Screen(object):
+
+    def __init__(self):
+        self.t_tched = False
+        self.t_flag = asyncio.Event()
+        self.wakeups = 0
+
+    async def wait_timer_before(self):
+        n = 0
+        while (self.t_tched is False) and (n <= SCR_UPD_IVAL * 1000):
+            await asyncio.sleep_ms(1)
+            self.wakeups += 1
+            n += 1
+
+    async def wait_timer_after(self):
+        try:
+            await asyncio.wait_for(self.t_flag.wait(), SCR_UPD_IVAL)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeups += 1
+
+
+def make_touch(with_pin):
+    if HOST:
+        spi = sim.SimSPI(1)
+        cs = sim.SimPin(2)
+        pin = sim.SimPin(1, value=1) if with_pin else None
+    else:
+        from machine import SPI, Pin
+        from parameters import TS_SPI, TS_CS_PIN, TS_IRQ_PIN, TS_SCLK_PIN, TS_MOSI_PIN, TS_MISO_PIN
+        spi = SPI(TS_SPI)
+        spi.init(baudrate=1100000, sck=Pin(TS_SCLK_PIN), mosi=Pin(TS_MOSI_PIN), miso=Pin(TS_MISO_PIN))
+        cs = Pin(TS_CS_PIN)
+        pin = Pin(TS_IRQ_PIN) if with_pin else None
+    return Touch(spi, cs, int_pin=pin)
+
+
+async def screen_loop(wait):
+    while True:
+        await wait()
+
+
+async def measure(name, screen_wait, touch):
+    screen = Screen()
+    tasks = []
+    if screen_wait is not None:
+        tasks.append(asyncio.create_task(screen_loop(getattr(screen, screen_wait))))
+    if touch is not None:
+        tasks.append(asyncio.create_task(touch.sample_loop()))
+    await asyncio.sleep(RUN_S)
+    for task in tasks:
+        task.cancel()
+    await asyncio.sleep_ms(0)
+    driver = 0 if touch is None else touch.wakeups
+    print("%-12s %12.0f %12.0f %12.0f" % (name, screen.wakeups * 60 / RUN_S, driver * 60 / RUN_S,
+                                          (screen.wakeups + driver) * 60 / RUN_S))
+
+
+async def run():
+    print("idle %s s, screen update interval %s s" % (RUN_S, SCR_UPD_IVAL))
+    print("             screen/min   driver/min    total/min")
+    await measure('before', 'wait_timer_before', None)
+    await measure('after', 'wait_timer_after', make_touch(True))
+    await measure('no int pin', 'wait_timer_after', make_touch(False))
+
+
+asyncio.run(run())
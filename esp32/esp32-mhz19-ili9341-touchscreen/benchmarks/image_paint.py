@@ -0,0 +1,95 @@
+"""
+Compare full screen background paints: two fill_rectangle calls (as TFTDisplay.ok_bckg does),
+draw_image from a raw RGB565 file and draw_rle_image from a run length encoded file.
+
+Device: import benchmarks.image_paint (writes bench_bg.raw and bench_bg.rle to flash first).
+Host: python3 benchmarks/image_paint.py, modelled bus time from drivers/DISPLAY_SIM.py. Checksums of the
+three paints must match.
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+
+YELLOW = 0xFFE0
+LIGHT_GREEN = 0x87F0
+BORDER = 10
+
+
+def write_background(display, raw_path, rle_path):
+    """ Same picture as ok_bckg, written row by row so that RAM use stays small """
+    w = display.width
+    y_msb, y_lsb = YELLOW >> 8, YELLOW & 0xff
+    g_msb, g_lsb = LIGHT_GREEN >> 8, LIGHT_GREEN & 0xff
+    with open(raw_path, 'wb') as raw, open(rle_path, 'wb') as rle:
+        for y in range(display.height):
+            if BORDER <= y < display.height - BORDER:
+                spans = ((BORDER, y_msb, y_lsb), (w - 2 * BORDER, g_msb, g_lsb), (BORDER, y_msb, y_lsb))
+            else:
+                spans = ((w, y_msb, y_lsb),)
+            for count, msb, lsb in spans:
+                raw.write(bytes((msb, lsb)) * count)
+                while count:
+                    run = min(count, 255)
+                    rle.write(bytes((run, msb, lsb)))
+                    count -= run
+
+
+def make_display():
+    if HOST:
+        import drivers.DISPLAY_SIM as sim
+        display, panel, spi = sim.ili9341_display()
+        return display, panel, spi
+    from machine import SPI, Pin
+    from parameters import TFT_SPI, TFT_CLK_PIN, TFT_MOSI_PIN, TFT_MISO_PIN, TFT_CS_PIN, TFT_DC_PIN, TFT_RST_PIN
+    from drivers.ILI9341 import Display
+    spi = SPI(TFT_SPI)
+    spi.init(baudrate=40000000, sck=Pin(TFT_CLK_PIN), mosi=Pin(TFT_MOSI_PIN), miso=Pin(TFT_MISO_PIN))
+    return Display(spi, cs=Pin(TFT_CS_PIN), dc=Pin(TFT_DC_PIN), rst=Pin(TFT_RST_PIN),
+                   width=320, height=240, rotation=90), None, spi
+
+
+def run():
+    display, panel, spi = make_display()
+    from utime import ticks_us, ticks_diff
+    raw_path = 'bench_bg.raw'
+    rle_path = 'bench_bg.rle'
+    if HOST:
+        import tempfile
+        raw_path = os.path.join(tempfile.gettempdir(), raw_path)
+        rle_path = os.path.join(tempfile.gettempdir(), rle_path)
+    write_background(display, raw_path, rle_path)
+
+    def two_fills():
+        display.fill_rectangle(0, 0, display.width, display.height, YELLOW)
+        display.fill_rectangle(BORDER, BORDER, display.width - 2 * BORDER, display.height - 2 * BORDER, LIGHT_GREEN)
+
+    paints = (('two fill_rectangle', two_fills),
+              ('draw_image raw', lambda: display.draw_image(raw_path, 0, 0, display.width, display.height)),
+              ('draw_rle_image', lambda: display.draw_rle_image(rle_path, 0, 0, display.width, display.height)))
+    print("paint                      us   bytes on bus  heap used")
+    for name, paint in paints:
+        display.clear()
+        gc.collect()
+        if HOST:
+            spi.reset_stats()
+            used = '-'
+        else:
+            used = gc.mem_alloc()
+        t = ticks_us()
+        paint()
+        us = ticks_diff(ticks_us(), t)
+        if HOST:
+            us = int(spi.estimate_seconds() * 1000000)
+            nbytes = spi.bytes_written
+            print("%-20s %8s %14s %10s  checksum %08x" % (name, us, nbytes, used, panel.checksum()))
+        else:
+            used = gc.mem_alloc() - used
+            print("%-20s %8s %14s %10s" % (name, us, '-', used))
+
+
+run()
@@ -0,0 +1,69 @@
+"""
+One mqtt_publish_loop cycle (17 values) as 17 per-topic publishes and as one batched JSON message.
+
+Client is a stand-in that counts publishes and yields once per publish like MQTT_AS does, so no broker is needed.
+Bytes on air add TCP/IP (40) and 802.11 MAC/LLC (36) headers for every packet; TCP acks and WiFi
+retransmits are not counted. ms is formatting plus publishing per cycle.
+
+Device: import benchmarks.mqtt_batch
+Host: python3 benchmarks/mqtt_batch.py
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+import uasyncio as asyncio
+from drivers.MQTT_BATCH import PublishBatcher
+
+CYCLES = 50
+LINK_OVERHEAD = 40 + 36
+BASE = 'koti/sisa/olohuone/'
+READINGS = (('PM1_0', '%.1f', 3.2), ('PM1_0_ATM', '%.1f', 3.1), ('PM2_5', '%.1f', 5.6), ('PM2_5_ATM', '%.1f', 5.4),
+            ('PM10_0', '%.1f', 7.9), ('PM10_0_ATM', '%.1f', 7.7), ('PCNT_0_3', '%s', 912), ('PCNT_0_5', '%s', 270),
+            ('PCNT_1_0', '%s', 41), ('PCNT_2_5', '%s', 4), ('PCNT_5_0', '%s', 1), ('PCNT_10_0', '%s', 0),
+            ('lampo', '%.2f', 21.53), ('kosteus', '%.2f', 38.21), ('paine', '%.2f', 1012.64),
+            ('ilmanlaatu', '%s', 23), ('co2', '%s', 612))
+
+
+class CountingClient(object):
+
+    def __init__(self):
+        self.publishes = 0
+
+    async def publish(self, topic, msg, retain=False, qos=0):
+        self.publishes += 1
+        await asyncio.sleep_ms(0)
+
+
+async def cycles(batch_topic):
+    from utime import ticks_us, ticks_diff
+    client = CountingClient()
+    batch = PublishBatcher(batch_topic)
+    topics = [BASE + name for name, fmt, value in READINGS]
+    gc.collect()
+    t = ticks_us()
+    for _ in range(CYCLES):
+        for i in range(len(READINGS)):
+            name, fmt, value = READINGS[i]
+            batch.add(topics[i], fmt % value)
+        await batch.flush(client)
+    us = ticks_diff(ticks_us(), t)
+    on_air = batch.bytes + batch.packets * LINK_OVERHEAD
+    return batch.packets, batch.bytes, on_air, us / CYCLES / 1000, client.publishes == batch.total_packets
+
+
+async def run():
+    print("mode          packets/cycle  MQTT bytes  bytes on air  ms/cycle  counts ok")
+    for name, topic in (('per topic', None), ('batched', BASE + 'batch')):
+        packets, nbytes, on_air, ms, ok = await cycles(topic)
+        print("%-12s %14s %11s %13s %9.2f  %s" % (name, packets, nbytes, on_air, ms, ok))
+
+
+asyncio.run(run())
@@ -0,0 +1,120 @@
+"""
+QoS 1 publish throughput of MQTT_AS with the blocking publish (max_inflight 1) and with an in-flight window.
+
+Broker is a stand-in socket that answers every PUBLISH with a PUBACK after LATENCY ms, no WiFi or broker is
+needed. With LOSS > 0 every LOSS-th PUBACK is lost once, so the retransmit timer (response_time 1 s) is
+measured too. Every message must be acked once at least; dups is messages the broker got more than once.
+
+Device: import benchmarks.mqtt_inflight
+Host: python3 benchmarks/mqtt_inflight.py
+"""
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+import drivers.DISPLAY_SIM as sim
+sim.install_shims()
+
+import uasyncio as asyncio
+from utime import ticks_ms, ticks_diff
+from drivers.MQTT_AS import MQTTClient, config
+
+PUBLISHES = 40
+LATENCIES = (20, 100)
+WINDOWS = (1, 4, 8)
+LOSS = 10
+TOPIC = b'koti/sisa/olohuone/offline'
+MSG = '{"ts":1612345678,"co2":612,"lampo":21.53,"kosteus":38.21}'
+
+
+class BrokerSocket(sim.SimSocket):
+    """ Parses written PUBLISH packets, PUBACK of each is readable latency ms later """
+
+    def __init__(self, latency, loss=0):
+        super().__init__()
+        self.latency = latency
+        self.loss = loss
+        self.tx = bytearray()
+        self.acks = []
+        self.received = {}
+        self.publishes = 0
+
+    def write(self, buf, length=None):
+        n = super().write(buf, length)
+        self.tx.extend(buf[:n])
+        self._parse()
+        return n
+
+    def _parse(self):
+        while len(self.tx) >= 2:
+            sz = 0
+            shift = 0
+            i = 1
+            while True:
+                if i >= len(self.tx):
+                    return
+                sz |= (self.tx[i] & 0x7f) << shift
+                shift += 7
+                i += 1
+                if not self.tx[i - 1] & 0x80:
+                    break
+            if len(self.tx) < i + sz:
+                return
+            op = self.tx[0]
+            if op & 0xf0 == 0x30 and op & 6:
+                tl = self.tx[i] << 8 | self.tx[i + 1]
+                pid = self.tx[i + 2 + tl] << 8 | self.tx[i + 3 + tl]
+                msg = bytes(self.tx[i + 4 + tl:i + sz])
+                self.received[msg] = self.received.get(msg, 0) + 1
+                self.publishes += 1
+                if not (self.loss and self.publishes % self.loss == 0):
+                    self.acks.append((ticks_ms(), pid))
+            del self.tx[:i + sz]
+
+    def read(self, n):
+        if not self.rx and self.acks and ticks_diff(ticks_ms(), self.acks[0][0]) >= self.latency:
+            t, pid = self.acks.pop(0)
+            self.feed(bytes((0x40, 2, pid >> 8, pid & 0xff)))
+        return super().read(n)
+
+
+async def run_one(latency, window, loss):
+    cfg = dict(config)
+    cfg['server'] = 'sim'
+    cfg['max_inflight'] = window
+    cfg['response_time'] = 1
+    client = MQTTClient(cfg)
+    sock = BrokerSocket(latency, loss)
+    client._sock = sock
+    client._isconnected = True
+    client._has_connected = True
+    handler = asyncio.create_task(client._handle_msg())
+    resend = asyncio.create_task(client._resend()) if window > 1 else None
+    t = ticks_ms()
+    for i in range(PUBLISHES):
+        await client.publish(TOPIC, '%s,"n":%d}' % (MSG[:-1], i), qos=1)
+    await client.wait_inflight()
+    ms = ticks_diff(ticks_ms(), t)
+    client._isconnected = False
+    for task in (handler, resend):
+        if task is not None:
+            task.cancel()
+    await asyncio.sleep_ms(0)
+    dups = sum(1 for c in sock.received.values() if c > 1)
+    return ms, len(sock.received) == PUBLISHES, dups, client.REPUB_COUNT
+
+
+async def run():
+    print("latency ms  loss  window  ms/%s pubs  pubs/s  all acked  dups  repubs" % PUBLISHES)
+    for loss in (0, LOSS):
+        for latency in LATENCIES:
+            for window in WINDOWS:
+                ms, ok, dups, repubs = await run_one(latency, window, loss)
+                print("%10s %5s %7s %12s %7.1f %10s %5s %7s" % (latency, '1/%s' % loss if loss else '-', window,
+                                                              ms, PUBLISHES * 1000 / ms, ok, dups, repubs))
+
+
+asyncio.run(run())
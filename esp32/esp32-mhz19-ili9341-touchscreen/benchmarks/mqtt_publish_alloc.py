@@ -0,0 +1,109 @@
+"""
+Heap allocation and socket writes per MQTT_AS publish: the old per-publish bytearray/slicing path compared with
+the preallocated packet buffer, with str topics and with pre-encoded bytes topics.
+
+Socket is DISPLAY_SIM.SimSocket (write takes at most 1460 bytes per call), no broker or WiFi is needed. ms is
+mostly the 5 ms socket poll delay MQTT_AS sleeps after every write.
+heap/pub is measured with gc disabled; pubs/GC is free heap at start divided by heap/pub, i.e. how many
+publishes fill the heap and force a collection.
+
+Device: import benchmarks.mqtt_publish_alloc
+Host: python3 benchmarks/mqtt_publish_alloc.py (timing and writes only, heap columns are measured on the device)
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+import drivers.DISPLAY_SIM as sim
+sim.install_shims()
+
+import uasyncio as asyncio
+import ustruct as struct
+from utime import ticks_ms
+from drivers.MQTT_AS import MQTTClient, MQTTException, config
+
+PUBLISHES = 340
+BASE = 'koti/sisa/olohuone/'
+NAMES = ('PM1_0', 'PM1_0_ATM', 'PM2_5', 'PM2_5_ATM', 'PM10_0', 'PM10_0_ATM', 'PCNT_0_3', 'PCNT_0_5',
+         'PCNT_1_0', 'PCNT_2_5', 'PCNT_5_0', 'PCNT_10_0', 'lampo', 'kosteus', 'paine', 'ilmanlaatu', 'co2')
+
+
+class LegacyClient(MQTTClient):
+    """ _publish and _as_write as they were before the packet buffer """
+
+    async def _as_write(self, bytes_wr, length=0, sock=None):
+        if sock is None:
+            sock = self._sock
+        if length:
+            bytes_wr = bytes_wr[:length]
+        while bytes_wr:
+            n = sock.write(bytes_wr)
+            if n:
+                bytes_wr = bytes_wr[n:]
+            await asyncio.sleep_ms(5)  # _SOCKET_POLL_DELAY
+
+    async def _publish(self, topic, msg, retain, qos, dup, pid):
+        pkt = bytearray(b"\x30\0\0\0")
+        pkt[0] |= qos << 1 | retain | dup << 3
+        sz = 2 + len(topic) + len(msg)
+        if qos > 0:
+            sz += 2
+        if sz >= 2097152:
+            raise MQTTException('Strings too long.')
+        i = 1
+        while sz > 0x7f:
+            pkt[i] = (sz & 0x7f) | 0x80
+            sz >>= 7
+            i += 1
+        pkt[i] = sz
+        await self._as_write(pkt, i + 1)
+        await self._as_write(struct.pack("!H", len(topic)))
+        await self._as_write(topic)
+        await self._as_write(msg)
+
+
+def make(cls):
+    cfg = dict(config)
+    cfg['server'] = 'sim'
+    client = cls(cfg)
+    client._sock = sim.SimSocket()
+    client._isconnected = True
+    return client
+
+
+async def run_one(client, topics, payloads):
+    n = len(topics)
+    gc.collect()
+    free = None if HOST else gc.mem_free()
+    used = None if HOST else gc.mem_alloc()
+    if not HOST:
+        gc.disable()
+    t = ticks_ms()
+    for i in range(PUBLISHES):
+        await client.publish(topics[i % n], payloads[i % n], qos=0)
+    ms = ticks_ms() - t
+    if HOST:
+        return '-', '-', ms
+    used = (gc.mem_alloc() - used) // PUBLISHES
+    gc.enable()
+    return used, free // used if used else 'never', ms
+
+
+async def run():
+    str_topics = [BASE + name for name in NAMES]
+    bytes_topics = [topic.encode() for topic in str_topics]
+    payloads = ['%.1f' % (i * 1.7) for i in range(len(NAMES))]
+    print("path                       heap/pub  pubs/GC  writes/pub  ms/%s pubs" % PUBLISHES)
+    for name, cls, topics in (('legacy, str topics', LegacyClient, str_topics),
+                              ('buffer, str topics', MQTTClient, str_topics),
+                              ('buffer, bytes topics', MQTTClient, bytes_topics)):
+        client = make(cls)
+        used, per_gc, ms = await run_one(client, topics, payloads)
+        print("%-24s %10s %8s %11.1f %8s" % (name, used, per_gc, client._sock.writes / PUBLISHES, ms))
+
+
+asyncio.run(run())
@@ -0,0 +1,126 @@
+"""
+PMS7003 frame parser: frames per second and heap allocated per frame on a simulated UART stream.
+The stream has noise between frames and every fifth frame has a bad checksum, so header resync is exercised.
+
+Device: import benchmarks.pms7003_parser (UART from parameters.py is opened, sensor is not read).
+Host: python3 benchmarks/pms7003_parser.py, also runs read_frame() through the shim StreamReader.
+Legacy row is the old struct.unpack + new dictionary per frame for comparison, it parses the stream in place.
+The new row also copies the stream in CHUNK byte reads into the scan buffer like the UART reads do.
+Heap bytes per frame are gc.mem_alloc() deltas, the host prints "-". The new row covers parse() only, the
+read_frame row adds the reads: one new bytes object per read on v1.13, a memoryview slice with readinto.
+"""
+import gc
+import struct
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+FRAMES = 200
+CHUNK = 16
+
+
+def make_frame(n, bad=False):
+    data = [28, 10 + n % 7, 20 + n % 11, 30, 11, 21, 31, 1000 + n, 500, 100, 10, 5, 1]
+    frame = bytearray(b'\x42\x4d' + struct.pack('>13H', *data) + bytes((0x91, 0)))
+    checksum = sum(frame) + (1 if bad else 0)
+    return bytes(frame + struct.pack('>H', checksum & 0xffff))
+
+
+def make_stream(frames):
+    out = bytearray()
+    for n in range(frames):
+        out.extend(b'\x00\x42\xff')
+        out.extend(make_frame(n, bad=(n % 5 == 4)))
+    return bytes(out)
+
+
+def legacy_parse(stream):
+    count = 0
+    last = None
+    i = 0
+    while i < len(stream) - 31:
+        if stream[i] != 0x42 or stream[i + 1] != 0x4d:
+            i += 1
+            continue
+        read_bytes = stream[i + 2:i + 32]
+        data = struct.unpack('!HHHHHHHHHHHHHBBH', read_bytes)
+        if 0x42 + 0x4d + sum(read_bytes[:28]) != data[15]:
+            i += 1
+            continue
+        last = {'PM1_0': data[1], 'PM2_5': data[2], 'PM10_0': data[3], 'PM1_0_ATM': data[4], 'PM2_5_ATM': data[5],
+             'PM10_0_ATM': data[6], 'PCNT_0_3': data[7], 'PCNT_0_5': data[8], 'PCNT_1_0': data[9],
+             'PCNT_2_5': data[10], 'PCNT_5_0': data[11], 'PCNT_10_0': data[12], 'VERSION': data[13],
+             'ERROR': data[14], 'CHECKSUM': data[15], 'FRAME_LENGTH': data[0]}
+        count += 1
+        i += 32
+    return count if last is not None else 0
+
+
+def new_parse(pms, stream):
+    """ Copies CHUNK bytes at a time into the scan buffer like readinto does """
+    count = 0
+    buf = pms._buf
+    src = memoryview(stream)
+    i = 0
+    end = len(stream)
+    while i < end:
+        if pms._n == len(buf):
+            pms._compact()
+        n = min(CHUNK, len(buf) - pms._n, end - i)
+        pms._mv[pms._n:pms._n + n] = src[i:i + n]
+        pms._n += n
+        i += n
+        while pms.parse():
+            count += 1
+    return count
+
+
+def read_frames(pms, frames):
+    """ Frames through read_frame(), the UART reads included """
+    import uasyncio as asyncio
+
+    async def read():
+        for n in range(frames):
+            await pms.read_frame()
+
+    start = pms.frames
+    asyncio.run(read())
+    return pms.frames - start
+
+
+def measure(name, func):
+    from utime import ticks_us, ticks_diff
+    gc.collect()
+    used = '-' if HOST else gc.mem_alloc()
+    t = ticks_us()
+    count = func()
+    us = ticks_diff(ticks_us(), t)
+    if not HOST:
+        used = (gc.mem_alloc() - used) // max(count, 1)
+    print("%-10s frames %5s  %8.0f frames/s  %6s bytes/frame" % (name, count, count * 1000000 / max(us, 1), used))
+
+
+def run():
+    from drivers.PMS7003_AS import PSensorPMS7003
+    if HOST:
+        pms = PSensorPMS7003()
+    else:
+        from parameters import P_SEN_UART, P_SEN_TX, P_SEN_RX
+        pms = PSensorPMS7003(uart=P_SEN_UART, rxpin=P_SEN_RX, txpin=P_SEN_TX)
+    stream = make_stream(FRAMES)
+    measure('legacy', lambda: legacy_parse(stream))
+    measure('new', lambda: new_parse(pms, stream))
+    print("crc errors %s, last PM2.5 %s PCNT_0_3 %s" % (pms.crc_errors, pms.pm2_5, pms.values[pms.PMS_PCNT_0_3]))
+    if HOST:
+        pms.sensor.feed(make_stream(10))
+        measure('read_frame', lambda: read_frames(pms, 8))
+        print("read_frame over SimUART: PM2.5 %s" % pms.pm2_5)
+
+
+run()
@@ -0,0 +1,95 @@
+"""
+Offline publish log over a simulated outage: 20 channels every 60 s for OUTAGE_HOURS, then drain.
+
+Prints records written, dropped and drained, appends per segment file (filesystem writes), heap change while logging
+(device) and drain time. Drain is QoS 1 like in main.py and the link drops once in the middle of it, drain
+must stop and go on from the same record. Every drained timestamp is checked to arrive once at least.
+
+Device: import benchmarks.publish_log (uses plogb*.bin files, removed at the end)
+Host: python3 benchmarks/publish_log.py (files in a temporary directory)
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    import tempfile
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+    os.chdir(tempfile.mkdtemp())
+
+import uasyncio as asyncio
+from drivers.PUBLISH_LOG import PublishLog, EPOCH_OFFSET
+
+CHANNELS = 20
+INTERVAL = 60
+OUTAGE_HOURS = 10
+SEGMENTS = 32
+
+
+class CountingClient(object):
+    """ Link drops after drop_after messages, until connected is set again """
+
+    def __init__(self, drop_after=None):
+        self.messages = 0
+        self.times = set()
+        self.drop_after = drop_after
+        self.connected = True
+
+    def isconnected(self):
+        return self.connected
+
+    async def publish(self, topic, msg, retain=False, qos=0):
+        self.messages += 1
+        self.times.add(int(msg[6:msg.index(',')]) - EPOCH_OFFSET)
+        if self.messages == self.drop_after:
+            self.connected = False
+        await asyncio.sleep_ms(0)
+
+    async def wait_inflight(self):
+        await asyncio.sleep_ms(0)
+
+
+async def run():
+    from utime import ticks_ms, ticks_diff
+    log = PublishLog([('ch%d' % i, '%.2f') for i in range(CHANNELS)], prefix='plogb', segments=SEGMENTS)
+    appends = [0] * SEGMENTS
+    cycles = OUTAGE_HOURS * 3600 // INTERVAL
+    gc.collect()
+    heap = None if HOST else gc.mem_alloc()
+    t = ticks_ms()
+    for c in range(cycles):
+        for i in range(CHANNELS):
+            log.add(i, 20.0 + i + c / 100, c * INTERVAL)
+        before = log.head_seq
+        log.commit()
+        appends[log.head_seq % SEGMENTS] += 1
+        if before is not None and before != log.head_seq:
+            appends[before % SEGMENTS] += 1
+    log_ms = ticks_diff(ticks_ms(), t)
+    gc.collect()
+    heap = '-' if HOST else gc.mem_alloc() - heap
+    client = CountingClient(drop_after=cycles // 4)
+    t = ticks_ms()
+    await log.drain(client, 'bench/offline', qos=1)
+    stopped = log.pending
+    client.connected = True
+    await log.drain(client, 'bench/offline', qos=1)
+    drain_ms = ticks_diff(ticks_ms(), t)
+    kept = log.drained // CHANNELS
+    print("outage h %s, cycles %s, records written %s, dropped %s, drained %s" % (
+          OUTAGE_HOURS, cycles, log.written, log.dropped, log.drained))
+    print("ring %s x %s records, holds %.1f h at this rate" % (SEGMENTS, log.seg_records,
+                                                               SEGMENTS * log.seg_records * INTERVAL / CHANNELS / 3600))
+    print("appends per segment min %s max %s" % (min(appends), max(appends)))
+    print("heap change while logging %s, log ms %s, drain ms %s, messages %s" % (heap, log_ms, drain_ms,
+                                                                                  client.messages))
+    print("link dropped during drain, %s records left, then %s" % (stopped, log.pending))
+    print("newest %s cycles all drained: %s" % (kept, set(range(cycles - kept, cycles)) <= {
+          t // INTERVAL for t in client.times}))
+
+
+asyncio.run(run())
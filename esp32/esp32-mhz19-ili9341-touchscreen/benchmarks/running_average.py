@@ -0,0 +1,57 @@
+"""
+Per update cost and heap use of the old append / sum() / pop(0) average compared with RunningAverage.
+
+Device: import benchmarks.running_average
+Host: python3 benchmarks/running_average.py (timing only, heap column is measured on the device)
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(1, os.path.join(sys.path[0], '..'))  # shared esp32/drivers
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+
+UPDATES = 2000
+WINDOW = 20
+
+
+def list_average(n):
+    values = []
+    average = 0
+    for i in range(n):
+        values.append(400 + i % 37)
+        average = sum(values) / len(values)
+        if len(values) == WINDOW:
+            values.pop(0)
+    return average
+
+
+def ring_average(n):
+    from drivers.RUNNING_AVERAGE import RunningAverage
+    values = RunningAverage(WINDOW)
+    average = 0
+    for i in range(n):
+        values.add(400 + i % 37)
+        average = values.mean
+    return average
+
+
+def run():
+    from utime import ticks_us, ticks_diff
+    print("method            us/update  heap bytes/update  last mean")
+    for name, func in (('list sum/pop', list_average), ('RunningAverage', ring_average)):
+        gc.collect()
+        used = '-' if HOST else gc.mem_alloc()
+        t = ticks_us()
+        mean = func(UPDATES)
+        us = ticks_diff(ticks_us(), t)
+        if not HOST:
+            used = (gc.mem_alloc() - used) // UPDATES
+        print("%-16s %10.2f %18s %10.2f" % (name, us / UPDATES, used, mean))
+
+
+run()
@@ -9,22 +9,29 @@ import uasyncio as asyncio
 from utime import time, mktime, localtime, sleep
 import gc
 from drivers.MQTT_AS import MQTTClient, config
-import network
+from drivers.MQTT_BATCH import PublishBatcher
+from drivers.CHANNELS import Channel, ChannelRegistry
 import drivers.WIFICONN_AS as WifiNet
 from drivers.XPT2046 import Touch
 from drivers.ILI9341 import Display, color565
 from drivers.XGLCD_FONT import XglcdFont
 from drivers.AQI import AQI
+from drivers.NOWCAST import NowCast
 import drivers.PMS7003_AS as PARTICLES
 import drivers.MHZ19B_AS as CO2
 import drivers.BME280_float as BmE
 from json import load
 import esp
 import esp32
+try:
+    from uasyncio import ThreadSafeFlag as TouchFlag
+except ImportError:
+    from uasyncio import Event as TouchFlag
 gc.collect()
 
 # Globals
 mqtt_up = False
+sending = False
 broker_uptime = 0
 
 try:
@@ -64,10 +71,22 @@ try:
         SCREEN_UPDATE_INTERVAL = data['SCREEN_UPDATE_INTERVAL']
         DEBUG_SCREEN_ACTIVE = data['DEBUG_SCREEN_ACTIVE']
         SCREEN_TIMEOUT = data['SCREEN_TIMEOUT']
+        SCREEN_TIME_SLICE_MS = data['SCREEN_TIME_SLICE_MS']
+        BME280_READ_INTERVAL = data['BME280_READ_INTERVAL']
+        BME280_INTEGER = data['BME280_INTEGER']
+        WIFI_SAMPLE_INTERVAL = data['WIFI_SAMPLE_INTERVAL']
+        PMS_DUTY_PERIOD = data['PMS_DUTY_PERIOD']
+        PMS_SPINUP_TIME = data['PMS_SPINUP_TIME']
+        PMS_FRAMES_PER_WAKE = data['PMS_FRAMES_PER_WAKE']
         TOPIC_TEMP = data['TOPIC_TEMP']
         TOPIC_RH = data['TOPIC_RH']
         TOPIC_PRESSURE = data['TOPIC_PRESSURE']
         TOPIC_AIRQUALITY = data['TOPIC_AIRQUALITY']
+        TOPIC_AQI_NOWCAST = data['TOPIC_AQI_NOWCAST']
+        TOPIC_AQI_24H = data['TOPIC_AQI_24H']
+        MQTT_BATCH_TOPIC = data['MQTT_BATCH_TOPIC']
+        OFFLINE_LOG_SEGMENTS = data['OFFLINE_LOG_SEGMENTS']
+        TOPIC_OFFLINE = data['TOPIC_OFFLINE']
         TOPIC_CO2 = data['TOPIC_CO2']
         TOPIC_PM1_0 = data['TOPIC_PM1_0']
         TOPIC_PM1_0_ATM = data['TOPIC_PM1_0_ATM']
@@ -119,7 +138,7 @@ class TFTDisplay(object):
 
         # Display - some digitizers may be rotated 270 degrees!
         self.d = Display(spi=dispspi, cs=Pin(TFT_CS_PIN), dc=Pin(TFT_DC_PIN), rst=Pin(TFT_RST_PIN),
-                         width=320, height=240, rotation=90)
+                         width=320, height=240, rotation=90, time_slice_ms=SCREEN_TIME_SLICE_MS)
         self.unispace = XglcdFont('fonts/Unispace12x24.c', 12, 24)
         self.a_font = self.unispace
         self.cols = {'red': color565(255, 0, 0), 'green': color565(0, 255, 0), 'blue': color565(0, 0, 255),
@@ -140,6 +159,8 @@ class TFTDisplay(object):
                          width=240, height=320, x_min=100, x_max=1962, y_min=100, y_max=1900)
         self.xpt.int_handler = self.first_touch
         self.t_tched = False
+        self.t_flag = TouchFlag()
+        self.wakeups = 0
         self.scr_actv_time = None
         self.r_num = 1
         self.r_h = 10
@@ -150,13 +171,16 @@ class TFTDisplay(object):
         self.scr_tout = SCREEN_TIMEOUT
         self.d_all_ok = True
         self.scr_upd_ival = SCREEN_UPDATE_INTERVAL
+        self.rot_ival = 5
         self.d_scr_active = False
         self.rw_col = None
         self.rows = None
         self.dtl_scr_sel = None
+        self.frm_blk_ms = 0
 
     def first_touch(self, x, y):
         self.t_tched = True
+        self.t_flag.set()
 
     async def rot_scr(self):
         self.d_scr_active = True
@@ -204,17 +228,28 @@ class TFTDisplay(object):
                 r, r_c = await self.upd_welcome()
                 await self.show_screen(r, r_c)
 
+    async def wait_touch(self, timeout):
+        # Touch interrupt sets the flag, no polling. Returns True if touched before timeout.
+        try:
+            await asyncio.wait_for(self.t_flag.wait(), timeout)
+            touched = True
+        except asyncio.TimeoutError:
+            touched = False
+        self.wakeups += 1
+        return touched
+
     async def wait_timer_rotate(self):
-        n = 0
-        while (self.d_scr_active is True) and (n <= 5 * 1000):  # todo: 5s from variable
-            await asyncio.sleep_ms(1)
-            n += 1
+        # Next detail screen after rot_ival or touch
+        if hasattr(self.t_flag, 'clear'):
+            self.t_flag.clear()
+        if self.d_scr_active is True:
+            await self.wait_touch(self.rot_ival)
 
     async def wait_timer(self):
-        n = 0
-        while (self.t_tched is False) and (n <= self.scr_upd_ival * 1000):
-            await asyncio.sleep_ms(1)
-            n += 1
+        if hasattr(self.t_flag, 'clear'):
+            self.t_flag.clear()
+        if self.t_tched is False:
+            await self.wait_touch(self.scr_upd_ival)
 
     async def show_screen(self, rows, row_colours):
         r1 = "Airquality v1.0"
@@ -249,83 +284,82 @@ class TFTDisplay(object):
         r6 = r6[:max_c]
         r7 = r7[:max_c]
 
+        self.d.start_frame()
         if self.d_all_ok is True:
             await self.ok_bckg()
         else:
             await self.error_bckg()
-        self.d.draw_text(self.indent_p, 25, r1, self.a_font, self.cols[r1_c], self.cols[self.col_bckg])
-        self.d.draw_text(self.indent_p, 25 + self.r_h, r2, self.a_font, self.cols[r2_c], self.cols[self.col_bckg])
-        self.d.draw_text(self.indent_p, 25 + self.r_h * 2, r3, self.a_font, self.cols[r3_c], self.cols[self.col_bckg])
-        self.d.draw_text(self.indent_p, 25 + self.r_h * 3, r4, self.a_font, self.cols[r4_c], self.cols[self.col_bckg])
-        self.d.draw_text(self.indent_p, 25 + self.r_h * 4, r5, self.a_font, self.cols[r5_c], self.cols[self.col_bckg])
-        self.d.draw_text(self.indent_p, 25 + self.r_h * 5, r6, self.a_font, self.cols[r6_c], self.cols[self.col_bckg])
-        self.d.draw_text(self.indent_p, 25 + self.r_h * 6, r7, self.a_font, self.cols[r7_c], self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25, r1, self.a_font, self.cols[r1_c],
+                                     self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25 + self.r_h, r2, self.a_font, self.cols[r2_c],
+                                     self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25 + self.r_h * 2, r3, self.a_font, self.cols[r3_c],
+                                     self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25 + self.r_h * 3, r4, self.a_font, self.cols[r4_c],
+                                     self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25 + self.r_h * 4, r5, self.a_font, self.cols[r5_c],
+                                     self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25 + self.r_h * 5, r6, self.a_font, self.cols[r6_c],
+                                     self.cols[self.col_bckg])
+        await self.d.draw_text_async(self.indent_p, 25 + self.r_h * 6, r7, self.a_font, self.cols[r7_c],
+                                     self.cols[self.col_bckg])
+        self.frm_blk_ms = self.d.end_frame()
         gc.collect()
         await self.wait_timer()
 
     async def ok_bckg(self):
-        self.d.fill_rectangle(0, 0, self.d.width, self.d.height, self.cols['yellow'])
-        self.d.fill_rectangle(10, 10, self.d.width-20, self.d.height-20, self.cols['light_green'])
+        await self.d.fill_rectangle_async(0, 0, self.d.width, self.d.height, self.cols['yellow'])
+        await self.d.fill_rectangle_async(10, 10, self.d.width-20, self.d.height-20, self.cols['light_green'])
         self.col_bckg = 'light_green'
 
     async def error_bckg(self):
-        self.d.fill_rectangle(0, 0, self.d.width, self.d.height, self.cols['red'])
-        self.d.fill_rectangle(10, 10, self.d.width-20, self.d.height-20, self.cols['light_green'])
+        await self.d.fill_rectangle_async(0, 0, self.d.width, self.d.height, self.cols['red'])
+        await self.d.fill_rectangle_async(10, 10, self.d.width-20, self.d.height-20, self.cols['light_green'])
         self.col_bckg = 'light_green'
 
     @staticmethod
     async def upd_welcome():
         r1 = "%s %s %s" % (resolve_date()[2], resolve_date()[0], resolve_date()[1])
         r1_c = 'black'
-        if co2s.co2_value is None:
+        # One read of every source, screen and background use the same values
+        disp.d_all_ok = not channels.sample()
+        ch = channels.ch
+        co2, co2_now, aqi = ch['co2'], ch['co2_now'], ch['aqi']
+        if co2_now.value is None:
             r2 = "CO2: waiting..."
             r2_c = 'yellow'
-        elif co2s.co2_average is None:
+        elif co2.value is None:
             r2 = "CO2 average counting..."
             r2_c = 'yellow'
         else:
-            r2 = "CO2: %s ppm (%s)" % ("{:.1f}".format(co2s.co2_value), "{:.1f}".format(co2s.co2_average))
-            if (co2s.co2_average > CO2_ALM_THOLD) or (co2s.co2_value > CO2_ALM_THOLD):
-                r2_c = 'red'
-            else:
-                r2_c = 'blue'
-        if aq.aqinndex is None:
+            r2 = "CO2: %s ppm (%.1f)" % (co2_now.text(), co2.value)
+            r2_c = 'red' if (co2.alarm or co2_now.alarm) else 'blue'
+        if aqi.value is None:
             r3 = "AirQuality not ready"
             r3_c = 'yellow'
         else:
-            r3 = "Air Quality Index: %s" % ("{:.1f}".format(aq.aqinndex))
-            if aq.aqinndex > AQ_THOLD:
-                r3_c = 'red'
-            else:
-                r3_c = 'blue'
-        if bmes.values[0] is None:
+            r3 = "Air Quality Index: %.1f" % aqi.value
+            r3_c = 'red' if aqi.alarm else 'blue'
+        temp, rh, pressure = ch['temp'], ch['rh'], ch['pressure']
+        if temp.value is None:
             r4 = "Waiting values..."
             r4_c = 'yellow'
         else:
-            r4 = "Temp: %s (DP: %sC)" % (bmes.values[0], "{:.1f}".format(bmes.dew_point))
-            if float(bmes.values[0][:-1]) > TEMP_THOLD:
-                r4_c = 'red'
-            else:
-                r4_c = 'blue'
-        if bmes.values[2] is None:
+            r4 = "Temp: %sC (DP: %.1fC)" % (temp.text(), bmes.dew_point)
+            r4_c = 'red' if temp.alarm else 'blue'
+        if rh.value is None:
             r5 = "Waiting values..."
             r5_c = 'yellow'
         else:
-            r5 = "Humidity: %s (%sM)" % (bmes.values[2], "{:.1f}".format(bmes.altitude))
-            if float(bmes.values[2][:-1]) > RH_THOLD:
-                r5_c = 'red'
-            else:
-                r5_c = 'blue'
-        if bmes.values[1] is None:
+            r5 = "Humidity: %s%% (%.1fM)" % (rh.text(), bmes.altitude)
+            r5_c = 'red' if rh.alarm else 'blue'
+        if pressure.value is None:
             r6 = "Waiting values..."
             r6_c = 'yellow'
         else:
-            r6 = "Pressure: %s ATM" % bmes.values[1]
-            if float(bmes.values[1][:-3]) > P_THOLD:
-                r6_c = 'red'
-            else:
-                r6_c = 'blue'
-        if aq.aqinndex is None:  # no detail offering prior to AQ values
+            r6 = "Pressure: %shPa ATM" % pressure.text()
+            r6_c = 'red' if pressure.alarm else 'blue'
+        if aqi.value is None:  # no detail offering prior to AQ values
             r7 = " "
         else:
             r7 = "Touch and wait details"
@@ -447,41 +481,30 @@ class AirQuality(object):
         self.aqinndex = None
         self.pms = pmssensor
         self.upd_ival = pms.read_interval + 1
+        self.nowcast = NowCast()
+        self.nowcast_aqi = None
+        self.aqi_24h = None
+        self.pms_updates = 0
 
     async def upd_aq_loop(self):
         while True:
             if self.pms.pms_dictionary is not None:
-                if (self.pms.pms_dictionary['PM2_5_ATM'] != 0) and (self.pms.pms_dictionary['PM10_0_ATM'] != 0):
-                    self.aqinndex = (AQI.aqi(self.pms.pms_dictionary['PM2_5_ATM'],
-                                             self.pms.pms_dictionary['PM10_0_ATM']))
+                if self.pms.updates != self.pms_updates:
+                    self.pms_updates = self.pms.updates
+                    self.nowcast.add(self.pms.pms_dictionary['PM2_5_ATM'], self.pms.pms_dictionary['PM10_0_ATM'])
+                    self.nowcast_aqi = self.nowcast.nowcast_aqi()
+                    self.aqi_24h = self.nowcast.aqi_24h()
+                pm2_5 = self.pms.smoothed(self.pms.PMS_PM2_5_ATM)
+                pm10_0 = self.pms.smoothed(self.pms.PMS_PM10_0_ATM)
+                if (pm2_5 != 0) and (pm10_0 != 0):
+                    self.aqinndex = AQI.aqi(pm2_5, pm10_0)
             await asyncio.sleep(self.upd_ival)
 
 
 async def upd_status_loop():
     while True:
-        # For network
-        if net.net_ok is True:
-            net.use_ssid = network.WLAN(network.STA_IF).config('essid')
-            net.ip_a = network.WLAN(network.STA_IF).ifconfig()[0]
-            net.strength = network.WLAN(network.STA_IF).status('rssi')
-
         # For sensors tresholds, background change
-        disp.d_all_ok = True
-        if co2s.co2_average is not None:
-            if co2s.co2_average > CO2_ALM_THOLD:
-                disp.d_all_ok = False
-        if aq.aqinndex is not None:
-            if aq.aqinndex > AQ_THOLD:
-                disp.d_all_ok = False
-        if bmes.values[0] is not None:
-            if float(bmes.values[0][:-1]) > TEMP_THOLD:
-                disp.d_all_ok = False
-        if bmes.values[2] is not None:
-            if float(bmes.values[2][:-1]) > RH_THOLD:
-                disp.d_all_ok = False
-        if bmes.values[1] is not None:
-            if float(bmes.values[1][:-3]) > P_THOLD:
-                disp.d_all_ok = False
+        disp.d_all_ok = not channels.sample()
         gc.collect()
         await asyncio.sleep(disp.scr_upd_ival - 2)
 
@@ -491,15 +514,33 @@ async def show_what_i_do():
 
     while True:
         if START_NETWORK == 1:
-            print("WiFi Connected %s" % net.net_ok)
+            print("WiFi Connected %s, state %s" % (net.net_ok, net.state_name))
             print("WiFi failed connects %s" % net.con_att_fail)
+            print("WiFi connect ms %s fast %s, history %s" % (net.conn_ms, net.conn_fast, net.conn_history))
         if START_MQTT == 1:
             print("MQTT Connected %s" % mqtt_up)
             print("MQTT broker uptime %s" % broker_uptime)
+            print("MQTT cycle packets %s, bytes %s, awake ms %s" % (batch.packets, batch.bytes, batch.awake_ms))
         print("Memory free: %s" % gc.mem_free())
         print("Memory alloc: %s" % gc.mem_alloc())
         print("Toucscreen pressed: %s" % disp.t_tched)
         print("Details screen active: %s" % disp.d_scr_active)
+        print("Display longest block ms: %s" % disp.frm_blk_ms)
+        print("Display wakeups: %s, touch driver wakeups: %s" % (disp.wakeups, disp.xpt.wakeups))
+        print("Touch IRQ latency ms: %s (max %s), jitter max ms: %s" % (disp.xpt.irq_latency_ms,
+              disp.xpt.max_irq_latency_ms, disp.xpt.max_jitter_ms))
+        print("PMS frames %s, crc errors %s, timeouts %s, sleeping %s, on time s %s" % (
+              pms.frames, pms.crc_errors, pms.read_timeouts, pms.sleeping, pms.on_time))
+        print("PMS rejected frames %s" % pms.rejected_frames)
+        print("Channels samples %s, published %s, suppressed %s" % (channels.samples, channels.published,
+                                                                    channels.suppressed))
+        if plog is not None:
+            print("Offline log pending %s, written %s, drained %s, dropped %s" % (plog.pending, plog.written,
+                                                                                  plog.drained, plog.dropped))
+        print("BME280 measurements %s, I2C transactions %s, read errors %s, stale %s" % (
+              bmes.measurements, bmes.i2c_transactions, bmes.read_errors, bmes.stale))
+        print("PMS duty %.2f, est. current mA %.1f, est. lifetime years %.1f" % (
+              pms.duty_ratio, pms.current_ma(), pms.lifetime_years()))
         print("-------")
         await asyncio.sleep(5)
 
@@ -508,10 +549,12 @@ async def show_what_i_do():
 freq(240000000)
 
 # Network handshake
-net = WifiNet.ConnectWiFi(SSID1, PASSWORD1, SSID2, PASSWORD2, NTPSERVER, DHCP_NAME, START_WEBREPL, WEBREPL_PASSWORD)
+net = WifiNet.ConnectWiFi(SSID1, PASSWORD1, SSID2, PASSWORD2, NTPSERVER, DHCP_NAME, START_WEBREPL, WEBREPL_PASSWORD,
+                          sample_interval=WIFI_SAMPLE_INTERVAL)
 
 # Particle sensor
-pms = PARTICLES.PSensorPMS7003(uart=P_SEN_UART, rxpin=P_SEN_RX, txpin=P_SEN_TX)
+pms = PARTICLES.PSensorPMS7003(uart=P_SEN_UART, rxpin=P_SEN_RX, txpin=P_SEN_TX, duty_period=PMS_DUTY_PERIOD,
+                               spinup_time=PMS_SPINUP_TIME, frames_per_wake=PMS_FRAMES_PER_WAKE)
 # Air Quality calculations
 aq = AirQuality(pms)
 # CO2 sensor
@@ -533,12 +576,54 @@ d_spi.init(baudrate=40000000, sck=Pin(TFT_CLK_PIN), mosi=Pin(TFT_MOSI_PIN), miso
 disp = TFTDisplay(t_spi, d_spi)
 
 
+def pms_ready():
+    return (pms.pms_dictionary is not None) and ((time() - pms.startup_time) > pms.read_interval)
+
+
+def pms_value(index):
+    return lambda: pms.smoothed(index) if pms_ready() else None
+
+
+def pms_count(key):
+    return lambda: pms.pms_dictionary[key] if pms_ready() else None
+
+
+def bme_value(index, scale=1):
+    return lambda: bmes.readings[index] / scale if bmes.stale is False else None
+
+
+# Name, source, topic, format, alarm threshold, publish policy (see drivers/CHANNELS.py)
+channels = ChannelRegistry((
+    Channel('pm1_0', pms_value(pms.PMS_PM1_0), TOPIC_PM1_0, '%.1f'),
+    Channel('pm1_0_atm', pms_value(pms.PMS_PM1_0_ATM), TOPIC_PM1_0_ATM, '%.1f'),
+    Channel('pm2_5', pms_value(pms.PMS_PM2_5), TOPIC_PM2_5, '%.1f'),
+    Channel('pm2_5_atm', pms_value(pms.PMS_PM2_5_ATM), TOPIC_PM2_5_ATM, '%.1f'),
+    Channel('pm10_0', pms_value(pms.PMS_PM10_0), TOPIC_PM10_0, '%.1f'),
+    Channel('pm10_0_atm', pms_value(pms.PMS_PM10_0_ATM), TOPIC_PM10_0_ATM, '%.1f'),
+    Channel('pcnt_0_3', pms_count('PCNT_0_3'), TOPIC_PCNT_0_3),
+    Channel('pcnt_0_5', pms_count('PCNT_0_5'), TOPIC_PCNT_0_5),
+    Channel('pcnt_1_0', pms_count('PCNT_1_0'), TOPIC_PCNT_1_0),
+    Channel('pcnt_2_5', pms_count('PCNT_2_5'), TOPIC_PCNT_2_5),
+    Channel('pcnt_5_0', pms_count('PCNT_5_0'), TOPIC_PCNT_5_0),
+    Channel('pcnt_10_0', pms_count('PCNT_10_0'), TOPIC_PCNT_10_0),
+    Channel('temp', bme_value(0), TOPIC_TEMP, '%.2f', TEMP_THOLD),
+    Channel('rh', bme_value(2), TOPIC_RH, '%.2f', RH_THOLD),
+    Channel('pressure', bme_value(1, 100), TOPIC_PRESSURE, '%.2f', P_THOLD),
+    Channel('aqi', lambda: aq.aqinndex, TOPIC_AIRQUALITY, '%s', AQ_THOLD),
+    Channel('aqi_nowcast', lambda: aq.nowcast_aqi, TOPIC_AQI_NOWCAST, '%.1f'),
+    Channel('aqi_24h', lambda: aq.aqi_24h, TOPIC_AQI_24H, '%.1f'),
+    Channel('co2', lambda: co2s.co2_average, TOPIC_CO2, '%s', CO2_ALM_THOLD),
+    Channel('co2_now', lambda: co2s.co2_value, None, '%.1f', CO2_ALM_THOLD),
+))
+
+
 async def mqtt_up_loop():
     global mqtt_up
     global client
 
     while net.net_ok is False:
-        await asyncio.sleep(5)
+        await net.state_changed.wait()
+        net.state_changed.clear()
 
     if net.net_ok is True:
         config['subs_cb'] = update_mqtt_status
@@ -580,48 +665,39 @@ def update_mqtt_status(topic, msg, retained):
             return correction """
 
 
+async def mqtt_send(now):
+    global sending
+    try:
+        # Previous cycle's QoS 1 window acked first, readings are handed to the client only on a live link
+        await client.wait_inflight()
+        if client.isconnected():
+            channels.publish(batch, now)
+            # Not cancelled: a publish in progress when the link drops is completed by MQTT_AS after reconnect
+            await batch.flush(client)
+            if (plog is not None) and (plog.pending > 0):
+                # QoS 1: a segment goes only when the broker has acked it
+                await plog.drain(client, TOPIC_OFFLINE, qos=1)
+        elif (plog is not None) and (net.timeset is True):
+            channels.store(plog, now)
+            plog.commit()
+    finally:
+        sending = False
+
+
 async def mqtt_publish_loop():
+    global sending
 
     while True:
-        if mqtt_up is False:
-            await asyncio.sleep(10)
-        else:
-            await asyncio.sleep(MQTT_INTERVAL)
-            if (pms.pms_dictionary is not None) and ((time() - pms.startup_time) > pms.read_interval):
-                if pms.pms_dictionary['PM1_0'] is not None:
-                    await client.publish(TOPIC_PM1_0, str(pms.pms_dictionary['PM1_0']), retain=0, qos=0)
-                if pms.pms_dictionary['PM1_0_ATM'] is not None:
-                    await client.publish(TOPIC_PM1_0_ATM, str(pms.pms_dictionary['PM1_0_ATM']), retain=0, qos=0)
-                if pms.pms_dictionary['PM2_5'] is not None:
-                    await client.publish(TOPIC_PM2_5, str(pms.pms_dictionary['PM2_5']), retain=0, qos=0)
-                if pms.pms_dictionary['PM2_5_ATM'] is not None:
-                    await client.publish(TOPIC_PM2_5_ATM, str(pms.pms_dictionary['PM2_5_ATM']), retain=0, qos=0)
-                if pms.pms_dictionary['PM10_0'] is not None:
-                    await client.publish(TOPIC_PM10_0, str(pms.pms_dictionary['PM10_0']), retain=0, qos=0)
-                if pms.pms_dictionary['PM10_0_ATM'] is not None:
-                    await client.publish(TOPIC_PM10_0_ATM, str(pms.pms_dictionary['PM10_0_ATM']), retain=0, qos=0)
-                if pms.pms_dictionary['PCNT_0_3'] is not None:
-                    await client.publish(TOPIC_PCNT_0_3, str(pms.pms_dictionary['PCNT_0_3']), retain=0, qos=0)
-                if pms.pms_dictionary['PCNT_0_5'] is not None:
-                    await client.publish(TOPIC_PCNT_0_5, str(pms.pms_dictionary['PCNT_0_5']), retain=0, qos=0)
-                if pms.pms_dictionary['PCNT_1_0'] is not None:
-                    await client.publish(TOPIC_PCNT_1_0, str(pms.pms_dictionary['PCNT_1_0']), retain=0, qos=0)
-                if pms.pms_dictionary['PCNT_2_5'] is not None:
-                    await client.publish(TOPIC_PCNT_2_5, str(pms.pms_dictionary['PCNT_2_5']), retain=0, qos=0)
-                if pms.pms_dictionary['PCNT_5_0'] is not None:
-                    await client.publish(TOPIC_PCNT_5_0, str(pms.pms_dictionary['PCNT_5_0']), retain=0, qos=0)
-                if pms.pms_dictionary['PCNT_10_0'] is not None:
-                    await client.publish(TOPIC_PCNT_10_0, str(pms.pms_dictionary['PCNT_10_0']), retain=0, qos=0)
-            if bmes.values[0][:-1] is not None:
-                await client.publish(TOPIC_TEMP, bmes.values[0][:-1], retain=0, qos=0)
-            if bmes.values[2][:-1] is not None:
-                await client.publish(TOPIC_RH, bmes.values[2][:-1], retain=0, qos=0)
-            if bmes.values[1][:-3] is not None:
-                await client.publish(TOPIC_PRESSURE, bmes.values[1][:-3], retain=0, qos=0)
-            if aq.aqinndex is not None:
-                await client.publish(TOPIC_AIRQUALITY, str(aq.aqinndex), retain=0, qos=0)
-            if co2s.co2_average is not None:
-                await client.publish(TOPIC_CO2, str(co2s.co2_average), retain=0, qos=0)
+        await asyncio.sleep(MQTT_INTERVAL)
+        channels.sample()
+        now = time()
+        if (mqtt_up is True) and (sending is False) and client.isconnected():
+            sending = True
+            asyncio.create_task(mqtt_send(now))
+        elif (plog is not None) and (net.timeset is True):
+            # Link or broker down, or the last send still waits for a reconnect: keep readings in flash
+            channels.store(plog, now)
+            plog.commit()
 
 
 # For MQTT_AS
@@ -631,6 +707,13 @@ config['password'] = MQTT_PASSWORD
 config['port'] = MQTT_PORT
 config['client_id'] = CLIENT_ID
 client = MQTTClient(config)
+# Empty MQTT_BATCH_TOPIC keeps one topic per value
+batch = PublishBatcher(MQTT_BATCH_TOPIC or None)
+# Offline ring log files, OFFLINE_LOG_SEGMENTS x 4 kB at most, 0 = readings are dropped while MQTT is down
+plog = None
+if OFFLINE_LOG_SEGMENTS > 0:
+    from drivers.PUBLISH_LOG import PublishLog  # Imported only when the log is in use
+    plog = PublishLog(channels.log_channels(), segments=OFFLINE_LOG_SEGMENTS)
 
 
 async def main():
@@ -640,8 +723,10 @@ async def main():
     loop.create_task(pms.read_async_loop())
     loop.create_task(co2s.read_co2_loop())
     loop.create_task(aq.upd_aq_loop())
+    loop.create_task(bmes.read_loop(BME280_READ_INTERVAL, integer=(BME280_INTEGER == 1)))
     loop.create_task(upd_status_loop())
     loop.create_task(disp.disp_loop())
+    loop.create_task(disp.xpt.sample_loop())
     if DEBUG_SCREEN_ACTIVE == 1:
         loop.create_task(show_what_i_do())
     if START_MQTT == 1:
@@ -0,0 +1,73 @@
+"""
+Convert PPM (P6, 8 bit) images to ILI9341 image files for Display.draw_image and Display.draw_rle_image.
+
+Usage on the host:
+    python3 tools/img2rgb565.py background.ppm
+
+Writes background.raw (RGB565 big endian, row by row) and background.rle (3 byte runs: count 1-255, RGB565).
+Copy the file you want to use into the device, for example ampy -p COM4 put background.rle images/background.rle
+"""
+import sys
+
+
+def read_ppm(path):
+    """ Returns width, height and RGB888 bytes """
+    with open(path, 'rb') as f:
+        data = f.read()
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b'#':
+            pos = data.index(b'\n', pos) + 1
+            continue
+        start = pos
+        while not data[pos:pos + 1].isspace():
+            pos += 1
+        fields.append(data[start:pos])
+    if fields[0] != b'P6' or int(fields[3]) != 255:
+        raise ValueError('Only binary 8 bit PPM (P6) is supported')
+    width, height = int(fields[1]), int(fields[2])
+    return width, height, data[pos + 1:pos + 1 + width * height * 3]
+
+
+def rgb888_to_rgb565(rgb):
+    out = bytearray(len(rgb) // 3 * 2)
+    for i in range(len(rgb) // 3):
+        r, g, b = rgb[i * 3], rgb[i * 3 + 1], rgb[i * 3 + 2]
+        c = (r & 0xf8) << 8 | (g & 0xfc) << 3 | b >> 3
+        out[i * 2] = c >> 8
+        out[i * 2 + 1] = c & 0xff
+    return bytes(out)
+
+
+def encode_rle(raw):
+    """ RGB565 bytes to runs of (count, msb, lsb) """
+    out = bytearray()
+    i = 0
+    n = len(raw) // 2
+    while i < n:
+        msb, lsb = raw[i * 2], raw[i * 2 + 1]
+        run = 1
+        while i + run < n and run < 255 and raw[(i + run) * 2] == msb and raw[(i + run) * 2 + 1] == lsb:
+            run += 1
+        out.extend((run, msb, lsb))
+        i += run
+    return bytes(out)
+
+
+def main(path):
+    width, height, rgb = read_ppm(path)
+    raw = rgb888_to_rgb565(rgb)
+    rle = encode_rle(raw)
+    base = path.rsplit('.', 1)[0]
+    with open(base + '.raw', 'wb') as f:
+        f.write(raw)
+    with open(base + '.rle', 'wb') as f:
+        f.write(rle)
+    print("%s x %s: raw %s bytes, rle %s bytes" % (width, height, len(raw), len(rle)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -77,7 +77,7 @@ import machine
 import dht
 from machine import Pin
 from machine import ADC
-from umqttsimple import MQTTClient
+from drivers.UMQTTSIMPLE import MQTTClient
 
 # tuodaan parametrit tiedostosta parametrit.py
 try:
@@ -6,7 +6,7 @@ Esimerkki
 
 
 import uasyncio as asyncio
-import MHZ19BCO2 as co2
+import drivers.MHZ19B_AS as co2
 import utime
 import machine
 
@@ -28,14 +28,18 @@ def ratkaise_aika():
     return paiva, kello
 
 
-sensori = co2.MHZ19bCO2()
+sensori = co2.MHZ19bCO2(uart=1, rxpin=16, txpin=17)
+# Testiasetukset kuten aiemmassa MHZ19bCO2:ssa: esilämmitys ja lukuväli 10 s, tuotannossa 180 s ja 120 s.
+# co2_value on None ennen ensimmäistä lukua (aiemmin 0).
+sensori.preheat_time = 10
+sensori.read_interval = 10
 
 
 async def kerro_tilannetta():
     while True:
-        print("CO2: %s luettu %s" % (sensori.co2_arvo, sensori.arvo_luettu_klo))
-        print("Keskiarvo: ", sensori.co2_keskiarvo)
-        print("Sensorin käyntiaika: ", (utime.time() - sensori.sensori_aktivoitu_klo))
+        print("CO2: %s luettu %s" % (sensori.co2_value, sensori.value_read_time))
+        print("Keskiarvo: ", sensori.co2_average)
+        print("Sensorin käyntiaika: ", (utime.time() - sensori.sensor_activation_time))
         await asyncio.sleep(1)
 
 
@@ -43,7 +47,7 @@ async def main():
     #  ESP32 oletusnopeus on 160 MHZ, lasketaan CPU lämmöntuoton vuoksi
     machine.freq(80000000)
     # Taustalle menevät prosessit
-    asyncio.create_task(sensori.lue_co2_looppi())
+    asyncio.create_task(sensori.read_co2_loop())
     asyncio.create_task(kerro_tilannetta())
 
     while True:
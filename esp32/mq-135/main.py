@@ -21,7 +21,7 @@ import utime
 import machine # tuodaan koko kirjasto
 from machine import Pin
 from machine import ADC
-from umqttsimple import MQTTClient
+from drivers.UMQTTSIMPLE import MQTTClient
 import network
 import gc
 
@@ -42,24 +42,26 @@ Asynkroninen MQTT: https://github.com/peterhinch/micropython-mqtt/blob/master/mq
 """
 
 from machine import I2C, SPI, Pin
-import sh1106
-import ccs811
+import drivers.SH1106 as sh1106
+import drivers.CCS811 as ccs811
 import time
 import uasyncio as asyncio
 import utime
 import esp32
-from mqtt_as import MQTTClient
+from drivers.MQTT_AS import MQTTClient
+from drivers.MQTT_BATCH import PublishBatcher
 import network
 import gc
-from mqtt_as import config
+from drivers.MQTT_AS import config
 import machine
 import dht
+from drivers.RUNNING_AVERAGE import RunningAverage
 
 
 # tuodaan parametrit tiedostosta parametrit.py
 from parametrit import CLIENT_ID, MQTT_SERVERI, MQTT_PORTTI, MQTT_KAYTTAJA, \
     MQTT_SALASANA, SSID1, SALASANA1, SSID2, SALASANA2, AIHE_CO2, AIHE_TVOC, \
-    DHT22_KOSTEUS_KORJAUSKERROIN, DHT22_LAMPO_KORJAUSKERROIN, DHT22_KOSTEUS, DHT22_LAMPO
+    DHT22_KOSTEUS_KORJAUSKERROIN, DHT22_LAMPO_KORJAUSKERROIN, DHT22_KOSTEUS, DHT22_LAMPO, AIHE_KOOSTE
 
 
 kaytettava_salasana = None
@@ -77,6 +79,7 @@ config['password'] = MQTT_SALASANA
 config['port'] = MQTT_PORTTI
 config['client_id'] = CLIENT_ID
 client = MQTTClient(config)
+kooste = PublishBatcher(AIHE_KOOSTE)
 edellinen_mqtt_klo = utime.time()
 aloitusaika = utime.time()
 anturilukuvirheita = 0
@@ -283,45 +286,28 @@ async def kerro_tilannetta():
 
 
 async def laske_keskiarvot():
-    """ Luetaan 20 arvoa keskiarvon laskemiseksi. Tämä vähentää anturiheittoja. """
-    eco2_keskiarvot = []
-    tvoc_keskiarvot = []
-    lampo_keskiarvot = []
-    kosteus_keskiarvot = []
+    """ Luetaan 20 arvoa keskiarvon laskemiseksi. Tämä vähentää anturiheittoja.
+        Rengaspuskuri ei varaa muistia arvoa lisättäessä, toisin kuin append/sum/pop(0) listat. """
+    eco2_keskiarvot = RunningAverage(20)
+    tvoc_keskiarvot = RunningAverage(20)
+    lampo_keskiarvot = RunningAverage(20)
+    kosteus_keskiarvot = RunningAverage(20)
 
     while True:
         if kaasusensori.eCO2 is not None:
-            eco2_keskiarvot.append(kaasusensori.eCO2)
-            kaasusensori.eCO2_keskiarvo = (sum(eco2_keskiarvot) / len(eco2_keskiarvot))
-            kaasusensori.eCO2_arvoja = len(eco2_keskiarvot)
-            #  Luetaan 20 arvoa ja poistetaan vanhin
-            if len(eco2_keskiarvot) == 20:
-                eco2_keskiarvot.pop(0)
-            #  Tänne ei pitäisi tulla koskaan
-            elif len(eco2_keskiarvot) > 20:
-                eco2_keskiarvot.clear()
+            eco2_keskiarvot.add(kaasusensori.eCO2)
+            kaasusensori.eCO2_keskiarvo = eco2_keskiarvot.mean
+            kaasusensori.eCO2_arvoja = eco2_keskiarvot.count
         if kaasusensori.tVOC is not None:
-            tvoc_keskiarvot.append(kaasusensori.tVOC)
-            kaasusensori.tVOC_keskiarvo = (sum(tvoc_keskiarvot) / len(tvoc_keskiarvot))
-            kaasusensori.tVOC_arvoja = len(tvoc_keskiarvot)
-            if len(tvoc_keskiarvot) == 20:
-                tvoc_keskiarvot.pop(0)
-            elif len(tvoc_keskiarvot) > 20:
-                tvoc_keskiarvot.clear()
+            tvoc_keskiarvot.add(kaasusensori.tVOC)
+            kaasusensori.tVOC_keskiarvo = tvoc_keskiarvot.mean
+            kaasusensori.tVOC_arvoja = tvoc_keskiarvot.count
         if tempjarh.lampo is not None:
-            lampo_keskiarvot.append(float(tempjarh.lampo))
-            tempjarh.lampo_keskiarvo = sum(lampo_keskiarvot) / len(lampo_keskiarvot)
-            if len(lampo_keskiarvot) == 20:
-                lampo_keskiarvot.pop(0)
-            elif len(lampo_keskiarvot) > 20:
-                lampo_keskiarvot.clear()
+            lampo_keskiarvot.add(float(tempjarh.lampo))
+            tempjarh.lampo_keskiarvo = lampo_keskiarvot.mean
         if tempjarh.kosteus is not None:
-            kosteus_keskiarvot.append(float(tempjarh.kosteus))
-            tempjarh.kosteus_keskiarvo = sum(kosteus_keskiarvot) / len(kosteus_keskiarvot)
-            if len(kosteus_keskiarvot) == 20:
-                kosteus_keskiarvot.pop(0)
-            elif len(kosteus_keskiarvot) > 20:
-                kosteus_keskiarvot.clear()
+            kosteus_keskiarvot.add(float(tempjarh.kosteus))
+            tempjarh.kosteus_keskiarvo = kosteus_keskiarvot.mean
         await asyncio.sleep(1)
 
 
@@ -405,10 +391,11 @@ async def mqtt_raportoi():
         if (kaasusensori.eCO2_keskiarvo > 0) and (kaasusensori.tVOC_keskiarvo > 0) and \
                 (utime.time() - edellinen_mqtt_klo) > 60:
             try:
-                await client.publish(AIHE_CO2, str(kaasusensori.eCO2_keskiarvo), retain=False, qos=0)
-                await client.publish(AIHE_TVOC, str(kaasusensori.tVOC_keskiarvo), retain=False, qos=0)
-                await client.publish(DHT22_LAMPO, str(tempjarh.lampo_keskiarvo), retain=False, qos=0)
-                await client.publish(DHT22_KOSTEUS, str(tempjarh.kosteus_keskiarvo), retain=False, qos=0)
+                kooste.add(AIHE_CO2, str(kaasusensori.eCO2_keskiarvo))
+                kooste.add(AIHE_TVOC, str(kaasusensori.tVOC_keskiarvo))
+                kooste.add(DHT22_LAMPO, str(tempjarh.lampo_keskiarvo))
+                kooste.add(DHT22_KOSTEUS, str(tempjarh.kosteus_keskiarvo))
+                await kooste.flush(client)
                 await kaasusensori.laheta_lampo_ja_kosteus_korjaus(tempjarh.kosteus_keskiarvo, tempjarh.lampo_keskiarvo)
                 edellinen_mqtt_klo = utime.time()
             except OSError as e:
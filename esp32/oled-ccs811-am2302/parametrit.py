@@ -15,5 +15,7 @@ AIHE_TVOC = 'koti/sisa/kodinhoito/tvoc'
 NTPPALVELIN = 'pool.ntp.org'
 DHT22_LAMPO = 'koti/sisa/kodinhoito/lampo'
 DHT22_KOSTEUS = 'koti/sisa/kodinhoito/kosteus'
+# None = jokainen arvo omaan aiheeseen, muuten kaikki arvot yhtenä JSON-viestinä tähän aiheeseen
+AIHE_KOOSTE = None
 DHT22_LAMPO_KORJAUSKERROIN = 1.0000
 DHT22_KOSTEUS_KORJAUSKERROIN = 1.0000
@@ -6,8 +6,8 @@ MH-Z19 sensorin datasheetti https://www.winsen-sensor.com/d/files/MH-Z19B.pdf
 
 
 import uasyncio as asyncio
-import MHZ19BCO2 as co2
-import SH1106 as oled
+import drivers.MHZ19B_AS as co2
+import drivers.SH1106 as oled
 import utime
 import machine
 from machine import Pin, I2C
@@ -113,15 +113,19 @@ def ratkaise_aika():
     return paiva, kello
 
 
-co2sensori = co2.MHZ19bCO2()
+co2sensori = co2.MHZ19bCO2(uart=1, rxpin=16, txpin=17)
+# Testiasetukset kuten aiemmassa MHZ19bCO2:ssa: esilämmitys ja lukuväli 10 s, tuotannossa 180 s ja 120 s.
+# co2_value on None ennen ensimmäistä lukua (aiemmin 0).
+co2sensori.preheat_time = 10
+co2sensori.read_interval = 10
 naytin = I2Cnaytonohjain()
 
 
 async def kerro_tilannetta():
     while True:
-        print("CO2: %s luettu %s" % (co2sensori.co2_arvo, co2sensori.arvo_luettu_klo))
-        print("Keskiarvo: ", co2sensori.co2_keskiarvo)
-        print("Sensorin käyntiaika: ", (utime.time() - co2sensori.sensori_aktivoitu_klo))
+        print("CO2: %s luettu %s" % (co2sensori.co2_value, co2sensori.value_read_time))
+        print("Keskiarvo: ", co2sensori.co2_average)
+        print("Sensorin käyntiaika: ", (utime.time() - co2sensori.sensor_activation_time))
         await asyncio.sleep(1)
 
 
@@ -129,9 +133,9 @@ async def sivu_1():
     await naytin.teksti_riville("PVM:  %s" % ratkaise_aika()[0], 0, 5)
     await naytin.teksti_riville("KLO:  %s" % ratkaise_aika()[1], 1, 5)
     await naytin.piirra_alleviivaus(1, 20)
-    await naytin.teksti_riville("CO2: %s ppm" % co2sensori.co2_arvo, 2, 5)
+    await naytin.teksti_riville("CO2: %s ppm" % co2sensori.co2_value, 2, 5)
     #  Raja-arvot ovat yleisiä CO2:n haitallisuuden arvoja
-    if co2sensori.co2_arvo > 1200:
+    if (co2sensori.co2_value is not None) and (co2sensori.co2_value > 1200):
         await naytin.kaanteinen_vari(True)
     else:
         await naytin.kaanteinen_vari(False)
@@ -149,7 +153,7 @@ async def main():
     #  ESP32 oletusnopeus on 160 MHZ, lasketaan CPU lämmöntuoton vuoksi
     machine.freq(80000000)
     # Taustalle menevät prosessit
-    asyncio.create_task(co2sensori.lue_co2_looppi())
+    asyncio.create_task(co2sensori.read_co2_loop())
     asyncio.create_task(kerro_tilannetta())
 
     while True:
@@ -52,10 +52,11 @@ from machine import I2C, Pin, ADC, reset, deepsleep, reset_cause
 from utime import sleep, localtime, mktime, ticks_ms
 import ntptime
 import gc
-from umqttsimple import MQTTClient
+from drivers.UMQTTSIMPLE import MQTTClient
+from drivers.MQTT_BATCH import PublishBatcher
 import network
 from json import load, dump
-import BME280_float as BmE
+import drivers.BME280_float as BmE
 from Suntime import Sun
 import os
 
@@ -93,7 +94,7 @@ try:
     from parameters import SSID1, SSID2, PASSWORD1, PASSWORD2, MQTT_SERVER, MQTT_PASSWORD, MQTT_USER, MQTT_PORT, \
         CLIENT_ID, BATTERY_ADC_PIN, TOPIC_ERRORS, STEPPER1_PIN1, STEPPER1_PIN2, STEPPER1_PIN3, STEPPER1_PIN4, \
         STEPPER1_DELAY, MICROSWITCH_PIN, SOLARPANEL_ADC_PIN, TOPIC_TEMP, TOPIC_PRESSURE, TOPIC_HUMIDITY, \
-        TOPIC_BATTERY_VOLTAGE, I2C_SCL_PIN, I2C_SDA_PIN, SECONDARY_ACTIVATION_PIN
+        TOPIC_BATTERY_VOLTAGE, I2C_SCL_PIN, I2C_SDA_PIN, SECONDARY_ACTIVATION_PIN, TOPIC_BATCH
     f.close()
 except OSError:  # open failed
     print("parameter.py-file missing! Can not continue!")
@@ -371,17 +372,20 @@ def mqtt_report():
     global LAST_HUMIDITY
     global LAST_PRESSURE
     if network.WLAN(network.STA_IF).config('essid') != '':
-        if bmes.values[0][:-1] is not None:
-            client.publish(TOPIC_TEMP, bmes.values[0][:-1], retain=0, qos=0)
-            LAST_TEMP = bmes.values[0][:-1]
-        if bmes.values[2][:-1] is not None:
-            client.publish(TOPIC_HUMIDITY, bmes.values[2][:-1], retain=0, qos=0)
-            LAST_HUMIDITY = bmes.values[2][:-1]
-        if bmes.values[1][:-3] is not None:
-            client.publish(TOPIC_PRESSURE, bmes.values[1][:-3], retain=0, qos=0)
-            LAST_PRESSURE = bmes.values[1][:-3]
-        if batteryreader.read() > 0:
-            client.publish(TOPIC_BATTERY_VOLTAGE, str((batteryreader.read() / 1000) * 2), retain=0, qos=0)
+        # One measurement for all three values
+        t, p, h = bmes.update()
+        LAST_TEMP = "%.2f" % t
+        LAST_HUMIDITY = "%.2f" % h
+        LAST_PRESSURE = "%.2f" % (p / 100)
+        batch.add(TOPIC_TEMP, LAST_TEMP)
+        batch.add(TOPIC_HUMIDITY, LAST_HUMIDITY)
+        batch.add(TOPIC_PRESSURE, LAST_PRESSURE)
+        battery = batteryreader.read()
+        if battery > 0:
+            batch.add(TOPIC_BATTERY_VOLTAGE, str((battery / 1000) * 2))
+        batch.flush_sync(client)
+        if DEBUG_ENABLED == 1:
+            print("MQTT packets %s, bytes %s, ms %s" % (batch.packets, batch.bytes, batch.awake_ms))
 
     else:
         if DEBUG_ENABLED == 1:
@@ -463,6 +467,7 @@ f4.write("BME280 initialized\n")
 
 # MQTT
 client = MQTTClient(CLIENT_ID, MQTT_SERVER, MQTT_PORT, MQTT_USER, MQTT_PASSWORD)
+batch = PublishBatcher(TOPIC_BATCH)
 f4.write("MQTTClient object initialized\n")
 
 
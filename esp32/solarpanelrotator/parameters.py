@@ -14,6 +14,8 @@ TOPIC_TEMP = 'koti/ulko/aurinkopaneeli/lampo'
 TOPIC_HUMIDITY = 'koti/ulko/aurinkopaneeli/kosteus'
 TOPIC_PRESSURE = 'koti/ulko/aurinkopaneeli/paine'
 TOPIC_BATTERY_VOLTAGE = 'koti/ulko/aurinkopaneeli/jannite'
+# None = one message per topic, otherwise all values as one JSON message to this topic
+TOPIC_BATCH = None
 NTPSERVER = 'pool.ntp.org'
 BATTERY_ADC_PIN = 32
 SOLARPANEL_ADC_PIN = 34
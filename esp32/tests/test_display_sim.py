@@ -0,0 +1,91 @@
+"""
+Golden-image checks of the ILI9341 drivers on the DISPLAY_SIM panel model.
+
+Each test draws on a fresh simulated display and compares the panel checksum with the stored one. A changed
+checksum means the picture changed: look at it with panel.write_png() and update the constant only if the
+change is intended.
+
+show_screen() is TFTDisplay's own code from the touchscreen main.py. main.py itself needs the device firmware
+and runtimeconfig.json to import, so its show_screen and ok_bckg methods are compiled from the source alone.
+
+Run in esp32/: python3 -m pytest tests
+"""
+import ast
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NODE = os.path.join(ROOT, 'esp32-mhz19-ili9341-touchscreen')
+FONT = os.path.join(NODE, 'fonts', 'Unispace12x24.c')
+sys.path.insert(0, ROOT)
+
+import drivers.DISPLAY_SIM as sim  # noqa: E402
+
+sim.install_shims()
+
+import uasyncio as asyncio  # noqa: E402
+from drivers.ILI9341 import color565  # noqa: E402
+from drivers.XGLCD_FONT import XglcdFont  # noqa: E402
+
+FILL_RECTANGLE = 0xf4549a2f
+DRAW_TEXT = 0x2b67a9b3
+SHOW_SCREEN = 0xa7dbea6c
+
+YELLOW = color565(255, 255, 0)
+LIGHT_GREEN = color565(128, 255, 128)
+BLUE = color565(0, 0, 255)
+
+
+def tft_methods(*names):
+    """ Methods of main.TFTDisplay compiled from the source, without running main.py """
+    with open(os.path.join(NODE, 'main.py')) as f:
+        tree = ast.parse(f.read())
+    cls = [node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == 'TFTDisplay'][0]
+    module = ast.Module(body=[node for node in cls.body if getattr(node, 'name', None) in names], type_ignores=[])
+    namespace = {'gc': __import__('gc'), 'asyncio': asyncio}
+    exec(compile(module, 'main.py', 'exec'), namespace)
+    return [namespace[name] for name in names]
+
+
+class Screen(object):
+    """ TFTDisplay state that show_screen uses """
+    show_screen, ok_bckg = tft_methods('show_screen', 'ok_bckg')
+
+    def __init__(self, display):
+        self.d = display
+        self.a_font = XglcdFont(FONT, 12, 24)
+        self.cols = {'red': color565(255, 0, 0), 'white': color565(255, 255, 255), 'blue': BLUE,
+                     'yellow': YELLOW, 'light_green': LIGHT_GREEN}
+        self.col_bckg = 'light_green'
+        self.d_all_ok = True
+        self.indent_p = 12
+        self.f_h = self.r_h = 10
+        self.frm_blk_ms = 0
+
+    async def wait_timer(self):
+        pass
+
+
+def test_fill_rectangle():
+    display, panel, spi = sim.ili9341_display()
+    display.fill_rectangle(0, 0, display.width, display.height, YELLOW)
+    display.fill_rectangle(10, 10, display.width - 20, display.height - 20, LIGHT_GREEN)
+    display.fill_rectangle(100, 50, 37, 21, BLUE)
+    assert panel.checksum() == FILL_RECTANGLE
+
+
+def test_draw_text():
+    display, panel, spi = sim.ili9341_display()
+    font = XglcdFont(FONT, 12, 24)
+    display.draw_text(12, 25, "CO2 612 ppm", font, BLUE, LIGHT_GREEN)
+    display.draw_text(12, 51, "PM2.5 7 ug/m3", font, YELLOW, 0)
+    assert panel.checksum() == DRAW_TEXT
+
+
+def test_show_screen():
+    display, panel, spi = sim.ili9341_display()
+    screen = Screen(display)
+    rows = ("Airquality v1.0", "CO2: 612 ppm", "PM2.5: 7", "Temp: 21.5C", "RH: 38.2%", "AQI: 29", "OK")
+    colours = ('red', 'blue', 'blue', 'blue', 'blue', 'blue', 'white')
+    asyncio.run(screen.show_screen(rows, colours))
+    assert panel.checksum() == SHOW_SCREEN
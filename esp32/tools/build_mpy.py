@@ -0,0 +1,145 @@
+"""
+Cross-compiles an ESP32 node to .mpy bytecode, optionally writes a manifest to freeze it into the firmware.
+
+The device then loads precompiled bytecode instead of parsing and compiling the sources at boot. Modules are
+found as in tools/footprint.py (main.py and boot.py imports through the node's files and esp32/drivers).
+Output is build/<node>/, copy its content to the device root:
+- drivers/*.mpy and the node's own modules as .mpy
+- main.py compiled as node_main.mpy, main.py is a one line stub import node_main. The if __name__ == "__main__":
+  guard of main.py is rewritten to also run under the name node_main (build/<node>-freeze/node_main.py).
+- boot.py, parameter files (parameters.py, parametrit.py: user settings stay editable), *.json and fonts/ as is
+
+mpy-cross must be the firmware version: v1.13 emits mpy v5 (pip install mpy-cross==1.13, or mpy-cross from
+the MicroPython source tree). Files that are not copied to the device go to build/<node>-freeze/: the staged
+node_main.py and with --freeze manifest.py, which freezes the drivers, the node modules and node_main into the
+firmware, build it with
+    make -C micropython/ports/esp32 BOARD=GENERIC FROZEN_MANIFEST=<esp32>/build/<node>-freeze/manifest.py
+and copy only main.py, boot.py, parameter files, *.json and fonts/ to the device.
+
+Usage in the esp32 directory: python3 tools/build_mpy.py [--freeze] [--march=xtensawin] [node ...]
+All nodes if none given. --march lets @micropython.native and viper functions compile to machine code.
+"""
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from footprint import ROOT, resolve, join
+
+BUILD = join(ROOT, 'build')
+PARAM_MODULES = ('parameters', 'parametrit')
+MAIN_MODULE = 'node_main'
+DATA_DIRS = ('fonts',)
+
+
+def mpy_cross():
+    """ Command for mpy-cross: binary in PATH or the pip package """
+    path = shutil.which('mpy-cross')
+    if path:
+        return [path]
+    if importlib.util.find_spec('mpy_cross') is None:
+        raise SystemExit('mpy-cross not found, pip install mpy-cross==1.13 (same version as the firmware)')
+    return [sys.executable, '-m', 'mpy_cross']
+
+
+def compile_mpy(cmd, src, dst, name, march):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    args = cmd + ['-o', dst, '-s', name]
+    if march:
+        args.append('-march=' + march)
+    subprocess.run(args + [src], check=True)
+    return os.stat(dst).st_size
+
+
+def stage_main(node_dir, staged):
+    """ main.py as node_main.py, __main__ guard accepts the new module name """
+    os.makedirs(staged)
+    with open(join(node_dir, 'main.py')) as f:
+        source = f.read()
+    for quote in ('"', "'"):
+        source = source.replace('__name__ == %s__main__%s' % (quote, quote),
+                                '__name__ in ("__main__", "%s")' % MAIN_MODULE)
+    path = join(staged, MAIN_MODULE + '.py')
+    with open(path, 'w') as f:
+        f.write(source)
+    return path
+
+
+def module_path(name):
+    """ drivers.MQTT_AS -> drivers/MQTT_AS """
+    return name.replace('.', '/')
+
+
+def build(node, freeze=False, march=None):
+    node_dir = join(ROOT, node)
+    out = join(BUILD, node)  # Copied to the device as is
+    staged = join(BUILD, node + '-freeze')
+    for path in (out, staged):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+    os.makedirs(out)
+    cmd = mpy_cross()
+    modules = [m for m in resolve(node_dir) if m[0] not in PARAM_MODULES]
+    if any(m[0].startswith('drivers.') for m in modules):
+        modules.insert(0, ['drivers', join(ROOT, 'drivers', '__init__.py'), False])
+    print("== %s" % node)
+    print("module                      .py   .mpy")
+    modules.append([MAIN_MODULE, stage_main(node_dir, staged), False])
+    frozen = {}
+    total_py = total_mpy = 0
+    for name, src, lazy in modules:
+        rel = join('drivers', '__init__') if name == 'drivers' else module_path(name)
+        py = os.stat(src).st_size
+        source_name = 'main.py' if name == MAIN_MODULE else rel + '.py'  # Shown in tracebacks
+        mpy = compile_mpy(cmd, src, join(out, rel + '.mpy'), source_name, march)
+        total_py += py
+        total_mpy += mpy
+        print("%-24s %7s %6s" % (name, py, mpy))
+        base = ROOT if name.startswith('drivers') else (staged if name == MAIN_MODULE else node_dir)
+        frozen.setdefault(base, []).append(rel + '.py')
+    with open(join(out, 'main.py'), 'w') as f:
+        f.write('import %s  # main.py precompiled by tools/build_mpy.py\n' % MAIN_MODULE)
+    for name in os.listdir(node_dir):
+        path = join(node_dir, name)
+        if name == 'boot.py' or name.endswith('.json') or name[:-3] in PARAM_MODULES and name.endswith('.py'):
+            shutil.copy(path, join(out, name))
+        elif name in DATA_DIRS and os.path.isdir(path):
+            shutil.copytree(path, join(out, name))
+    print("sources %s bytes, mpy %s bytes" % (total_py, total_mpy))
+    if freeze:
+        write_manifest(staged, frozen)
+        print("manifest %s" % join(staged, 'manifest.py'))
+
+
+def write_manifest(out, frozen):
+    # Frozen main has another name, the firmware runs main.py from the filesystem
+    with open(join(out, 'manifest.py'), 'w') as f:
+        f.write('# Generated by tools/build_mpy.py\n')
+        f.write('include("$(PORT_DIR)/boards/manifest.py")\n')
+        for base in sorted(frozen):
+            f.write('freeze("%s", (\n' % os.path.abspath(base))
+            for rel in frozen[base]:
+                f.write('    "%s",\n' % rel)
+            f.write('))\n')
+
+
+def run():
+    args = sys.argv[1:]
+    freeze = '--freeze' in args
+    march = None
+    nodes = []
+    for arg in args:
+        if arg.startswith('--march='):
+            march = arg[8:]
+        elif not arg.startswith('--'):
+            nodes.append(arg)
+    if not nodes:
+        nodes = sorted(d for d in os.listdir(ROOT) if os.path.exists(join(ROOT, d, 'main.py')))
+    for node in nodes:
+        build(node, freeze, march)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,181 @@
+"""
+Flash footprint and import time per ESP32 node.
+
+Finds the modules a node loads by following the import lines of main.py and boot.py through the node's own
+files and the shared drivers package. Imports inside functions or if blocks are counted as lazy: they are on
+flash but are loaded only when used. Import time is the time of importing each module once, dependencies
+first, so the node total is the sum of the rows.
+
+Host: python3 tools/footprint.py [node ...] in the esp32 directory. Import times are CPython with the
+DISPLAY_SIM shims, good for comparing modules, not absolute device numbers; modules that need the real
+firmware (dht, esp, esp32) are shown as -.
+Device: copy to /tools/footprint.py, stop main.py and in REPL from tools.footprint import run; run(). Reports
+the node on the device with import time and heap allocated per module.
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+if HOST:
+    import os
+    ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, ROOT)
+    import drivers.DISPLAY_SIM as sim
+    sim.install_shims()
+    from time import perf_counter
+
+    def size(path):
+        return os.stat(path).st_size if os.path.exists(path) else None
+
+    def now_us():
+        return int(perf_counter() * 1000000)
+else:
+    import uos
+    from utime import ticks_us
+    ROOT = ''
+
+    def size(path):
+        try:
+            return uos.stat(path)[6]
+        except OSError:
+            return None
+
+    def now_us():
+        return ticks_us()
+
+ENTRIES = ('boot.py', 'main.py')
+
+
+def join(*parts):
+    return '/'.join(p for p in parts if p)
+
+
+def imports(path):
+    """ (module, lazy) for every import line of the file """
+    found = []
+    block = ''
+    with open(path) as f:
+        for line in f:
+            text = line.strip()
+            indented = line[:1] in (' ', '\t')
+            if text and not indented:
+                block = text
+            # Indented imports are lazy, except in a top level try/except (optional firmware modules)
+            lazy = indented and block.split(':')[0].split(' ')[0] not in ('try', 'except', 'else')
+            if text.startswith('import '):
+                names = text[7:].split('#')[0].split(',')
+            elif text.startswith('from ') and ' import ' in text:
+                names = [text[5:text.index(' import ')]]
+            else:
+                continue
+            for name in names:
+                name = name.strip().split(' ')[0]
+                if name:
+                    found.append((name, lazy))
+    return found
+
+
+def module_file(node_dir, name):
+    """ File of a node's own or a shared driver module, None for firmware modules """
+    if name.startswith('drivers.'):
+        path = join(ROOT, 'drivers', name[8:] + '.py')
+    elif '.' in name:
+        return None
+    else:
+        path = join(node_dir, name + '.py')
+    return path if size(path) is not None else None
+
+
+def resolve(node_dir):
+    """ Modules of the node in import order (dependencies first): list of [name, path, lazy] """
+    order = []
+    seen = {}
+
+    def walk(path, lazy):
+        for name, is_lazy in imports(path):
+            file = module_file(node_dir, name)
+            if file is None:
+                continue
+            if name in seen:
+                if not (lazy or is_lazy):
+                    seen[name][2] = False
+                continue
+            entry = [name, file, lazy or is_lazy]
+            seen[name] = entry
+            walk(file, entry[2])
+            order.append(entry)
+
+    for entry in ENTRIES:
+        path = join(node_dir, entry)
+        if size(path) is not None:
+            walk(path, False)
+    return order
+
+
+def time_import(name):
+    sys.modules.pop(name, None)  # Device: modules loaded by main.py are imported again
+    gc.collect()
+    heap = None if HOST else gc.mem_alloc()
+    t = now_us()
+    try:
+        __import__(name)
+    except Exception:
+        return None, None
+    us = now_us() - t
+    return us, None if HOST else gc.mem_alloc() - heap
+
+
+def report(node, node_dir):
+    modules = resolve(node_dir)
+    entries = sum(size(join(node_dir, e)) or 0 for e in ENTRIES)
+    if HOST:
+        for name in list(sys.modules):
+            if name.startswith('drivers.'):
+                del sys.modules[name]
+        sys.path.insert(0, node_dir)
+    print("== %s" % node)
+    print("module                     bytes  lazy  import ms  heap")
+    eager = lazy = 0
+    total_us = 0
+    for name, path, is_lazy in modules:
+        nbytes = size(path)
+        if is_lazy:
+            lazy += nbytes
+        else:
+            eager += nbytes
+        us, heap = time_import(name)
+        total_us += us or 0
+        print("%-24s %7s %5s %10s %5s" % (name, nbytes, 'yes' if is_lazy else '', '-' if us is None else
+                                            '%.2f' % (us / 1000), '-' if heap is None else heap))
+    if HOST:
+        sys.path.remove(node_dir)
+        for name, path, is_lazy in modules:
+            sys.modules.pop(name, None)
+    print("main.py + boot.py %s, modules %s, lazy %s, flash total %s bytes, import %.2f ms" % (
+          entries, eager, lazy, entries + eager + lazy, total_us / 1000))
+    return modules
+
+
+def run():
+    if not HOST:
+        report('device', '')
+        return
+    nodes = sys.argv[1:] or sorted(d for d in os.listdir(ROOT) if size(join(ROOT, d, 'main.py')) is not None)
+    users = {}
+    for node in nodes:
+        for name, path, is_lazy in report(node, join(ROOT, node)):
+            if name.startswith('drivers.'):
+                users.setdefault(name, []).append(node)
+    print("== shared drivers")
+    print("module                     bytes  nodes  bytes as per-node copies")
+    shared = copies = 0
+    for name in sorted(users):
+        nbytes = size(module_file('', name))
+        print("%-24s %7s %6s %25s" % (name, nbytes, len(users[name]), nbytes * len(users[name])))
+        shared += nbytes
+        copies += nbytes * len(users[name])
+    print("one shared copy %s bytes, a copy per node %s bytes" % (shared, copies))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,134 @@
+"""
+Import cost per module from source (.py) and precompiled (.mpy): parse time and heap after import.
+
+Each module is imported once first so its dependencies are loaded, then imported again alone and measured.
+heap is what stays allocated after import and gc.collect(), peak also counts the garbage of the import (the
+parser and compiler for sources).
+
+Host: python3 tools/import_bench.py [node ...] in the esp32 directory, default all shared drivers. CPython
+stands in for the device: .py is compile() and exec of the source, precompiled is loading marshalled code
+and exec, heap and peak from tracemalloc. mpy bytes are from mpy-cross if it is installed. Absolute numbers
+are CPython's, the .py / precompiled ratio is what build_mpy.py saves.
+Device: copy to /tools/import_bench.py, stop main.py and in REPL from tools.import_bench import run; run().
+Measures the modules on flash (drivers/ and the node's own modules), whichever of .py or .mpy is there. Run
+it once with the sources and once with tools/build_mpy.py output to compare. .mpy bytecode is loaded to the
+heap like compiled source, so .mpy mostly cuts parse time and peak; frozen modules (build_mpy.py --freeze)
+run from flash and cut heap too.
+"""
+import gc
+import sys
+
+HOST = sys.implementation.name != 'micropython'
+SKIP = ('main', 'boot', 'node_main', 'drivers.DISPLAY_SIM')
+
+if HOST:
+    import marshal
+    import os
+    import subprocess
+    import tempfile
+    import tracemalloc
+    from time import perf_counter
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from footprint import ROOT, resolve, join  # Also installs the DISPLAY_SIM shims
+
+
+def module_name(path):
+    return path[:path.rindex('.')].replace('/', '.')
+
+
+if HOST:
+    def modules(nodes):
+        """ (name, path) of the nodes' modules, or of every shared driver """
+        found = []
+        if nodes:
+            for node in nodes:
+                sys.path.append(join(ROOT, node))
+                for name, path, lazy in resolve(join(ROOT, node)):
+                    if name not in SKIP and (name, path) not in found:
+                        found.append((name, path))
+            return found
+        for file in sorted(os.listdir(join(ROOT, 'drivers'))):
+            name = module_name(join('drivers', file))
+            if file.endswith('.py') and file != '__init__.py' and name not in SKIP:
+                found.append((name, join(ROOT, 'drivers', file)))
+        return found
+
+    def mpy_size(path):
+        out = join(tempfile.gettempdir(), 'import_bench.mpy')
+        try:
+            subprocess.run(['mpy-cross', '-o', out, path], check=True, capture_output=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return os.stat(out).st_size
+
+    def measure(name, load):
+        """ ms of load(), heap after and peak bytes of load() and exec of the module """
+        sys.modules.pop(name, None)
+        mod = type(sys)(name)
+        gc.collect()
+        tracemalloc.start()
+        t = perf_counter()
+        code = load()
+        ms = (perf_counter() - t) * 1000
+        exec(code, mod.__dict__)
+        sys.modules[name] = mod
+        gc.collect()
+        heap, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return ms, heap, peak
+
+    def run():
+        print("module                     .py   .mpy  parse ms  load ms  heap .py  heap pre  peak .py  peak pre")
+        total = [0, 0, 0, 0, 0, 0]
+        for name, path in modules(sys.argv[1:]):
+            with open(path) as f:
+                source = f.read()
+            try:
+                __import__(name)
+            except Exception:
+                print("%-24s import needs the device firmware" % name)
+                continue
+            code = compile(source, path, 'exec')
+            data = marshal.dumps(code)
+            parse_ms, heap_py, peak_py = measure(name, lambda: compile(source, path, 'exec'))
+            load_ms, heap_pre, peak_pre = measure(name, lambda: marshal.loads(data))
+            row = (parse_ms, load_ms, heap_py, heap_pre, peak_py, peak_pre)
+            total = [a + b for a, b in zip(total, row)]
+            print("%-24s %6s %6s %9.2f %8.2f %9s %9s %9s %9s" % ((name, len(source), mpy_size(path) or '-') + row))
+        print("%-24s %6s %6s %9.2f %8.2f %9s %9s %9s %9s" % (('total', '', '') + tuple(total)))
+else:
+    import uos
+    from utime import ticks_us, ticks_diff
+
+    def modules():
+        found = []
+        for directory in ('', 'drivers'):
+            for file in sorted(uos.listdir(directory or '/')):
+                path = directory + '/' + file if directory else file
+                if (file.endswith('.py') or file.endswith('.mpy')) and file[:8] != '__init__':
+                    name = module_name(path)
+                    if name not in SKIP and name not in [n for n, k in found]:
+                        found.append((name, 'mpy' if file.endswith('.mpy') else 'py'))
+        return found
+
+    def run():
+        print("module                   kind  import ms  heap  peak")
+        for name, kind in modules():
+            try:
+                __import__(name)  # Dependencies
+            except Exception as e:
+                print("%-24s %4s  %s" % (name, kind, e))
+                continue
+            del sys.modules[name]
+            gc.collect()
+            base = gc.mem_alloc()
+            t = ticks_us()
+            __import__(name)
+            us = ticks_diff(ticks_us(), t)
+            peak = gc.mem_alloc() - base
+            gc.collect()
+            print("%-24s %4s %10.2f %5s %5s" % (name, kind, us / 1000, gc.mem_alloc() - base, peak))
+
+
+if __name__ == '__main__':
+    run()
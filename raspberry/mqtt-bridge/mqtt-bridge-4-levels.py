@@ -6,14 +6,33 @@ esimerkiksi Grafanaan, jolla tietoa voidaan helposti visualisisoida.
 MQTT-sanoma voi olla esimerkiksi muotoa koti/etela/varasto/kosteus tällä versiolla.
 
 3.9.2020 Jari Hiltunen
+
+NowCast: jos NOWCAST_SILLALLA = True, silta laskee PM2_5_ATM ja PM10_0_ATM viesteistä EPA NowCast ja 24 h AQI:n
+sijainnille ja tallentaa ne mittauksiksi ilmanlaatu_nowcast ja ilmanlaatu_24h. NOWCAST.py ja AQI.py tuodaan
+tämän repositorion hakemistosta esp32/drivers, samat tiedostot kuin laitteella, joten kopioita ei ole. Aja silta
+repositorion kloonista tai kopioi esp32/drivers samaan suhteelliseen paikkaan. Laite, joka jo lähettää nämä
+aiheet, ei tarvitse tätä.
+
+Koosteviestit: laite voi lähettää syklin kaikki arvot yhtenä JSON-objektina (MQTT_BATCH.py), esimerkiksi
+koti/sisa/olohuone/batch {"co2":612,"lampo":21.50}. Silta purkaa objektin niin, että jokainen avain tallentuu
+omana mittauksenaan kuten erillisellä aiheella lähetetty arvo. Arvo null (NaN tai ääretön laitteella) ohitetaan.
+
+Offline-loki: yhteyskatkon aikana tallennetut arvot tulevat koosteviesteinä, joissa on avain "ts" (Unix-aika,
+PUBLISH_LOG.py). Silta tallentaa arvot InfluxDB:hen tällä ajalla, ei vastaanottohetken ajalla.
 '''
 
+import json
+import os
 import re
+import sys
 from typing import NamedTuple
 
 import paho.mqtt.client as mqtt
 from influxdb import InfluxDBClient
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'esp32'))
+from drivers.NOWCAST import NowCast  # noqa: E402  Shared with the ESP32 nodes
+
 INFLUXDB_ADDRESS = 'ip address'
 INFLUXDB_USER = 'username'
 INFLUXDB_PASSWORD = 'password'
@@ -28,6 +47,9 @@ MQTT_TOPIC = 'koti/+/+/+'
 MQTT_REGEX = 'koti/([^/]+)/([^/]+)/([^/]+)'
 MQTT_CLIENT_ID = 'MQTTInfluxDBSilta'
 
+NOWCAST_SILLALLA = False
+nowcast_laskurit = {}
+
 influxdb_client = InfluxDBClient(INFLUXDB_ADDRESS, 8086, INFLUXDB_USER, INFLUXDB_PASSWORD, None)
 
 ''' Tämä hierarkkia tulee mätsätä yllä olevaan TOPIC ja REGEX-asetukseen '''
@@ -36,6 +58,7 @@ class SensorData(NamedTuple):
     direction: str
     measurement: str
     value: float
+    time: int = None
 
 
 def on_connect(client, userdata, flags, rc):
@@ -47,9 +70,28 @@ def on_connect(client, userdata, flags, rc):
 def on_message(client, userdata, msg):
     """The callback for when a PUBLISH message is received from the server."""
     print(msg.topic + ' ' + str(msg.payload))
-    sensor_data = _parse_mqtt_message(msg.topic, msg.payload.decode('utf-8'))
-    if sensor_data is not None:
+    for sensor_data in _parse_mqtt_message(msg.topic, msg.payload.decode('utf-8')):
         _send_sensor_data_to_influxdb(sensor_data)
+        if NOWCAST_SILLALLA:
+            _update_nowcast(sensor_data)
+
+
+def _update_nowcast(sensor_data):
+    if sensor_data.measurement == 'PM2_5_ATM':
+        pm2_5, pm10_0 = sensor_data.value, None
+    elif sensor_data.measurement == 'PM10_0_ATM':
+        pm2_5, pm10_0 = None, sensor_data.value
+    else:
+        return
+    key = (sensor_data.location, sensor_data.direction)
+    if key not in nowcast_laskurit:
+        nowcast_laskurit[key] = NowCast()
+    engine = nowcast_laskurit[key]
+    engine.add(pm2_5, pm10_0, sensor_data.time)
+    for measurement, value in (('ilmanlaatu_nowcast', engine.nowcast_aqi()), ('ilmanlaatu_24h', engine.aqi_24h())):
+        if value is not None:
+            _send_sensor_data_to_influxdb(SensorData(sensor_data.location, sensor_data.direction, measurement, value,
+                                                     sensor_data.time))
 
 
 def _parse_mqtt_message(topic, payload):
@@ -60,10 +102,16 @@ def _parse_mqtt_message(topic, payload):
         direction = match.group(2)
         measurement = match.group(3)
         if measurement == 'status':
-            return None
-        return SensorData(location, direction, measurement, float(payload))
+            return []
+        if payload.startswith('{'):
+            ''' Koosteviesti, avaimet ovat mittausten nimiä, ts on offline-lokin aika '''
+            values = json.loads(payload)
+            ts = values.pop('ts', None)
+            return [SensorData(location, direction, key, float(value), ts) for key, value in values.items()
+                    if value is not None]
+        return [SensorData(location, direction, measurement, float(payload))]
     else:
-        return None
+        return []
 
 
 def _send_sensor_data_to_influxdb(sensor_data):
@@ -79,7 +127,11 @@ def _send_sensor_data_to_influxdb(sensor_data):
             }
         }
     ]
-    influxdb_client.write_points(json_body)
+    if sensor_data.time is not None:
+        json_body[0]['time'] = sensor_data.time
+        influxdb_client.write_points(json_body, time_precision='s')
+    else:
+        influxdb_client.write_points(json_body)
 
 
 def _init_influxdb_database():